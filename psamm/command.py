@@ -28,21 +28,32 @@ The :func:`.main` function is the entry point of command line interface.
 from __future__ import division, unicode_literals
 
 import os
+import io
 import sys
+import json
 import argparse
 import logging
 import abc
 import pickle
+import gc
+import time
 from itertools import islice
+from collections import deque
+from fractions import Fraction
+from decimal import Decimal
 import multiprocessing as mp
 
 import pkg_resources
-from six import add_metaclass, iteritems, itervalues, text_type
+from six import add_metaclass, iteritems, text_type
 
 from . import __version__ as package_version
 from .datasource import native, sbml
+from .datasource.cache import ModelCache
 from .datasource.context import FilePathContext
 from .lpsolver import generic
+from .metabolicmodel import MetabolicModel
+from .presolve import presolve, PresolveError
+from .snapshot import ModelSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -204,6 +215,36 @@ class LoopRemovalMixin(object):
         return loop_removal
 
 
+class PresolveMixin(object):
+    """Mixin for commands that can reduce the model before solving.
+
+    The metabolic model (``self._mm``) is not changed. Instead, the command
+    obtains the reduced model from :meth:`_presolve_model` and expands the
+    results to the original reactions.
+    """
+
+    @classmethod
+    def init_parser(cls, parser):
+        parser.add_argument(
+            '--presolve', action='store_true',
+            help='Remove blocked reactions and lump linear pathways of the'
+                 ' model before solving')
+        super(PresolveMixin, cls).init_parser(parser)
+
+    def _presolve_model(self, keep=()):
+        """Return presolved model or None if presolve is not enabled.
+
+        See :func:`psamm.presolve.presolve`.
+        """
+        if not self._args.presolve:
+            return None
+
+        try:
+            return presolve(self._mm, keep=keep)
+        except PresolveError as e:
+            self.fail('Presolve failed: {}'.format(e), e)
+
+
 class SolverCommandMixin(object):
     """Mixin for commands that use an LP solver.
 
@@ -243,15 +284,48 @@ class ParallelTaskMixin(object):
         parser.add_argument(
             '--parallel', help='Set number of parallel processes (0=auto)',
             type=int, default=0)
+        parser.add_argument(
+            '--checkpoint', metavar='file', type=text_type,
+            help='Record results of completed tasks in checkpoint file')
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Skip tasks that are already recorded in checkpoint file')
         super(ParallelTaskMixin, cls).init_parser(parser)
 
+    def _create_journal(self):
+        """Return :class:`.TaskJournal` for the checkpoint file or None."""
+        checkpoint = getattr(self._args, 'checkpoint', None)
+        if checkpoint is None:
+            if getattr(self._args, 'resume', False):
+                self.argument_error('--resume requires --checkpoint')
+            return None
+
+        # The journal can only be resumed by a run with the same options
+        options = sorted(
+            (key, value) for key, value in iteritems(vars(self._args))
+            if key not in ('parallel', 'checkpoint', 'resume'))
+        key = '{}:{!r}'.format(self.__class__.__name__, options)
+
+        try:
+            journal = TaskJournal(checkpoint, key, resume=self._args.resume)
+        except (IOError, ValueError) as e:
+            self.fail('Unable to use checkpoint file {}: {}'.format(
+                checkpoint, e), exc=e)
+
+        if len(journal) > 0:
+            logger.info('Resuming with {} completed tasks from {}'.format(
+                len(journal), checkpoint))
+        return journal
+
     def _create_executor(self, handler, args, cpus_per_worker=1):
         """Return a new :class:`.Executor` instance."""
+        journal = self._create_journal()
+
         if self._args.parallel > 0:
             workers = self._args.parallel
         else:
             try:
-                workers = mp.cpu_count() // cpus_per_worker
+                workers = max(1, mp.cpu_count() // cpus_per_worker)
             except NotImplementedError:
                 workers = 1
 
@@ -259,11 +333,12 @@ class ParallelTaskMixin(object):
             logger.info('Using {} parallel worker processes...'.format(
                 workers))
             executor = ProcessPoolExecutor(
-                processes=workers, handler_init=handler, handler_args=args)
+                processes=workers, handler_init=handler, handler_args=args,
+                journal=journal)
         else:
             logger.info('Using single worker...')
             executor = SequentialExecutor(
-                handler_init=handler, handler_args=args)
+                handler_init=handler, handler_args=args, journal=journal)
 
         return executor
 
@@ -319,21 +394,50 @@ class ExecutorError(Exception):
 
 
 class _ExecutorProcess(mp.Process):
-    def __init__(self, task_queue, result_queue, handler_init,
-                 handler_args=()):
+    def __init__(self, index, task_queue, result_queue, steal_requests,
+                 handler_init, handler_args=()):
         super(_ExecutorProcess, self).__init__()
+        self._index = index
         self._task_queue = task_queue
         self._result_queue = result_queue
+        self._steal_requests = steal_requests
         self._handler_init = handler_init
         self._handler_args = handler_args
 
+    def _steal_remaining(self):
+        """Whether remaining tasks of the chunk should be handed back."""
+        if self._steal_requests.value <= 0:
+            return False
+        with self._steal_requests.get_lock():
+            if self._steal_requests.value <= 0:
+                return False
+            self._steal_requests.value -= 1
+            return True
+
     def run(self):
+        snapshots = [arg for arg in self._handler_args
+                     if isinstance(arg, ModelSnapshot)]
         try:
-            handler = self._handler_init(*self._handler_args)
+            handler_args = [
+                arg.load() if isinstance(arg, ModelSnapshot) else arg
+                for arg in self._handler_args]
+            handler = self._handler_init(*handler_args)
             for tasks in iter(self._task_queue.get, None):
-                results = [
-                    (task, handler.handle_task(*task)) for task in tasks]
-                self._result_queue.put(results)
+                results = []
+                remaining = []
+                busy_time = 0.0
+                for i, task in enumerate(tasks):
+                    start_time = time.time()
+                    results.append((task, handler.handle_task(*task)))
+                    busy_time += time.time() - start_time
+
+                    # Hand back the rest of the chunk to idle workers
+                    if i + 1 < len(tasks) and self._steal_remaining():
+                        remaining = tasks[i + 1:]
+                        break
+
+                self._result_queue.put(
+                    (self._index, results, remaining, busy_time))
         except BaseException as e:
             try:
                 pickled_exc = pickle.dumps(e, -1)
@@ -341,9 +445,127 @@ class _ExecutorProcess(mp.Process):
                 logger.warning("Unpicklable exception raised: {}".format(e))
                 pickled_exc = None
             self._result_queue.put(_ErrorMarker(pickled_exc))
+        finally:
+            # Models loaded from the snapshots must be released first
+            handler = handler_args = None
+            gc.collect()
+            for snapshot in snapshots:
+                try:
+                    snapshot.close()
+                except BufferError:
+                    logger.debug('Unable to release model snapshot')
+
+
+class _JournalEncoder(json.JSONEncoder):
+    """JSON encoder for exact numbers in tasks and results.
+
+    Exact solvers return :class:`fractions.Fraction` values (and some
+    values can be :class:`decimal.Decimal`) which are encoded as tagged
+    strings so that they are decoded to the same values by
+    :func:`_journal_object_hook`.
+    """
+
+    def default(self, obj):
+        if isinstance(obj, Fraction):
+            return {'__fraction__': text_type(obj)}
+        elif isinstance(obj, Decimal):
+            return {'__decimal__': text_type(obj)}
+        return super(_JournalEncoder, self).default(obj)
+
+
+def _journal_object_hook(obj):
+    """Decode objects encoded by :class:`_JournalEncoder`."""
+    if len(obj) == 1:
+        if '__fraction__' in obj:
+            return Fraction(obj['__fraction__'])
+        elif '__decimal__' in obj:
+            return Decimal(obj['__decimal__'])
+    return obj
+
+
+class TaskJournal(object):
+    """Append-only journal of completed tasks and their results.
+
+    Each line of the file is a JSON object with the task and the result.
+    The first line records a key that identifies the run (e.g. command and
+    options) so that a journal is only resumed by a matching run. If
+    resume is False, an existing file is replaced. Results are decoded from
+    JSON so tuples in the results are returned as lists when resuming.
+    Fractions and decimals are recorded exactly and are decoded to the same
+    type.
+    """
+
+    def __init__(self, path, key, resume=False):
+        self._path = path
+        self._key = key
+        self._results = {}
+
+        if resume and os.path.exists(path):
+            self._read()
+            self._file = io.open(path, 'a', encoding='utf-8')
+        else:
+            self._file = io.open(path, 'w', encoding='utf-8')
+            self._write({'key': key})
+
+    @staticmethod
+    def _task_key(task):
+        return json.dumps(task, sort_keys=True, cls=_JournalEncoder)
+
+    def _read(self):
+        with io.open(self._path, 'r', encoding='utf-8') as f:
+            for i, line in enumerate(f):
+                try:
+                    entry = json.loads(
+                        line, object_hook=_journal_object_hook)
+                except ValueError:
+                    # Last line may be incomplete if the run was killed
+                    logger.warning('Skipping invalid line {} in {}'.format(
+                        i + 1, self._path))
+                    continue
+
+                if i == 0:
+                    if entry.get('key') != self._key:
+                        raise ValueError(
+                            'Checkpoint was created by a different command'
+                            ' or with different options')
+                    continue
+
+                self._results[self._task_key(entry['task'])] = (
+                    entry['result'])
+
+    def _write(self, entry):
+        self._file.write(
+            text_type(json.dumps(entry, cls=_JournalEncoder)) + '\n')
+        self._file.flush()
+
+    def __len__(self):
+        return len(self._results)
+
+    def __contains__(self, task):
+        return self._task_key(task) in self._results
+
+    def get(self, task):
+        """Return recorded result of task."""
+        return self._results[self._task_key(task)]
+
+    def add(self, task, result):
+        """Record result of task."""
+        self._results[self._task_key(task)] = result
+        self._write({'task': task, 'result': result})
+
+    def close(self):
+        self._file.close()
 
 
 class Executor(object):
+    """Base class of executors.
+
+    If the executor has a :class:`TaskJournal`, tasks recorded in the
+    journal are not run again and new results are added to the journal.
+    """
+
+    _journal = None
+
     def __enter__(self):
         return self
 
@@ -351,12 +573,65 @@ class Executor(object):
         self.close()
         return False
 
+    def imap_unordered(self, iterable, chunksize=None):
+        """Run tasks and yield (task, result) tuples as they finish."""
+        if self._journal is None:
+            return self._imap_unordered(iterable, chunksize)
+        return self._imap_journal(iterable, chunksize)
+
+    def _imap_journal(self, iterable, chunksize):
+        iterable = iter(iterable)
+        journal = self._journal
+
+        # Yield the recorded results until the first new task so that
+        # iterables that depend on previous results see them in order.
+        for task in iterable:
+            if task not in journal:
+                break
+            yield task, journal.get(task)
+        else:
+            return
+
+        recorded = deque()
+
+        def iter_tasks():
+            yield task
+            for other in iterable:
+                if other in journal:
+                    recorded.append(other)
+                else:
+                    yield other
+
+        for other, result in self._imap_unordered(iter_tasks(), chunksize):
+            journal.add(other, result)
+            while len(recorded) > 0:
+                recorded_task = recorded.popleft()
+                yield recorded_task, journal.get(recorded_task)
+            yield other, result
+
+        while len(recorded) > 0:
+            recorded_task = recorded.popleft()
+            yield recorded_task, journal.get(recorded_task)
+
     def close(self):
-        pass
+        if self._journal is not None:
+            self._journal.close()
 
 
 class ProcessPoolExecutor(Executor):
-    def __init__(self, handler_init, handler_args=(), processes=None):
+    """Executor that runs tasks in a pool of worker processes.
+
+    Tasks are sent to the workers in chunks. If no chunk size is given to
+    :meth:`imap_unordered`, the size of the chunks is adapted to the
+    observed time per task so that each chunk takes roughly
+    ``chunk_time`` seconds. When there are no more new tasks, idle workers
+    request that busy workers hand back the unprocessed part of their
+    chunk which is then split among the idle workers. The utilization of
+    each worker is logged at the end of :meth:`imap_unordered`.
+    """
+
+    def __init__(self, handler_init, handler_args=(), processes=None,
+                 chunk_time=0.25, max_chunksize=256, journal=None):
         if processes is None:
             try:
                 processes = mp.cpu_count()
@@ -367,14 +642,53 @@ class ProcessPoolExecutor(Executor):
         self._processes = []
         self._task_queue = mp.Queue()
         self._result_queue = mp.Queue()
+        self._steal_requests = mp.Value('i', 0)
+
+        self._journal = journal
+        self._chunk_time = chunk_time
+        self._max_chunksize = max_chunksize
+        self._task_time = None
+        self._worker_stats = {}
 
-        for _ in range(self._process_count):
+        self._snapshots = []
+        handler_args = self._create_snapshots(handler_args)
+
+        for index in range(self._process_count):
             p = _ExecutorProcess(
-                self._task_queue, self._result_queue, handler_init,
-                handler_args)
+                index, self._task_queue, self._result_queue,
+                self._steal_requests, handler_init, handler_args)
             p.start()
             self._processes.append(p)
 
+    def _create_snapshots(self, handler_args):
+        """Replace models in handler arguments with shared snapshots.
+
+        The workers then attach to a single buffer instead of each receiving
+        a pickled copy of the model. Snapshots store values as floats so
+        the models are passed unchanged if an exact solver is used.
+        """
+        handler_args = tuple(handler_args)
+        for arg in handler_args:
+            if (isinstance(arg, generic.Solver) and
+                    arg.properties.get('rational', False)):
+                return handler_args
+
+        args = []
+        for arg in handler_args:
+            if type(arg) is MetabolicModel:
+                try:
+                    snapshot = ModelSnapshot.from_model(arg)
+                except ValueError:
+                    logger.debug('Unable to create model snapshot',
+                                 exc_info=True)
+                else:
+                    snapshot.share()
+                    self._snapshots.append(snapshot)
+                    arg = snapshot
+            args.append(arg)
+
+        return tuple(args)
+
     def apply(self, task):
         self._task_queue.put([task])
         results = self._result_queue.get()
@@ -382,72 +696,142 @@ class ProcessPoolExecutor(Executor):
             exception = pickle.loads(results.pickled_exception)
             raise exception
 
-        return next(itervalues(results))
-
-    def imap_unordered(self, iterable, chunksize=1):
-        def iter_chunks():
-            while True:
-                chunk = list(islice(iterable, chunksize))
-                if len(chunk) == 0:
+        _, results, _, _ = results
+        return results[0][1]
+
+    def _next_chunksize(self):
+        """Return number of tasks to put in the next chunk."""
+        if self._task_time is None:
+            return 1
+        if self._task_time <= 0:
+            return self._max_chunksize
+        chunksize = int(self._chunk_time / self._task_time)
+        return max(1, min(self._max_chunksize, chunksize))
+
+    def _update_task_time(self, count, busy_time):
+        """Update moving average of time per task."""
+        if count == 0:
+            return
+        task_time = busy_time / count
+        if self._task_time is None:
+            self._task_time = task_time
+        else:
+            self._task_time = 0.7 * self._task_time + 0.3 * task_time
+
+    def _set_steal_requests(self, count):
+        with self._steal_requests.get_lock():
+            self._steal_requests.value = max(0, count)
+
+    @property
+    def worker_stats(self):
+        """Dictionary of number of tasks and busy time for each worker."""
+        return dict(self._worker_stats)
+
+    def _log_utilization(self, wall_time):
+        for index in sorted(self._worker_stats):
+            count, busy_time = self._worker_stats[index]
+            utilization = busy_time / wall_time if wall_time > 0 else 0.0
+            logger.info(
+                'Worker {}: {} tasks, {:.2f} seconds busy ({:.0%}'
+                ' utilization)'.format(
+                    index, count, busy_time, utilization))
+
+    def _imap_unordered(self, iterable, chunksize=None):
+        """Run tasks and yield (task, result) tuples as they finish.
+
+        If chunksize is None, the size of the chunks is adapted to the
+        time per task.
+        """
+        iterable = iter(iterable)
+        start_time = time.time()
+
+        outstanding = 0
+        exhausted = False
+        exception = None
+        while True:
+            # Keep a chunk queued for every worker
+            while (exception is None and not exhausted and
+                    outstanding < self._process_count):
+                size = (chunksize if chunksize is not None else
+                        self._next_chunksize())
+                tasks = list(islice(iterable, size))
+                if len(tasks) == 0:
+                    exhausted = True
                     break
-                yield chunk
 
-        it = iter_chunks()
-        workers = 0
-        for i in range(self._process_count):
-            tasks = next(it, None)
-            if tasks is None:
-                break
+                self._task_queue.put(tasks)
+                outstanding += 1
 
-            self._task_queue.put(tasks)
-            workers += 1
+            if exhausted and exception is None:
+                self._set_steal_requests(self._process_count - outstanding)
 
-        exception = None
-        while workers > 0:
-            results = self._result_queue.get()
-            if isinstance(results, _ErrorMarker):
+            if outstanding == 0:
+                break
+
+            message = self._result_queue.get()
+            outstanding -= 1
+            if isinstance(message, _ErrorMarker):
                 if exception is None:
-                    if results.pickled_exception is None:
+                    if message.pickled_exception is None:
                         exception = ExecutorError(
                             "Unpicklable exception raised by child")
                     else:
-                        exception = pickle.loads(results.pickled_exception)
-                workers -= 1
+                        exception = pickle.loads(message.pickled_exception)
                 self._process_count -= 1
                 continue
 
             if exception is not None:
                 continue
 
-            tasks = next(it, None)
-            if tasks is None:
-                workers -= 1
-
-            self._task_queue.put(tasks)
+            index, results, remaining, busy_time = message
+            count, total_time = self._worker_stats.get(index, (0, 0.0))
+            self._worker_stats[index] = (
+                count + len(results), total_time + busy_time)
+            self._update_task_time(len(results), busy_time)
+
+            # Split tasks handed back by the worker among idle workers
+            if len(remaining) > 0:
+                idle = self._process_count - outstanding
+                parts = max(1, min(len(remaining), idle))
+                for i in range(parts):
+                    start = i * len(remaining) // parts
+                    end = (i + 1) * len(remaining) // parts
+                    self._task_queue.put(remaining[start:end])
+                    outstanding += 1
 
             for task, result in results:
                 yield task, result
 
+        self._set_steal_requests(0)
         if exception is not None:
             raise exception
 
+        self._log_utilization(time.time() - start_time)
+
     def close(self):
         for i in range(self._process_count):
             self._task_queue.put(None)
+        super(ProcessPoolExecutor, self).close()
 
     def join(self):
         for p in self._processes:
             p.join()
 
+        for snapshot in self._snapshots:
+            snapshot.close()
+            snapshot.unlink()
+        del self._snapshots[:]
+
 
 class SequentialExecutor(Executor):
-    def __init__(self, handler_init, handler_args=()):
+    def __init__(self, handler_init, handler_args=(), journal=None):
         self._handler = handler_init(*handler_args)
+        self._journal = journal
 
     def apply(self, task):
         return self._handler.handle_task(*task)
 
-    def imap_unordered(self, iterable, chunksize=1):
+    def _imap_unordered(self, iterable, chunksize=None):
         for task in iterable:
             yield task, self._handler.handle_task(*task)
 
@@ -514,6 +898,9 @@ def main(command_class=None, args=None):
     parser = argparse.ArgumentParser(description=title)
     parser.add_argument('--model', metavar='file', default='.',
                         help='Model definition')
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help='Do not use or update the cache of the parsed model')
     parser.add_argument(
         '-V', '--version', action='version',
         version='%(prog)s ' + package_version)
@@ -547,9 +934,13 @@ def main(command_class=None, args=None):
 
     parsed_args = parser.parse_args(args)
 
-    # Load model definition
-    model = native.ModelReader.reader_from_path(
-        parsed_args.model).create_model()
+    # Load model definition. Included files are parsed in parallel if the
+    # model includes many files.
+    if parsed_args.no_cache:
+        model = native.ModelReader.reader_from_path(
+            parsed_args.model).create_model(processes=None)
+    else:
+        model = ModelCache().load_model(parsed_args.model, processes=None)
 
     # Instantiate command with model and run
     command = parsed_args.command(model, parsed_args)
@@ -585,6 +976,16 @@ def main_sbml(command_class=None, args=None):
     parser.add_argument('--merge-compounds', action='store_true',
                         help=('Merge identical compounds occuring in various'
                               ' compartments.'))
+    parser.add_argument(
+        '--discard-notes', action='store_true',
+        help=('Discard notes and annotations of the SBML entries. This'
+              ' speeds up loading but properties (e.g. gene associations)'
+              ' that are only defined in the notes are not available.'))
+    parser.add_argument(
+        '--streaming', action='store_true',
+        help=('Parse the SBML file incrementally to reduce memory use. The'
+              ' species and parameters must appear before the reactions in'
+              ' the file.'))
     parser.add_argument(
         '-V', '--version', action='version',
         version='%(prog)s ' + package_version)
@@ -621,7 +1022,9 @@ def main_sbml(command_class=None, args=None):
     # Load model definition
     context = FilePathContext(parsed_args.model)
     with context.open('r') as f:
-        model = sbml.SBMLReader(f, context=context).create_model()
+        model = sbml.SBMLReader(
+            f, context=context, streaming=parsed_args.streaming,
+            read_notes=not parsed_args.discard_notes).create_model()
         sbml.convert_sbml_model(model)
         if parsed_args.merge_compounds:
             sbml.merge_equivalent_compounds(model)
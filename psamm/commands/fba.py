@@ -21,14 +21,14 @@ import time
 import logging
 
 from ..command import (LoopRemovalMixin, ObjectiveMixin, SolverCommandMixin,
-                       MetabolicMixin, Command)
+                       MetabolicMixin, PresolveMixin, Command)
 from .. import fluxanalysis
 
 logger = logging.getLogger(__name__)
 
 
 class FluxBalanceCommand(MetabolicMixin, LoopRemovalMixin, ObjectiveMixin,
-                         SolverCommandMixin, Command):
+                         SolverCommandMixin, PresolveMixin, Command):
     """Run flux balance analysis on the model."""
 
     _supported_loop_removal = ['none', 'tfba', 'l1min']
@@ -64,13 +64,27 @@ class FluxBalanceCommand(MetabolicMixin, LoopRemovalMixin, ObjectiveMixin,
                 'Specified reaction is not in model: {}'.format(reaction))
 
         loop_removal = self._get_loop_removal_option()
+        if loop_removal == 'tfba' and self._args.presolve:
+            self.argument_error(
+                'Presolve is not possible with tfba loop removal')
+
+        # Lumped reactions are weighted by the ratios of the original
+        # reactions so that the L1 norm of the expanded fluxes is minimized.
+        presolved = self._presolve_model(keep=[reaction])
+        model, weights = self._mm, {}
+        if presolved is not None:
+            model, weights = presolved.model, presolved.reduced_weights()
+
         if loop_removal == 'none':
-            result = self.run_fba(reaction)
+            result = self.run_fba(reaction, model)
         elif loop_removal == 'l1min':
-            result = self.run_fba_minimized(reaction)
+            result = self.run_fba_minimized(reaction, model, weights)
         elif loop_removal == 'tfba':
             result = self.run_tfba(reaction)
 
+        if presolved is not None:
+            result = presolved.expand_fluxes(dict(result))
+
         optimum = None
         total_reactions = 0
         nonzero_reactions = 0
@@ -94,10 +108,13 @@ class FluxBalanceCommand(MetabolicMixin, LoopRemovalMixin, ObjectiveMixin,
         logger.info('Reactions at zero flux: {}/{}'.format(
             total_reactions - nonzero_reactions, total_reactions))
 
-    def run_fba(self, reaction):
+    def run_fba(self, reaction, model=None):
         """Run standard FBA on model."""
+        if model is None:
+            model = self._mm
+
         solver = self._get_solver()
-        p = fluxanalysis.FluxBalanceProblem(self._mm, solver)
+        p = fluxanalysis.FluxBalanceProblem(model, solver)
 
         start_time = time.time()
 
@@ -109,16 +126,19 @@ class FluxBalanceCommand(MetabolicMixin, LoopRemovalMixin, ObjectiveMixin,
         logger.info('Solving took {:.2f} seconds'.format(
             time.time() - start_time))
 
-        for reaction_id in self._mm.reactions:
-            yield reaction_id, p.get_flux(reaction_id)
+        fluxes = p.get_fluxes()
+        for reaction_id in model.reactions:
+            yield reaction_id, fluxes[reaction_id]
 
-    def run_fba_minimized(self, reaction):
+    def run_fba_minimized(self, reaction, model=None, weights={}):
         """Run normal FBA and flux minimization on model."""
+        if model is None:
+            model = self._mm
 
         epsilon = self._args.epsilon
         solver = self._get_solver()
 
-        p = fluxanalysis.FluxBalanceProblem(self._mm, solver)
+        p = fluxanalysis.FluxBalanceProblem(model, solver)
 
         start_time = time.time()
 
@@ -128,19 +148,20 @@ class FluxBalanceCommand(MetabolicMixin, LoopRemovalMixin, ObjectiveMixin,
         except fluxanalysis.FluxBalanceError as e:
             self.report_flux_balance_error(e)
 
-        fluxes = {r: p.get_flux(r) for r in self._mm.reactions}
+        fluxes = p.get_fluxes()
 
         # Run flux minimization
         flux_var = p.get_flux_var(reaction)
         p.prob.add_linear_constraints(flux_var == p.get_flux(reaction))
-        p.minimize_l1()
+        p.minimize_l1(weights)
 
         logger.info('Solving took {:.2f} seconds'.format(
             time.time() - start_time))
 
         count = 0
-        for reaction_id in self._mm.reactions:
-            flux = p.get_flux(reaction_id)
+        min_fluxes = p.get_fluxes()
+        for reaction_id in model.reactions:
+            flux = min_fluxes[reaction_id]
             if abs(flux - fluxes[reaction_id]) > epsilon:
                 count += 1
             yield reaction_id, flux
@@ -164,5 +185,6 @@ class FluxBalanceCommand(MetabolicMixin, LoopRemovalMixin, ObjectiveMixin,
         logger.info('Solving took {:.2f} seconds'.format(
             time.time() - start_time))
 
+        fluxes = p.get_fluxes()
         for reaction_id in self._mm.reactions:
-            yield reaction_id, p.get_flux(reaction_id)
+            yield reaction_id, fluxes[reaction_id]
@@ -19,13 +19,12 @@ from __future__ import unicode_literals
 
 import time
 import logging
-from itertools import product
 
 from six import text_type
 
 from ..command import (Command, MetabolicMixin, LoopRemovalMixin,
                        SolverCommandMixin, ParallelTaskMixin)
-from .. import fluxanalysis, fastcore
+from .. import fluxanalysis, fastcore, presolve
 
 logger = logging.getLogger(__name__)
 
@@ -99,12 +98,23 @@ class FluxConsistencyCommand(MetabolicMixin, LoopRemovalMixin,
             else:
                 solver = self._get_solver()
 
+            # Structurally blocked reactions are inconsistent and the
+            # remaining reactions are checked using the reduced model.
+            # Fastcore applies the same reduction internally. Blocked
+            # reactions are kept with thermodynamic constraints since the
+            # constraints on their delta mu still apply.
+            blocked, model = set(), self._mm
+            if not enable_tfba:
+                blocked, model = presolve.remove_blocked_reactions(self._mm)
+                if model is self._mm:
+                    blocked = set()
+
             if self._args.reduce_lp:
                 logger.info('Running with reduced number of LP problems.')
                 try:
                     inconsistent = set(
                         fluxanalysis.consistency_check(
-                            self._mm, self._mm.reactions, epsilon,
+                            model, model.reactions, epsilon,
                             tfba=enable_tfba, solver=solver))
                 except fluxanalysis.FluxBalanceError as e:
                     self.report_flux_balance_error(e)
@@ -112,10 +122,12 @@ class FluxConsistencyCommand(MetabolicMixin, LoopRemovalMixin,
                 logger.info('Using flux bounds to determine consistency.')
                 try:
                     inconsistent = set(self._run_fva_fluxcheck(
-                        self._mm, solver, enable_tfba, epsilon))
+                        model, solver, enable_tfba, epsilon))
                 except FluxCheckFVATaskError:
                     self.report_flux_balance_error()
 
+            inconsistent.update(blocked)
+
         logger.info('Solving took {:.2f} seconds'.format(
             time.time() - start_time))
 
@@ -157,14 +169,36 @@ class FluxConsistencyCommand(MetabolicMixin, LoopRemovalMixin,
                         count_exchange, total_exchange, disabled_exchange))
 
     def _run_fva_fluxcheck(self, model, solver, enable_tfba, epsilon):
-        handler_args = model, solver, enable_tfba
+        reactions = fluxanalysis.flux_variability_order(
+            model, model.reactions)
+
+        # Reactions that have non-zero flux in any solution are consistent
+        # and the remaining tasks for these reactions are skipped.
+        consistent = set()
+
+        def iter_tasks():
+            for reaction_id in reactions:
+                for direction in (1, -1):
+                    if reaction_id not in consistent:
+                        yield reaction_id, direction
+
+        handler_args = model, solver, enable_tfba, reactions
         executor = self._create_executor(
             FluxCheckFVATaskHandler, handler_args, cpus_per_worker=2)
 
         results = {}
         with executor:
-            for (reaction_id, direction), value in executor.imap_unordered(
-                    product(model.reactions, (1, -1)), 16):
+            for (reaction_id, direction), (value, fluxes) in (
+                    executor.imap_unordered(iter_tasks())):
+                if fluxes is not None:
+                    consistent.update(
+                        other for other, flux in zip(reactions, fluxes)
+                        if abs(flux) >= epsilon)
+                if abs(value) >= epsilon:
+                    consistent.add(reaction_id)
+
+                if reaction_id in consistent:
+                    continue
 
                 if reaction_id not in results:
                     results[reaction_id] = value
@@ -188,15 +222,24 @@ class FluxCheckFVATaskError(Exception):
 
 
 class FluxCheckFVATaskHandler(object):
-    def __init__(self, model, solver, enable_tfba):
+    def __init__(self, model, solver, enable_tfba, reactions):
         self._problem = fluxanalysis.FluxBalanceProblem(model, solver)
         if enable_tfba:
             self._problem.add_thermodynamic()
 
+        # Fluxes of solutions are returned in this order
+        self._reactions = reactions
+
     def handle_task(self, reaction_id, direction):
         try:
-            return self._problem.flux_bound(reaction_id, direction)
+            bound = self._problem.flux_bound(reaction_id, direction)
         except fluxanalysis.FluxBalanceError as e:
             # FluxBalanceError is not picklable. Reraise as picklable
             # exception.
             raise FluxCheckFVATaskError(text_type(e))
+
+        if abs(bound) == float('inf'):
+            return bound, None
+
+        fluxes = self._problem.get_fluxes(self._reactions).tolist()
+        return bound, fluxes
@@ -19,9 +19,11 @@ from __future__ import unicode_literals
 
 import logging
 
+from six import iteritems
+
 from ..command import (Command, SolverCommandMixin, MetabolicMixin,
                        ParallelTaskMixin)
-from .. import fluxanalysis, fluxcoupling
+from .. import fluxanalysis, fluxcoupling, presolve
 
 logger = logging.getLogger(__name__)
 
@@ -52,35 +54,49 @@ class FluxCouplingCommand(MetabolicMixin, SolverCommandMixin,
             self.report_flux_balance_error(e)
         optimum = fba_fluxes[max_reaction]
 
-        handler_args = self._mm, {max_reaction: 0.999 * optimum}, solver
+        # Blocked reactions are removed and the enzyme subsets are lumped so
+        # only the reduced model has to be solved.
+        try:
+            presolved = presolve.presolve(
+                self._mm, keep=[max_reaction], nullspace=True)
+        except presolve.PresolveError as e:
+            self.fail('Presolve failed: {}'.format(e), e)
+        self._reduced = presolved.model
+
+        coordinator = fluxcoupling.FluxCouplingCoordinator(self._reduced)
+        handler_args = (
+            self._reduced, {max_reaction: 0.999 * optimum}, solver,
+            coordinator.reactions)
         executor = self._create_executor(
             FluxCouplingTaskHandler, handler_args, cpus_per_worker=2)
 
         self._coupled = {}
         self._groups = []
 
-        def iter_reaction_pairs():
-            reactions = sorted(self._mm.reactions)
-            for i, reaction1 in enumerate(reactions):
-                if reaction1 in self._coupled:
-                    continue
-
-                for reaction2 in reactions[i+1:]:
-                    if (reaction2 in self._coupled and
-                            (self._coupled[reaction2] ==
-                             self._coupled.get(reaction1))):
-                        continue
-
-                    yield reaction1, reaction2
-
+        solved = 0
         with executor:
-            for task, bounds in executor.imap_unordered(
-                    iter_reaction_pairs(), 16):
+            task_results = executor.imap_unordered(coordinator.tasks())
+            for task, bounds in coordinator.results(task_results):
                 reaction1, reaction2 = task
                 self._check_reactions(reaction1, reaction2, bounds)
+                solved += 1
 
         executor.join()
 
+        count = len(coordinator.reactions)
+        logger.info('Solved {} of {} reaction pairs'.format(
+            solved, count * (count - 1) // 2))
+
+        # Reactions that were lumped by presolve are fully coupled
+        for reaction_id, members in sorted(iteritems(presolved.lumped)):
+            if not coordinator.has_flux(reaction_id):
+                continue
+            for member, ratio in members:
+                if member != reaction_id:
+                    value = 1 / float(ratio)
+                    self._check_reactions(
+                        reaction_id, member, (value, value))
+
         logger.info('Coupled groups:')
         for i, group in enumerate(self._groups):
             if group is not None:
@@ -97,7 +113,8 @@ class FluxCouplingCommand(MetabolicMixin, SolverCommandMixin,
                         fluxcoupling.CouplingClass.DirectionalReverse):
             text = 'Directional, v1 / v2 in [{}, {}]'.format(lower, upper)
             if (coupling == fluxcoupling.CouplingClass.DirectionalReverse and
-                    not self._mm.is_reversible(reaction1) and lower == 0.0):
+                    not self._reduced.is_reversible(reaction1) and
+                    lower == 0.0):
                 return
         elif coupling == fluxcoupling.CouplingClass.Full:
             text = 'Full: v1 / v2 = {}'.format(lower)
@@ -153,9 +170,18 @@ class FluxCouplingCommand(MetabolicMixin, SolverCommandMixin,
 
 
 class FluxCouplingTaskHandler(object):
-    def __init__(self, model, thresholds, solver):
+    def __init__(self, model, thresholds, solver, reactions):
         self._problem = fluxcoupling.FluxCouplingProblem(
             model, thresholds, solver)
 
+        # Fluxes of solutions are returned in the order of reactions
+        index = {
+            reaction_id: i
+            for i, reaction_id in enumerate(self._problem.reactions)}
+        self._order = [index[reaction_id] for reaction_id in reactions]
+
     def handle_task(self, reaction_1, reaction_2):
-        return self._problem.solve(reaction_1, reaction_2)
+        bounds = self._problem.solve(reaction_1, reaction_2)
+        solutions = [[fluxes[i] for i in self._order]
+                     for fluxes in self._problem.solutions]
+        return bounds, solutions
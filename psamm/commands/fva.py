@@ -19,10 +19,10 @@ from __future__ import unicode_literals
 
 import time
 import logging
-from itertools import product
 
 from ..command import (Command, SolverCommandMixin, MetabolicMixin,
-                       ObjectiveMixin, LoopRemovalMixin, ParallelTaskMixin)
+                       ObjectiveMixin, LoopRemovalMixin, ParallelTaskMixin,
+                       PresolveMixin)
 from ..util import MaybeRelative
 from .. import fluxanalysis
 
@@ -31,7 +31,7 @@ logger = logging.getLogger(__name__)
 
 class FluxVariabilityCommand(MetabolicMixin, SolverCommandMixin,
                              LoopRemovalMixin, ObjectiveMixin,
-                             ParallelTaskMixin, Command):
+                             ParallelTaskMixin, PresolveMixin, Command):
     """Run flux variablity analysis on the model."""
 
     _supported_loop_removal = ['none', 'tfba']
@@ -60,15 +60,21 @@ class FluxVariabilityCommand(MetabolicMixin, SolverCommandMixin,
         loop_removal = self._get_loop_removal_option()
         enable_tfba = loop_removal == 'tfba'
         if enable_tfba:
+            if self._args.presolve:
+                self.argument_error(
+                    'Presolve is not possible with tfba loop removal')
             solver = self._get_solver(integer=True)
         else:
             solver = self._get_solver()
 
         start_time = time.time()
 
+        presolved = self._presolve_model(keep=[reaction])
+        model = self._mm if presolved is None else presolved.model
+
         try:
             fba_fluxes = dict(fluxanalysis.flux_balance(
-                self._mm, reaction, tfba=False, solver=solver))
+                model, reaction, tfba=False, solver=solver))
         except fluxanalysis.FluxBalanceError as e:
             self.report_flux_balance_error(e)
 
@@ -79,16 +85,21 @@ class FluxVariabilityCommand(MetabolicMixin, SolverCommandMixin,
         logger.info('Setting objective threshold to {}'.format(
             threshold))
 
+        coordinator = fluxanalysis.FluxVariabilityCoordinator(
+            model, model.reactions)
+
         handler_args = (
-            self._mm, solver, enable_tfba, float(threshold), reaction)
+            model, solver, enable_tfba, float(threshold), reaction,
+            coordinator.reactions)
         executor = self._create_executor(
             FVATaskHandler, handler_args, cpus_per_worker=2)
 
         def iter_results():
             results = {}
             with executor:
-                for (reaction_id, direction), value in executor.imap_unordered(
-                        product(self._mm.reactions, (1, -1)), 16):
+                task_results = executor.imap_unordered(coordinator.tasks())
+                for (reaction_id, direction), value in coordinator.results(
+                        task_results):
                     if reaction_id not in results:
                         results[reaction_id] = value
                         continue
@@ -103,7 +114,11 @@ class FluxVariabilityCommand(MetabolicMixin, SolverCommandMixin,
 
             executor.join()
 
-        for reaction_id, (lower, upper) in iter_results():
+        results = iter_results()
+        if presolved is not None:
+            results = presolved.expand_flux_bounds(dict(results))
+
+        for reaction_id, (lower, upper) in results:
             rx = self._mm.get_reaction(reaction_id)
             rxt = rx.translated_compounds(compound_name)
             print('{}\t{}\t{}\t{}'.format(reaction_id, lower, upper, rxt))
@@ -113,7 +128,8 @@ class FluxVariabilityCommand(MetabolicMixin, SolverCommandMixin,
 
 
 class FVATaskHandler(object):
-    def __init__(self, model, solver, enable_tfba, threshold, reaction):
+    def __init__(self, model, solver, enable_tfba, threshold, reaction,
+                 reactions):
         self._problem = fluxanalysis.FluxBalanceProblem(model, solver)
         if enable_tfba:
             self._problem.add_thermodynamic()
@@ -121,5 +137,21 @@ class FVATaskHandler(object):
         self._problem.prob.add_linear_constraints(
             self._problem.get_flux_var(reaction) >= threshold)
 
+        # Fluxes of solutions are returned in this order
+        self._reactions = reactions
+
+        # Bounds reached by the solutions found in this worker
+        self._tracker = fluxanalysis.FluxBoundTracker(model, reactions)
+
     def handle_task(self, reaction_id, direction):
-        return self._problem.flux_bound(reaction_id, direction)
+        bound = self._tracker.get_bound(reaction_id, direction)
+        if bound is not None:
+            return bound, None
+
+        bound = self._problem.flux_bound(reaction_id, direction)
+        if abs(bound) == float('inf'):
+            return bound, None
+
+        fluxes = self._problem.get_fluxes(self._reactions).tolist()
+        self._tracker.update(zip(self._reactions, fluxes))
+        return bound, fluxes
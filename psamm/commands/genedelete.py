@@ -105,13 +105,36 @@ class GeneDeletionCommand(MetabolicMixin, ObjectiveMixin, SolverCommandMixin,
 
             wild = prob.get_flux(obj_reaction)
 
-            for reaction in deleted_reactions:
-                flux_var = prob.get_flux_var(reaction)
-                prob.prob.add_linear_constraints(flux_var == 0)
+            with prob.knockout(deleted_reactions):
+                prob.maximize(obj_reaction)
+                deleteflux = prob.get_flux(obj_reaction)
+        elif self._args.method in ['lin_moma', 'moma']:
+            # The wild type is solved once and the knockout problem only
+            # contains the knockout fluxes.
+            try:
+                wt_fluxes = moma.minimal_fba_fluxes(
+                    self._mm, obj_reaction, solver)
+            except fluxanalysis.FluxBalanceError as e:
+                self.report_flux_balance_error(e)
+            wild = wt_fluxes[obj_reaction]
+
+            linear = self._args.method == 'lin_moma'
+            if linear:
+                logger.info('Solving using linear MOMA...')
+            else:
+                logger.info('Solving using MOMA...')
+
+            prob = moma.KnockoutMOMAProblem(
+                self._mm, solver, wt_fluxes, linear=linear)
+            try:
+                prob.solve(deleted_reactions)
+            except moma.MOMAError:
+                self.fail('Error computing the MOMA result.')
 
-            prob.maximize(obj_reaction)
             deleteflux = prob.get_flux(obj_reaction)
-        elif self._args.method in ['lin_moma', 'lin_moma2', 'moma', 'moma2']:
+            logger.info('Distance to wild type fluxes: {}'.format(
+                prob.get_distance()))
+        elif self._args.method in ['lin_moma2', 'moma2']:
             prob = moma.MOMAProblem(self._mm, solver)
             wt_fluxes = prob.get_minimal_fba_flux(obj_reaction)
             wild = wt_fluxes[obj_reaction]
@@ -121,13 +144,7 @@ class GeneDeletionCommand(MetabolicMixin, ObjectiveMixin, SolverCommandMixin,
                 prob.prob.add_linear_constraints(flux_var == 0)
 
             try:
-                if self._args.method == 'moma':
-                    logger.info('Solving using MOMA...')
-                    prob.moma(wt_fluxes)
-                elif self._args.method == 'lin_moma':
-                    logger.info('Solving using linear MOMA...')
-                    prob.lin_moma(wt_fluxes)
-                elif self._args.method == 'moma2':
+                if self._args.method == 'moma2':
                     logger.info('Solving using combined-model MOMA...')
                     prob.moma2(obj_reaction, wild)
                 elif self._args.method == 'lin_moma2':
@@ -0,0 +1,155 @@
+# This file is part of PSAMM.
+#
+# PSAMM is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PSAMM is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PSAMM.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Copyright 2014-2017  Jon Lund Steffensen <jon_steffensen@uri.edu>
+
+from __future__ import unicode_literals
+
+import time
+import logging
+from collections import deque
+
+from six import text_type
+
+from ..command import (Command, MetabolicMixin, ObjectiveMixin,
+                       SolverCommandMixin, ParallelTaskMixin,
+                       FilePrefixAppendAction)
+from .. import fluxanalysis, moma, randomsparse
+from ..genescreen import (GeneKnockoutMap, GeneKnockoutProblem,
+                          iter_gene_knockouts)
+
+logger = logging.getLogger(__name__)
+
+
+class GeneScreenCommand(MetabolicMixin, ObjectiveMixin, SolverCommandMixin,
+                        ParallelTaskMixin, Command):
+    """Screen single (and optionally double) gene knockouts.
+
+    Reports the number of deleted reactions and the objective flux for each
+    knockout. Knockouts that delete the same set of reactions are only
+    solved once.
+    """
+
+    @classmethod
+    def init_parser(cls, parser):
+        parser.add_argument(
+            '--gene', metavar='genes', action=FilePrefixAppendAction,
+            type=str, default=[],
+            help='Genes to knock out (default: all genes of the model)')
+        parser.add_argument(
+            '--pairs', action='store_true',
+            help='Also screen all pairwise gene knockouts')
+        parser.add_argument(
+            '--method', metavar='method',
+            choices=['fba', 'lin_moma', 'moma'],
+            type=text_type, default='fba',
+            help='Select which method to use. (fba, lin_moma, moma)')
+        super(GeneScreenCommand, cls).init_parser(parser)
+
+    def run(self):
+        """Run gene knockout screen."""
+        obj_reaction = self._get_objective()
+        if not self._mm.has_reaction(obj_reaction):
+            self.fail(
+                'Specified reaction is not in model: {}'.format(obj_reaction))
+
+        method = self._args.method
+        if method == 'moma':
+            solver = self._get_solver(quadratic=True)
+        else:
+            solver = self._get_solver()
+
+        gene_assoc = {
+            reaction_id: assoc for reaction_id, assoc in
+            randomsparse.get_gene_associations(self._model)
+            if self._mm.has_reaction(reaction_id)}
+        knockout_map = GeneKnockoutMap(gene_assoc)
+
+        genes = knockout_map.genes
+        if len(self._args.gene) > 0:
+            genes = set(self._args.gene)
+            unknown = genes - knockout_map.genes
+            if len(unknown) > 0:
+                logger.warning('Genes not associated with any reaction: {}'
+                               .format(', '.join(sorted(unknown))))
+
+        start_time = time.time()
+
+        # Wild type solution is shared by all knockouts
+        wt_fluxes = None
+        try:
+            if method == 'fba':
+                problem = fluxanalysis.FluxBalanceProblem(self._mm, solver)
+                problem.maximize(obj_reaction)
+                wt_flux = problem.get_flux(obj_reaction)
+            else:
+                wt_fluxes = moma.minimal_fba_fluxes(
+                    self._mm, obj_reaction, solver)
+                wt_flux = wt_fluxes[obj_reaction]
+        except fluxanalysis.FluxBalanceError:
+            self.fail('Unable to solve wild type model')
+
+        logger.info('Wild type objective flux: {}'.format(wt_flux))
+
+        results = {frozenset(): wt_flux}
+        pending = {}
+        ready = deque()
+
+        def iter_tasks():
+            for knockout_genes, deleted in iter_gene_knockouts(
+                    knockout_map, genes, self._args.pairs):
+                if deleted in results:
+                    ready.append((knockout_genes, deleted))
+                elif deleted in pending:
+                    pending[deleted].append(knockout_genes)
+                else:
+                    pending[deleted] = [knockout_genes]
+                    yield tuple(sorted(deleted)),
+
+        def print_result(knockout_genes, deleted):
+            flux = results[deleted]
+            print('{}\t{}\t{}'.format(
+                ','.join(knockout_genes), len(deleted),
+                'NA' if flux is None else flux))
+
+        handler_args = self._mm, solver, obj_reaction, method, wt_fluxes
+        executor = self._create_executor(GeneScreenTaskHandler, handler_args)
+
+        with executor:
+            for (reactions,), flux in executor.imap_unordered(iter_tasks()):
+                deleted = frozenset(reactions)
+                results[deleted] = flux
+                for knockout_genes in pending.pop(deleted):
+                    print_result(knockout_genes, deleted)
+
+                while len(ready) > 0:
+                    print_result(*ready.popleft())
+
+        executor.join()
+
+        while len(ready) > 0:
+            print_result(*ready.popleft())
+
+        logger.info('Solved {} unique knockouts in {:.2f} seconds'.format(
+            len(results) - 1, time.time() - start_time))
+
+
+class GeneScreenTaskHandler(object):
+    def __init__(self, model, solver, objective, method, wt_fluxes):
+        self._problem = GeneKnockoutProblem(
+            model, solver, objective, method, wt_fluxes)
+
+    def handle_task(self, reactions):
+        return self._problem.solve(reactions)
@@ -17,17 +17,81 @@
 
 from __future__ import unicode_literals
 
+import sys
 import time
+import array
+import struct
 import logging
 
 from ..command import (Command, MetabolicMixin, LoopRemovalMixin,
                        ObjectiveMixin, SolverCommandMixin, ParallelTaskMixin)
 from .. import fluxanalysis
 
-from six.moves import range
+from six import text_type
+from six.moves import range, reduce
 
 logger = logging.getLogger(__name__)
 
+# Relative tolerance of fixed fluxes that are outside of the flux bounds
+_BOUND_TOLERANCE = 1e-9
+
+
+def _flux_steps(flux_min, flux_max, steps):
+    """Return list of steps evenly spaced flux values in the range."""
+    if steps == 1:
+        return [flux_min]
+    return [flux_min + i*(flux_max - flux_min)/float(steps-1)
+            for i in range(steps)]
+
+
+def _hilbert_curve(width, height):
+    """Yield the (x, y)-points of a grid in the order of a Hilbert curve.
+
+    Consecutive points of the curve are neighbors in the grid, except where
+    the curve leaves the grid when the sides are not equal powers of two.
+    """
+    order = 1
+    while order < max(width, height):
+        order *= 2
+
+    for d in range(order * order):
+        x = y = 0
+        s = 1
+        while s < order:
+            rx = 1 & (d // 2)
+            ry = 1 & (d ^ rx)
+            if ry == 0:
+                if rx == 1:
+                    x, y = s - 1 - x, s - 1 - y
+                x, y = y, x
+            x += s * rx
+            y += s * ry
+            d //= 4
+            s *= 2
+        if x < width and y < height:
+            yield x, y
+
+
+def _write_npy(f, shape, values):
+    """Write values as an array of doubles in the NumPy ``.npy`` format.
+
+    The file can be loaded with :func:`numpy.load` but NumPy is not
+    needed for writing it.
+    """
+    header = "{{'descr': '<f8', 'fortran_order': False, 'shape': ({}), }}"
+    header = header.format(''.join('{},'.format(n) for n in shape))
+
+    # Magic string, version, header length and header is padded to 64 bytes
+    header += ' ' * (-(len(header) + 11) % 64) + '\n'
+    f.write(b'\x93NUMPY\x01\x00')
+    f.write(struct.pack(str('<H'), len(header)))
+    f.write(header.encode('latin-1'))
+
+    data = array.array(str('d'), values)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    data.tofile(f)
+
 
 class RobustnessCommand(MetabolicMixin, LoopRemovalMixin, ObjectiveMixin,
                         SolverCommandMixin, ParallelTaskMixin, Command):
@@ -38,6 +102,8 @@ class RobustnessCommand(MetabolicMixin, LoopRemovalMixin, ObjectiveMixin,
     reaction to vary at each iteration. The reaction will
     be fixed at the specified number of steps between the
     minimum and maximum flux value specified in the model.
+    If a second reaction is given with ``--phase-plane``, both
+    reactions are fixed at each point of a grid.
     """
 
     _supported_loop_removal = ['none', 'tfba', 'l1min']
@@ -57,6 +123,22 @@ class RobustnessCommand(MetabolicMixin, LoopRemovalMixin, ObjectiveMixin,
             '--all-reaction-fluxes',
             help='Print reaction flux for all model reactions',
             action='store_true')
+        parser.add_argument(
+            '--phase-plane', metavar='reaction', type=text_type,
+            help='Second reaction to vary (phenotypic phase plane)')
+        parser.add_argument(
+            '--phase-plane-minimum', metavar='V', type=float,
+            help='Minimum flux value of second varying reaction')
+        parser.add_argument(
+            '--phase-plane-maximum', metavar='V', type=float,
+            help='Maximum flux value of second varying reaction')
+        parser.add_argument(
+            '--output-array', metavar='file', type=text_type,
+            help='Write results as a dense array in NumPy .npy format')
+        parser.add_argument(
+            '--parametric', action='store_true',
+            help='Find the exact breakpoints of the objective flux instead'
+                 ' of using steps')
         parser.add_argument('varying', help='Reaction to vary')
         super(RobustnessCommand, cls).init_parser(parser)
 
@@ -68,16 +150,32 @@ class RobustnessCommand(MetabolicMixin, LoopRemovalMixin, ObjectiveMixin,
             self.fail('Specified biomass reaction is not in model: {}'.format(
                 reaction))
 
-        varying_reaction = self._args.varying
-        if not self._mm.has_reaction(varying_reaction):
-            self.fail('Specified varying reaction is not in model: {}'.format(
-                varying_reaction))
+        varying_reactions = [self._args.varying]
+        if self._args.phase_plane is not None:
+            varying_reactions.append(self._args.phase_plane)
+        for varying_reaction in varying_reactions:
+            if not self._mm.has_reaction(varying_reaction):
+                self.fail(
+                    'Specified varying reaction is not in model: {}'.format(
+                        varying_reaction))
 
         steps = self._args.steps
         if steps <= 0:
             self.argument_error('Invalid number of steps: {}\n'.format(steps))
 
         loop_removal = self._get_loop_removal_option()
+        if self._args.parametric:
+            if loop_removal == 'tfba':
+                self.argument_error(
+                    'Thermodynamic constraints cannot be used with'
+                    ' --parametric')
+            for option in (
+                    'phase_plane', 'output_array', 'all_reaction_fluxes'):
+                if getattr(self._args, option):
+                    self.argument_error(
+                        '--{} cannot be used with --parametric'.format(
+                            option.replace('_', '-')))
+
         if loop_removal == 'tfba':
             solver = self._get_solver(integer=True)
         else:
@@ -92,25 +190,53 @@ class RobustnessCommand(MetabolicMixin, LoopRemovalMixin, ObjectiveMixin,
         except fluxanalysis.FluxBalanceError as e:
             self.report_flux_balance_error(e)
 
-        # Determine minimum and maximum flux for varying reaction
-        if self._args.maximum is None:
-            p.maximize(varying_reaction)
-            flux_max = p.get_flux(varying_reaction)
+        # Determine minimum and maximum flux for varying reactions
+        ranges = [(self._args.minimum, self._args.maximum),
+                  (self._args.phase_plane_minimum,
+                   self._args.phase_plane_maximum)]
+        axes = []
+        for varying_reaction, (flux_min, flux_max) in zip(
+                varying_reactions, ranges):
+            if flux_max is None:
+                p.maximize(varying_reaction)
+                flux_max = p.get_flux(varying_reaction)
+
+            if flux_min is None:
+                p.maximize({varying_reaction: -1})
+                flux_min = p.get_flux(varying_reaction)
+
+            if flux_min > flux_max:
+                self.argument_error('Invalid flux range: {}, {}\n'.format(
+                    flux_min, flux_max))
+
+            if self._args.parametric:
+                self._run_parametric(
+                    p, reaction, varying_reaction, flux_min, flux_max)
+                return
+
+            logger.info('Varying {} in {} steps between {} and {}'.format(
+                varying_reaction, steps, flux_min, flux_max))
+            axes.append(_flux_steps(flux_min, flux_max, steps))
+
+        # Consecutive tasks are solved by the same worker so the points are
+        # visited along a Hilbert curve where neighboring points are close.
+        if len(axes) == 1:
+            points = [(i,) for i in range(steps)]
         else:
-            flux_max = self._args.maximum
+            points = list(_hilbert_curve(steps, steps))
 
-        if self._args.minimum is None:
-            p.maximize({varying_reaction: -1})
-            flux_min = p.get_flux(varying_reaction)
+        if self._args.all_reaction_fluxes:
+            reactions = list(self._mm.reactions)
         else:
-            flux_min = self._args.minimum
+            reactions = None
 
-        if flux_min > flux_max:
-            self.argument_error('Invalid flux range: {}, {}\n'.format(
-                flux_min, flux_max))
-
-        logger.info('Varying {} in {} steps between {} and {}'.format(
-            varying_reaction, steps, flux_min, flux_max))
+        array_values = None
+        if self._args.output_array is not None:
+            shape = tuple(len(values) for values in axes)
+            if reactions is not None:
+                shape += (len(reactions),)
+            array_values = [float('nan')] * reduce(
+                lambda a, b: a * b, shape, 1)
 
         start_time = time.time()
 
@@ -120,35 +246,84 @@ class RobustnessCommand(MetabolicMixin, LoopRemovalMixin, ObjectiveMixin,
             RobustnessTaskHandler, handler_args, cpus_per_worker=2)
 
         def iter_tasks():
-            for i in range(steps):
-                fixed_flux = flux_min + i*(flux_max - flux_min)/float(steps-1)
-                constraint = varying_reaction, fixed_flux
-                yield constraint, reaction
+            for point in points:
+                fixed = tuple(
+                    (varying_reaction, values[i]) for varying_reaction,
+                    values, i in zip(varying_reactions, axes, point))
+                yield (point, fixed), reaction
 
         # Run FBA on model at different fixed flux values
         with executor:
-            for task, result in executor.imap_unordered(iter_tasks(), 16):
-                (varying_reaction, fixed_flux), _ = task
+            for task, result in executor.imap_unordered(iter_tasks()):
+                (point, fixed), _ = task
+                fixed_text = '\t'.join(text_type(flux) for _, flux in fixed)
                 if result is None:
-                    logger.warning('No solution found for {} at {}'.format(
-                        varying_reaction, fixed_flux))
-                elif self._args.all_reaction_fluxes:
-                    for other_reaction in self._mm.reactions:
+                    logger.warning('No solution found for {}'.format(
+                        ', '.join('{} at {}'.format(r, flux)
+                                  for r, flux in fixed)))
+                    continue
+
+                if reactions is not None:
+                    for other_reaction in reactions:
                         print('{}\t{}\t{}'.format(
-                            other_reaction, fixed_flux,
+                            other_reaction, fixed_text,
                             result[other_reaction]))
                 else:
-                    print('{}\t{}'.format(fixed_flux, result))
+                    print('{}\t{}'.format(fixed_text, result))
+
+                if array_values is not None:
+                    offset = 0
+                    for n, i in zip(shape, point):
+                        offset = offset * n + i
+                    if reactions is None:
+                        array_values[offset] = result
+                    else:
+                        offset *= len(reactions)
+                        for k, other_reaction in enumerate(reactions):
+                            array_values[offset + k] = result[other_reaction]
 
         executor.join()
 
         logger.info('Solving took {:.2f} seconds'.format(
             time.time() - start_time))
 
+        if array_values is not None:
+            try:
+                with open(self._args.output_array, 'wb') as f:
+                    _write_npy(f, shape, array_values)
+            except IOError as e:
+                self.fail('Unable to write array to {}: {}'.format(
+                    self._args.output_array, e), exc=e)
+
+    def _run_parametric(self, p, reaction, varying_reaction, flux_min,
+                        flux_max):
+        """Print the breakpoints of the objective flux in the range."""
+        logger.info('Finding breakpoints of {} between {} and {}'.format(
+            varying_reaction, flux_min, flux_max))
+
+        # The objective flux is the same with L1 minimization so only the
+        # maximization is needed.
+        start_time = time.time()
+        try:
+            breakpoints, solves = fluxanalysis.objective_breakpoints(
+                p, reaction, varying_reaction, flux_min, flux_max)
+        except ValueError as e:
+            self.argument_error('{}\n'.format(e))
+        except fluxanalysis.FluxBalanceError as e:
+            self.report_flux_balance_error(e)
+
+        for fixed_flux, result in breakpoints:
+            print('{}\t{}'.format(fixed_flux, result))
+
+        logger.info('Found {} breakpoints using {} solves in {:.2f}'
+                    ' seconds'.format(
+                        len(breakpoints), solves, time.time() - start_time))
+
 
 class RobustnessTaskHandler(object):
     def __init__(self, model, solver, loop_removal, all_reactions):
         self._problem = fluxanalysis.FluxBalanceProblem(model, solver)
+        self._limits = model.limits
 
         if loop_removal == 'none':
             self._run_fba = self._problem.maximize
@@ -160,19 +335,32 @@ class RobustnessTaskHandler(object):
 
         self._reactions = list(model.reactions) if all_reactions else None
 
-    def handle_task(self, constraint, reaction):
-        varying_reaction, fixed_flux = constraint
-        flux_var = self._problem.get_flux_var(varying_reaction)
-        c, = self._problem.prob.add_linear_constraints(flux_var == fixed_flux)
-
-        try:
-            self._run_fba(reaction)
-            if self._reactions is not None:
-                return {reaction: self._problem.get_flux(reaction)
-                        for reaction in self._reactions}
-            else:
-                return self._problem.get_flux(reaction)
-        except fluxanalysis.FluxBalanceError:
-            return None
-        finally:
-            c.delete()
+    def handle_task(self, grid_point, reaction):
+        _, fixed = grid_point
+
+        # Fluxes are fixed by changing the flux bounds so the solver can
+        # start from the solution of the previous task.
+        bounds = {}
+        for varying_reaction, fixed_flux in fixed:
+            # Steps at the ends of the range can be outside of the flux
+            # bounds because of rounding so these are moved to the bound.
+            lower, upper = self._limits[varying_reaction].bounds
+            if fixed_flux < lower:
+                if lower - fixed_flux > _BOUND_TOLERANCE * max(1, abs(lower)):
+                    return None
+                fixed_flux = lower
+            elif fixed_flux > upper:
+                if fixed_flux - upper > _BOUND_TOLERANCE * max(1, abs(upper)):
+                    return None
+                fixed_flux = upper
+            bounds[varying_reaction] = fixed_flux, fixed_flux
+
+        with self._problem.flux_bounds(bounds):
+            try:
+                self._run_fba(reaction)
+                if self._reactions is not None:
+                    return dict(self._problem.get_fluxes(self._reactions))
+                else:
+                    return self._problem.get_flux(reaction)
+            except fluxanalysis.FluxBalanceError:
+                return None
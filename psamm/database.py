@@ -63,8 +63,7 @@ class StoichiometricMatrixView(Mapping):
                 yield compound, reaction
 
     def __len__(self):
-        return sum(sum(1 for _ in self._database.get_reaction_values(reaction))
-                   for reaction in self._database.reactions)
+        return self._database.sparse_matrix.nnz
 
     def __array__(self):
         """Return Numpy ndarray instance of matrix.
@@ -73,24 +72,224 @@ class StoichiometricMatrixView(Mapping):
         """
         import numpy  # NumPy is only required for this method
 
-        compound_list = sorted(self._database.compounds)
-        reaction_list = sorted(self._database.reactions)
-        matrix = numpy.zeros((len(compound_list), len(reaction_list)))
+        sparse = self._database.sparse_matrix
+        compound_order = sorted(
+            range(len(sparse.compounds)), key=lambda i: sparse.compounds[i])
+        reaction_order = sorted(
+            range(len(sparse.reactions)), key=lambda j: sparse.reactions[j])
+
+        # Map from index in the sparse matrix to index in the sorted matrix
+        compound_map = [0] * len(compound_order)
+        for i, index in enumerate(compound_order):
+            compound_map[index] = i
+        reaction_map = [0] * len(reaction_order)
+        for j, index in enumerate(reaction_order):
+            reaction_map[index] = j
+
+        matrix = numpy.zeros(sparse.shape)
+        for j, column in enumerate(sparse.columns):
+            for i, value in column:
+                matrix[compound_map[i], reaction_map[j]] = value
+
+        return matrix
 
-        compound_map = dict(
-            (compound, i) for i, compound in enumerate(compound_list))
-        reaction_map = dict(
-            (reaction_id, i) for i, reaction_id in enumerate(reaction_list))
 
-        for reaction_id in self._database.reactions:
-            for compound, value in self._database.get_reaction_values(
-                    reaction_id):
-                c_index = compound_map[compound]
-                r_index = reaction_map[reaction_id]
-                matrix[c_index, r_index] = value
+class SparseStoichiometricMatrix(object):
+    """Indexed sparse representation of a stoichiometric matrix.
+
+    The rows of the matrix correspond to compounds and the columns correspond
+    to reactions. The order of rows and columns is given by
+    :attr:`compounds` and :attr:`reactions`, and the index of a specific
+    compound or reaction can be looked up in :attr:`compound_index` and
+    :attr:`reaction_index`. Reactions that are added with
+    :meth:`add_reaction` are appended as new columns (and new compounds as
+    new rows) so the existing indices remain valid.
+
+    The matrix exposes the attributes ``shape``, ``indptr``, ``indices`` and
+    ``data`` of the compressed sparse row format. These are computed when
+    first accessed after a change. This means that the matrix can be passed
+    directly to
+    :meth:`Problem.add_linear_constraints_matrix
+    <psamm.lpsolver.lp.Problem.add_linear_constraints_matrix>`, or converted
+    with :meth:`to_scipy`.
+
+    >>> matrix = model.sparse_matrix
+    >>> j = matrix.reaction_index['ACK']
+    >>> [(matrix.compounds[i], value) for i, value in matrix.columns[j]]
+    """
 
+    def __init__(self):
+        self.compounds = []
+        self.reactions = []
+        self.compound_index = {}
+        self.reaction_index = {}
+        self._columns = []
+        self._csr = None
+
+    @classmethod
+    def from_database(cls, database, reactions=None):
+        """Create matrix from the reactions in a database.
+
+        If reactions is not given, all reactions in the database are used.
+        """
+        matrix = cls()
+        if reactions is None:
+            reactions = database.reactions
+        for reaction_id in reactions:
+            matrix.add_reaction(
+                reaction_id, database.get_reaction_values(reaction_id))
         return matrix
 
+    @classmethod
+    def from_csr(cls, compounds, reactions, indptr, indices, data):
+        """Create matrix from arrays in compressed sparse row format.
+
+        The arrays are used directly (without copying) so they can be backed
+        by shared memory. The columns are only created if accessed.
+        """
+        matrix = cls()
+        matrix.compounds = list(compounds)
+        matrix.reactions = list(reactions)
+        matrix.compound_index = {
+            compound: i for i, compound in enumerate(matrix.compounds)}
+        matrix.reaction_index = {
+            reaction_id: j for j, reaction_id in enumerate(matrix.reactions)}
+        if len(indptr) != len(matrix.compounds) + 1:
+            raise ValueError('Invalid length of indptr: {}'.format(
+                len(indptr)))
+        matrix._columns = None
+        matrix._csr = indptr, indices, data
+        return matrix
+
+    @property
+    def columns(self):
+        """List of (row index, value)-pairs for each column."""
+        if self._columns is None:
+            indptr, indices, data = self._csr
+            columns = [[] for _ in self.reactions]
+            for i in range(len(self.compounds)):
+                for k in range(indptr[i], indptr[i + 1]):
+                    columns[indices[k]].append((i, data[k]))
+            self._columns = columns
+        return self._columns
+
+    def add_reaction(self, reaction_id, values):
+        """Append reaction as a new column of the matrix.
+
+        The values are given as an iterable of (compound, value)-pairs.
+        """
+        if reaction_id in self.reaction_index:
+            raise ValueError('Reaction already in matrix: {}'.format(
+                reaction_id))
+
+        column = []
+        for compound, value in values:
+            if compound not in self.compound_index:
+                self.compound_index[compound] = len(self.compounds)
+                self.compounds.append(compound)
+            column.append((self.compound_index[compound], value))
+        column.sort()
+
+        self.reaction_index[reaction_id] = len(self.reactions)
+        self.reactions.append(reaction_id)
+        self.columns.append(column)
+        self._csr = None
+
+    def copy(self):
+        """Return copy of matrix."""
+        matrix = self.__class__()
+        matrix.compounds = list(self.compounds)
+        matrix.reactions = list(self.reactions)
+        matrix.compound_index = dict(self.compound_index)
+        matrix.reaction_index = dict(self.reaction_index)
+        matrix._columns = list(self.columns)
+        matrix._csr = self._csr
+        return matrix
+
+    def flipped(self, reactions):
+        """Return copy of matrix with the given reaction columns negated."""
+        matrix = self.copy()
+        for reaction_id in reactions:
+            j = self.reaction_index.get(reaction_id)
+            if j is not None:
+                matrix.columns[j] = [(i, -value) for i, value in
+                                     self.columns[j]]
+                matrix._csr = None
+        return matrix
+
+    def _get_csr(self):
+        if self._csr is None:
+            rows = [[] for _ in self.compounds]
+            for j, column in enumerate(self.columns):
+                for i, value in column:
+                    rows[i].append((j, value))
+
+            indptr = [0]
+            indices = []
+            data = []
+            for row in rows:
+                for j, value in row:
+                    indices.append(j)
+                    data.append(value)
+                indptr.append(len(indices))
+            self._csr = indptr, indices, data
+
+        return self._csr
+
+    @property
+    def shape(self):
+        """Number of compounds and number of reactions."""
+        return len(self.compounds), len(self.reactions)
+
+    @property
+    def nnz(self):
+        """Number of stored values."""
+        if self._csr is not None:
+            return len(self._csr[2])
+        return sum(len(column) for column in self._columns)
+
+    @property
+    def indptr(self):
+        """Index of the first value of each row (CSR format)."""
+        return self._get_csr()[0]
+
+    @property
+    def indices(self):
+        """Column index of each value (CSR format)."""
+        return self._get_csr()[1]
+
+    @property
+    def data(self):
+        """Stoichiometric values ordered by row (CSR format)."""
+        return self._get_csr()[2]
+
+    def to_scipy(self):
+        """Return matrix as :class:`scipy.sparse.csr_matrix`."""
+        import scipy.sparse  # SciPy is only required for this method
+
+        return scipy.sparse.csr_matrix(
+            ([float(value) for value in self.data], self.indices,
+             self.indptr), shape=self.shape)
+
+    def __array__(self):
+        """Return Numpy ndarray instance of matrix.
+
+        The matrix is indexed as given by :attr:`compound_index` and
+        :attr:`reaction_index`.
+        """
+        import numpy  # NumPy is only required for this method
+
+        matrix = numpy.zeros(self.shape)
+        for j, column in enumerate(self.columns):
+            for i, value in column:
+                matrix[i, j] = value
+        return matrix
+
+    def __repr__(self):
+        return str('<{} {}x{}, {} non-zero>').format(
+            self.__class__.__name__, len(self.compounds),
+            len(self.reactions), self.nnz)
+
 
 @add_metaclass(abc.ABCMeta)
 class MetabolicDatabase(object):
@@ -147,6 +346,16 @@ class MetabolicDatabase(object):
         This is an instance of :class:`StoichiometricMatrixView`."""
         return StoichiometricMatrixView(self)
 
+    @property
+    def sparse_matrix(self):
+        """Indexed sparse stoichiometric matrix.
+
+        This is an instance of :class:`SparseStoichiometricMatrix`. The
+        matrix is created from the current reactions every time the
+        property is accessed. Subclasses may cache the matrix.
+        """
+        return SparseStoichiometricMatrix.from_database(self)
+
     def get_reaction(self, reaction_id):
         """Return reaction as a :class:`Reaction <psamm.reaction.Reaction>`."""
 
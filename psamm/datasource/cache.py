@@ -0,0 +1,274 @@
+# This file is part of PSAMM.
+#
+# PSAMM is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PSAMM is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PSAMM.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Copyright 2014-2017  Jon Lund Steffensen <jon_steffensen@uri.edu>
+
+"""On-disk cache of parsed native models.
+
+Parsing the YAML and table files of a large model can take a long time. The
+:class:`ModelCache` stores the fully parsed
+:class:`NativeModel <psamm.datasource.native.NativeModel>` in a pickle file
+in the ``.psamm-cache`` directory next to the model file. The cache entry
+records the size, modification time and SHA-1 hash of every file that was
+read when the model was parsed. The cached model is only used if all these
+files are unchanged (files with a changed modification time are hashed
+again so touching a file does not invalidate the cache).
+
+The version string of the model is normally obtained by running
+``git describe``. To avoid starting a subprocess when the cached model is
+used, the cache records the Git HEAD and the modification time of the Git
+index and only runs ``git describe`` again if these have changed.
+"""
+
+from __future__ import unicode_literals
+
+import os
+import sys
+import hashlib
+import logging
+import pickle
+import tempfile
+
+from .native import ModelReader
+from .. import util, __version__ as package_version
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = '.psamm-cache'
+
+# Increment when the format of the cache entries or the parsed model changes
+CACHE_VERSION = 1
+
+
+def _file_hash(path):
+    """Return SHA-1 hex digest of file content."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _file_stamp(path):
+    """Return (size, modification time) of file."""
+    st = os.stat(path)
+    return st.st_size, getattr(st, 'st_mtime_ns', st.st_mtime)
+
+
+def _find_git_dir(path):
+    """Return path of .git in the repository containing path (or None)."""
+    path = os.path.abspath(path)
+    while True:
+        git_dir = os.path.join(path, '.git')
+        if os.path.exists(git_dir):
+            return git_dir
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _git_state(path):
+    """Return state of the Git repository that determines the version string.
+
+    Returns a tuple of the HEAD reference, the commit of the reference and
+    the modification time of the index, or False if the path is not in a
+    repository. Returns None if the state cannot be determined without
+    running Git.
+    """
+    git_dir = _find_git_dir(path)
+    if git_dir is None:
+        return False
+    elif not os.path.isdir(git_dir):
+        # Worktrees and submodules use a file pointing to the directory
+        return None
+
+    try:
+        with open(os.path.join(git_dir, 'HEAD'), 'r') as f:
+            head = f.read().strip()
+
+        commit = None
+        if head.startswith('ref: '):
+            ref = head[5:]
+            ref_path = os.path.join(git_dir, *ref.split('/'))
+            if os.path.exists(ref_path):
+                with open(ref_path, 'r') as f:
+                    commit = f.read().strip()
+            else:
+                with open(os.path.join(git_dir, 'packed-refs'), 'r') as f:
+                    for line in f:
+                        fields = line.split()
+                        if len(fields) == 2 and fields[1] == ref:
+                            commit = fields[0]
+                            break
+
+        index_path = os.path.join(git_dir, 'index')
+        index_stamp = None
+        if os.path.exists(index_path):
+            index_stamp = _file_stamp(index_path)
+    except (IOError, OSError):
+        return None
+
+    return head, commit, index_stamp
+
+
+class ModelCache(object):
+    """Cache of parsed native models.
+
+    Args:
+        cache_dir: Directory of the cache files. By default the cache is
+            placed in the directory ``.psamm-cache`` next to the model file.
+    """
+
+    def __init__(self, cache_dir=None):
+        self._cache_dir = cache_dir
+
+    def _cache_path(self, model_path):
+        cache_dir = self._cache_dir
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(model_path), CACHE_DIR)
+
+        # Interpreter version is included since pickles of the model are not
+        # compatible between Python 2 and 3.
+        key = '{}\0{}.{}'.format(
+            os.path.abspath(model_path), *sys.version_info[:2])
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(cache_dir, name + '.pickle')
+
+    def load_model(self, path, processes=1):
+        """Return :class:`NativeModel` of the model at path.
+
+        The model is loaded from the cache if the cache entry is valid.
+        Otherwise, the model is parsed and stored in the cache.
+
+        Args:
+            path: Path of the model file or directory.
+            processes: Number of processes used to parse the model (see
+                :meth:`.ModelReader.create_model`).
+        """
+        reader = ModelReader.reader_from_path(path)
+        if reader.context is None or reader.context.filepath is None:
+            return reader.create_model(processes=processes)
+
+        model_path = reader.context.filepath
+        cache_path = self._cache_path(model_path)
+        basepath = os.path.dirname(os.path.abspath(model_path))
+
+        entry = self._read_entry(cache_path)
+        if entry is not None:
+            files = self._validate_files(entry['files'])
+            if files is not None:
+                model = entry['model']
+                changed = files != entry['files']
+                entry['files'] = files
+
+                git_state = _git_state(basepath)
+                if git_state is None or git_state != entry['git']:
+                    model.version_string = util.git_try_describe(
+                        reader.context.basepath)
+                    changed = True
+
+                    # Git may update the index when describing
+                    entry['git'] = _git_state(basepath)
+
+                if changed:
+                    self._write_entry(cache_path, entry)
+                logger.debug('Loaded model from cache {}'.format(cache_path))
+                return model
+
+        opened = reader.context.record_opened()
+        model = reader.create_model(processes=processes)
+
+        try:
+            files = [(p, _file_stamp(p), _file_hash(p))
+                     for p in sorted(os.path.abspath(p) for p in opened)]
+        except (IOError, OSError):
+            logger.debug('Unable to read model files for cache',
+                         exc_info=True)
+            return model
+
+        self._write_entry(cache_path, {
+            'version': CACHE_VERSION,
+            'psamm': package_version,
+            'files': files,
+            'git': _git_state(basepath),
+            'model': model
+        })
+
+        return model
+
+    def _read_entry(self, cache_path):
+        """Return cache entry or None if not available."""
+        if not os.path.exists(cache_path):
+            return None
+
+        try:
+            with open(cache_path, 'rb') as f:
+                entry = pickle.load(f)
+        except Exception:
+            # Any error here (e.g. truncated file or pickle of incompatible
+            # classes) just means the cache cannot be used.
+            logger.debug('Unable to read model cache {}'.format(cache_path),
+                         exc_info=True)
+            return None
+
+        if (not isinstance(entry, dict) or
+                entry.get('version') != CACHE_VERSION or
+                entry.get('psamm') != package_version):
+            return None
+
+        return entry
+
+    def _validate_files(self, files):
+        """Return updated list of files or None if any file has changed."""
+        result = []
+        for path, stamp, digest in files:
+            try:
+                current_stamp = _file_stamp(path)
+                if current_stamp != stamp:
+                    if (current_stamp[0] != stamp[0] or
+                            _file_hash(path) != digest):
+                        return None
+            except (IOError, OSError):
+                return None
+            result.append((path, current_stamp, digest))
+
+        return result
+
+    def _write_entry(self, cache_path, entry):
+        """Write cache entry, ignoring errors."""
+        cache_dir = os.path.dirname(cache_path)
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+
+            # Write to temporary file first so that concurrent readers never
+            # see a partially written entry.
+            fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(entry, f, -1)
+                if hasattr(os, 'replace'):
+                    os.replace(temp_path, cache_path)
+                else:
+                    if os.path.exists(cache_path):
+                        os.remove(cache_path)
+                    os.rename(temp_path, cache_path)
+            except Exception:
+                os.remove(temp_path)
+                raise
+        except Exception:
+            logger.debug('Unable to write model cache {}'.format(cache_path),
+                         exc_info=True)
@@ -42,11 +42,13 @@ class FilePathContext(object):
     def __init__(self, arg):
         """Create new context from a path or existing context"""
 
+        self._opened = None
         if arg is not None:
             if isinstance(arg, string_types):
                 self._filepath = arg
             else:
                 self._filepath = arg.filepath
+                self._opened = getattr(arg, '_opened', None)
 
             if self._filepath is not None:
                 self._basepath = os.path.dirname(self._filepath)
@@ -64,14 +66,39 @@ class FilePathContext(object):
     def basepath(self):
         return self._basepath
 
+    @property
+    def opened_files(self):
+        """Set of files opened through this context (or None).
+
+        Recording of opened files is started with :meth:`record_opened`.
+        """
+        return self._opened
+
+    def record_opened(self):
+        """Record files opened through this context.
+
+        Contexts derived from this context (using :meth:`resolve` or the
+        constructor) record the opened files in the same set. This is used
+        to find all the files that a model was loaded from.
+        """
+        if self._opened is None:
+            self._opened = set()
+            if self._filepath is not None:
+                self._opened.add(self._filepath)
+        return self._opened
+
     def resolve(self, relpath):
         if self._basepath is None:
             raise ContextError('Context is a null context')
-        return FilePathContext(os.path.join(self._basepath, relpath))
+        context = FilePathContext(os.path.join(self._basepath, relpath))
+        context._opened = self._opened
+        return context
 
     def open(self, mode='r'):
         if self._basepath is None:
             raise ContextError('Context is a null context')
+        if self._opened is not None:
+            self._opened.add(self._filepath)
         return open(self.filepath, mode)
 
     def __str__(self):
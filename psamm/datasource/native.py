@@ -31,6 +31,7 @@ import re
 import csv
 import math
 from collections import OrderedDict
+import multiprocessing as mp
 
 import yaml
 from six import string_types, text_type, iteritems, itervalues, PY3
@@ -56,6 +57,10 @@ _HAS_YAML_LIBRARY = None
 
 _REACTION_PARSER = ReactionParser()
 
+# Minimum number of included files before they are parsed in parallel when
+# the number of processes is not given.
+_PARALLEL_MIN_INCLUDES = 16
+
 
 class ParseError(Exception):
     """Exception used to signal errors while parsing"""
@@ -159,11 +164,16 @@ class ModelReader(object):
     # Model files to try to open if a directory was specified
     DEFAULT_MODEL = 'model.yaml', 'model.yml'
 
-    def __init__(self, model_from, context=None):
+    def __init__(self, model_from, context=None, float_values=None):
         """Create a model from the specified content.
 
-        Model can be a string, open file, or dictionary.
+        Model can be a string, open file, or dictionary. If float_values is
+        True, the metabolic models created from the :class:`NativeModel`
+        use floating point values (see
+        :meth:`NativeModel.create_metabolic_model`).
         """
+        self._float_values = float_values
+        self._prefetched = {}
         if isinstance(model_from, string_types):
             self._model = yaml_load(model_from)
             self._context = context
@@ -177,7 +187,7 @@ class ModelReader(object):
             raise ValueError("Model is of an invalid types")
 
     @classmethod
-    def reader_from_path(cls, path):
+    def reader_from_path(cls, path, float_values=None):
         """Create a model from specified path.
 
         Path can be a directory containing a ``model.yaml`` or ``model.yml``
@@ -186,7 +196,7 @@ class ModelReader(object):
         context = FilePathContext(path)
         try:
             with open(context.filepath, 'r') as f:
-                return ModelReader(f, context)
+                return ModelReader(f, context, float_values=float_values)
         except IOError:
             # Try to open the default file
             for filename in cls.DEFAULT_MODEL:
@@ -194,7 +204,8 @@ class ModelReader(object):
                     context = FilePathContext(
                         os.path.join(path, filename))
                     with open(context.filepath, 'r') as f:
-                        return ModelReader(f, context)
+                        return ModelReader(
+                            f, context, float_values=float_values)
                 except:
                     logger.debug('Failed to load model file',
                                  exc_info=True)
@@ -291,8 +302,8 @@ class ModelReader(object):
 
         # Parse reactions defined in the main model file
         if 'reactions' in self._model:
-            for reaction in parse_reaction_list(
-                    self._context, self._model['reactions'],
+            for reaction in self._parse_list(
+                    'reactions', self._model['reactions'],
                     self.default_compartment):
                 yield reaction
 
@@ -304,8 +315,8 @@ class ModelReader(object):
         """Yield reaction IDs of model reactions"""
 
         if self.has_model_definition():
-            for reaction_id in parse_model_group_list(
-                    self._context, self._model['model']):
+            for reaction_id in self._parse_list(
+                    'model', self._model['model']):
                 yield reaction_id
 
     def parse_limits(self):
@@ -315,8 +326,7 @@ class ModelReader(object):
             if not isinstance(self._model['limits'], list):
                 raise ParseError('Expected limits to be a list')
 
-            for limit in parse_limits_list(
-                    self._context, self._model['limits']):
+            for limit in self._parse_list('limits', self._model['limits']):
                 yield limit
 
     def parse_exchange(self):
@@ -341,8 +351,8 @@ class ModelReader(object):
             if not isinstance(exchange_list, list):
                 raise ParseError('Expected "exchange" to be a list')
 
-            for exchange_compound in parse_exchange_list(
-                    self._context, exchange_list, extracellular):
+            for exchange_compound in self._parse_list(
+                    'exchange', exchange_list, extracellular):
                 compound, reaction_id, lower, upper = exchange_compound
                 if compound.compartment is None:
                     compound = compound.in_compartment(extracellular)
@@ -359,16 +369,124 @@ class ModelReader(object):
         """Yield CompoundEntries for defined compounds"""
 
         if 'compounds' in self._model:
-            for compound in parse_compound_list(
-                    self._context, self._model['compounds']):
+            for compound in self._parse_list(
+                    'compounds', self._model['compounds']):
                 yield compound
 
+    def _parse_list(self, section, definitions, *args):
+        """Yield entries of a list of definitions in the model file.
+
+        The list is parsed with the list parser of the section (called with
+        the model context, the definitions and args). Included files that
+        were already parsed by :meth:`_prefetch_includes` are taken from the
+        prefetched entries and the remaining definitions are parsed one at a
+        time.
+        """
+        parse_list = _LIST_PARSERS[section]
+        prefetched = self._prefetched.pop(section, None)
+        if prefetched is None:
+            for entry in parse_list(self._context, definitions, *args):
+                yield entry
+            return
+
+        for i, definition in enumerate(definitions):
+            entries = prefetched.get(i)
+            if entries is None:
+                entries = parse_list(self._context, [definition], *args)
+            for entry in entries:
+                yield entry
+
+    def _include_tasks(self):
+        """Return list of included files in the model file.
+
+        Each element is a tuple of the section, the index of the include in
+        the list of the section, the model context, the include definition
+        and the arguments to the list parser of the section.
+        """
+        if self._context is None or self._context.basepath is None:
+            return []
+
+        sections = [
+            ('compounds', self._model.get('compounds'), ()),
+            ('reactions', self._model.get('reactions'),
+             (self.default_compartment,)),
+            ('exchange', self._model.get('exchange',
+                                         self._model.get('media')),
+             (self.extracellular_compartment,)),
+            ('limits', self._model.get('limits'), ()),
+            ('model', self._model.get('model'), ())
+        ]
+
+        tasks = []
+        for section, definitions, args in sections:
+            if not isinstance(definitions, list):
+                continue
+            for i, definition in enumerate(definitions):
+                if isinstance(definition, dict) and 'include' in definition:
+                    tasks.append(
+                        (section, i, self._context, definition, args))
+
+        return tasks
+
+    def _prefetch_includes(self, processes):
+        """Parse included files in parallel processes.
+
+        The parsed entries are stored and used in place of parsing the files
+        again when the model is parsed. Files that fail to parse are parsed
+        again in the main process so that errors are reported exactly as
+        when parsing serially.
+        """
+        self._prefetched = {}
+        tasks = self._include_tasks()
+        if processes is None:
+            if len(tasks) < _PARALLEL_MIN_INCLUDES:
+                return
+            processes = mp.cpu_count()
+        processes = min(processes, len(tasks))
+        if processes <= 1:
+            return
+
+        logger.debug('Parsing {} included files in {} processes'.format(
+            len(tasks), processes))
+
+        try:
+            pool = mp.Pool(processes)
+        except (OSError, ImportError):
+            logger.debug('Unable to start processes for parsing',
+                         exc_info=True)
+            return
+
+        try:
+            results = pool.map(_parse_include_task, tasks, chunksize=1)
+        except Exception:
+            logger.debug('Unable to parse included files in parallel',
+                         exc_info=True)
+            return
+        finally:
+            pool.terminate()
+            pool.join()
+
+        opened_files = self._context.opened_files
+        for (section, i, _, _, _), (entries, opened) in zip(tasks, results):
+            if opened_files is not None and opened is not None:
+                opened_files.update(opened)
+            if entries is not None:
+                self._prefetched.setdefault(section, {})[i] = entries
+
     @property
     def context(self):
         return self._context
 
-    def create_model(self):
-        """Return :class:`NativeModel` fully loaded into memory."""
+    def create_model(self, processes=1):
+        """Return :class:`NativeModel` fully loaded into memory.
+
+        By default included files are parsed serially. They are parsed in
+        parallel when processes is greater than one. If processes is None,
+        included files are parsed in parallel (using all CPUs) if the model
+        includes many files. The resulting model is the same as when the
+        files are parsed serially.
+        """
+        self._prefetch_includes(processes)
 
         properties = {
             'name': self.name,
@@ -378,6 +496,9 @@ class ModelReader(object):
             'default_flux_limit': self.default_flux_limit
         }
 
+        if self._float_values is not None:
+            properties['float_values'] = self._float_values
+
         if self.context is not None:
             git_version = util.git_try_describe(self.context.basepath)
             properties['version_string'] = git_version
@@ -439,6 +560,7 @@ class ModelReader(object):
             for reaction in model.reactions:
                 model.model[reaction.id] = None
 
+        self._prefetched = {}
         return model
 
 
@@ -509,6 +631,19 @@ class NativeModel(object):
     def default_flux_limit(self, value):
         self._properties['default_flux_limit'] = value
 
+    @property
+    def float_values(self):
+        """Whether metabolic models are created with floating point values.
+
+        If not set (None) the environment variable ``PSAMM_FLOAT_VALUES``
+        is used.
+        """
+        return self._properties.get('float_values')
+
+    @float_values.setter
+    def float_values(self, value):
+        self._properties['float_values'] = value
+
     @property
     def compartments(self):
         """Return compartments entry set."""
@@ -544,8 +679,26 @@ class NativeModel(object):
         """Return dict of model reactions."""
         return self._model
 
-    def create_metabolic_model(self):
-        """Create a :class:`psamm.metabolicmodel.MetabolicModel`."""
+    def create_metabolic_model(self, float_values=None):
+        """Create a :class:`psamm.metabolicmodel.MetabolicModel`.
+
+        The values in the native model are kept exactly (as
+        :class:`decimal.Decimal`) but with float_values set to True, the
+        stoichiometric values and flux limits of the metabolic model are
+        converted to floats. This makes the construction and solving of
+        problems much faster but may introduce rounding errors. If
+        float_values is None, the :attr:`float_values` property is used.
+        """
+        if float_values is None:
+            float_values = self.float_values
+        if float_values is None:
+            float_values = _env_float_values()
+
+        if float_values:
+            convert = _float_value
+        else:
+            def convert(value):
+                return value
 
         def _translate_compartments(reaction, compartment):
             """Translate compound with missing compartments.
@@ -558,6 +711,9 @@ class NativeModel(object):
             right = (((c.in_compartment(compartment), v)
                       if c.compartment is None else (c, v))
                      for c, v in reaction.right)
+            if float_values:
+                left = ((c, convert(v)) for c, v in left)
+                right = ((c, convert(v)) for c, v in right)
             return Reaction(reaction.direction, left, right)
 
         # Create metabolic model
@@ -609,14 +765,53 @@ class NativeModel(object):
         if len(self.model) > 0:
             model_definition = self.model
 
+        exchange = ((compound, reaction_id, convert(lower), convert(upper))
+                    for compound, reaction_id, lower, upper
+                    in itervalues(self.exchange))
+        limits = ((reaction_id, convert(lower), convert(upper))
+                  for reaction_id, lower, upper in itervalues(self.limits))
+
         return MetabolicModel.load_model(
-            database, model_definition, itervalues(self.exchange),
-            itervalues(self.limits), v_max=self.default_flux_limit)
+            database, model_definition, exchange, limits,
+            v_max=convert(self.default_flux_limit))
 
     def __repr__(self):
         return str('<{} name={!r}>'.format(self.__class__.__name__, self.name))
 
 
+def _parse_include_task(task):
+    """Parse included file in worker process.
+
+    Returns the list of entries (or None if the file could not be parsed)
+    and the files opened by the parser.
+    """
+    section, _, context, definition, args = task
+    context = FilePathContext(context)
+    try:
+        entries = list(_LIST_PARSERS[section](context, [definition], *args))
+    except Exception:
+        # The file is parsed again by the main process to report the error
+        entries = None
+    return entries, context.opened_files
+
+
+def _env_float_values():
+    """Return True if floating point values are enabled by environment."""
+    value = os.environ.get('PSAMM_FLOAT_VALUES', '')
+    return value.lower() in ('1', 'yes', 'true', 'on')
+
+
+def _float_value(value):
+    """Convert numeric value to float, keeping None and expressions."""
+    if value is None or isinstance(value, float):
+        return value
+    try:
+        return float(value)
+    except TypeError:
+        # Variable stoichiometry is kept as an expression
+        return value
+
+
 def _check_id(entity, entity_type):
     """Check whether the ID is valid.
 
@@ -1247,6 +1442,16 @@ def parse_model_file(path):
                 yield reaction_id
 
 
+# Parsers of the lists in each section of the model file
+_LIST_PARSERS = {
+    'compounds': parse_compound_list,
+    'reactions': parse_reaction_list,
+    'exchange': parse_exchange_list,
+    'limits': parse_limits_list,
+    'model': parse_model_group_list
+}
+
+
 # Threshold for converting reactions into dictionary representation.
 _MAX_REACTION_LENGTH = 10
 
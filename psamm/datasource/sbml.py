@@ -22,6 +22,7 @@ from __future__ import unicode_literals
 from decimal import Decimal
 from fractions import Fraction
 from functools import partial
+import abc
 import logging
 import re
 import json
@@ -34,7 +35,7 @@ try:
 except ImportError:
     import xml.etree.ElementTree as ET
 
-from six import itervalues, iteritems, text_type, PY3
+from six import itervalues, iteritems, text_type, PY3, add_metaclass
 
 from .context import FileMark
 from .entry import (CompoundEntry as BaseCompoundEntry,
@@ -98,6 +99,7 @@ class ParseError(Exception):
     """Error parsing SBML file"""
 
 
+@add_metaclass(abc.ABCMeta)
 class _SBMLEntry(object):
     """Base class for compound and reaction entries."""
 
@@ -105,6 +107,7 @@ class _SBMLEntry(object):
         self._reader = reader
         self._root = root
         self._id = self._element_get_id(root)
+        self._properties = None
 
     def _element_get_id(self, element):
         """Get id of reaction or species element.
@@ -125,14 +128,38 @@ class _SBMLEntry(object):
 
     @property
     def xml_notes(self):
-        """Access the entity notes as an XML document fragment."""
+        """Access the entity notes as an XML document fragment.
+
+        Returns None if the notes were discarded by the reader.
+        """
+        if not self._reader._read_notes:
+            return None
         return self._root.find(self._reader._sbml_tag('notes'))
 
     @property
     def xml_annotation(self):
-        """Access the entity annotation as an XML document fragment."""
+        """Access the entity annotation as an XML document fragment.
+
+        Returns None if the annotation was discarded by the reader.
+        """
+        if not self._reader._read_annotation:
+            return None
         return self._root.find(self._reader._sbml_tag('annotation'))
 
+    @property
+    def properties(self):
+        """All entity properties as a dict.
+
+        The properties are parsed on first access.
+        """
+        if self._properties is None:
+            self._properties = self._parse_properties()
+        return self._properties
+
+    @abc.abstractmethod
+    def _parse_properties(self):
+        """Return dict of the properties of the entity."""
+
 
 class SBMLSpeciesEntry(_SBMLEntry, BaseCompoundEntry):
     """Species entry in the SBML file"""
@@ -213,9 +240,8 @@ class SBMLSpeciesEntry(_SBMLEntry, BaseCompoundEntry):
         """Whether this compound is a boundary condition"""
         return self._boundary
 
-    @property
-    def properties(self):
-        """All species properties as a dict"""
+    def _parse_properties(self):
+        """Return all species properties as a dict"""
         properties = {'id': self._id,
                       'boundary': self._boundary}
         if 'name' in self._root.attrib:
@@ -295,20 +321,24 @@ class SBMLReactionEntry(_SBMLEntry, BaseReactionEntry):
                         ' model parameter constants'.format(self.id))
                 self._upper_flux = reader._model_constants[upper]
 
-            if (lower is None and upper is None and
-                    self.id in reader._reaction_flux_bounds):
-                # Parse bounds from listOfFluxBounds in FBCv1
-                for bound in reader._reaction_flux_bounds[self.id]:
-                    if bound.operation == 'equal':
-                        self._lower_flux = bound.value
-                        self._upper_flux = bound.value
-                    elif bound.operation == 'lessEqual':
-                        self._upper_flux = bound.value
-                    elif bound.operation == 'greaterEqual':
-                        self._lower_flux = bound.value
+            if lower is None and upper is None:
+                self._set_flux_bounds(
+                    reader._reaction_flux_bounds.get(self.id, []))
 
         self._filemark = filemark
 
+    def _set_flux_bounds(self, bounds):
+        """Set flux bounds from listOfFluxBounds in FBCv1."""
+        self._properties = None
+        for bound in bounds:
+            if bound.operation == 'equal':
+                self._lower_flux = bound.value
+                self._upper_flux = bound.value
+            elif bound.operation == 'lessEqual':
+                self._upper_flux = bound.value
+            elif bound.operation == 'greaterEqual':
+                self._lower_flux = bound.value
+
     def _parse_species_references(self, name):
         """Yield species id and parsed value for a speciesReference list"""
         for species in self._root.iterfind('./{}/{}'.format(
@@ -394,9 +424,8 @@ class SBMLReactionEntry(_SBMLEntry, BaseReactionEntry):
 
             yield param_id, param_name, param_value, param_units
 
-    @property
-    def properties(self):
-        """All reaction properties as a dict"""
+    def _parse_properties(self):
+        """Return all reaction properties as a dict"""
         properties = {'id': self._id,
                       'reversible': self._rev,
                       'equation': self._equation}
@@ -423,9 +452,8 @@ class SBMLCompartmentEntry(_SBMLEntry, BaseCompartmentEntry):
         self._name = self._root.get('name')
         self._filemark = filemark
 
-    @property
-    def properties(self):
-        """All compartment properties as a dict."""
+    def _parse_properties(self):
+        """Return all compartment properties as a dict."""
         properties = {'id': self._id}
         if self._name is not None:
             properties['name'] = self._name
@@ -570,28 +598,84 @@ class SBMLReader(object):
     Otherwise the boundary species will be retained. Retaining these is only
     useful to extract specific information from those species objects.
 
+    If ``streaming`` is ``True``, the file is parsed incrementally and each
+    element is discarded as soon as the corresponding entry has been created
+    so the memory use does not grow with the size of the XML document. The
+    species and parameters must then appear before the reactions in the
+    document as required by the SBML specification. In this mode the notes
+    and annotations of the entries are dropped unless ``read_notes`` or
+    ``read_annotation`` are set. Setting ``read_notes`` and
+    ``read_annotation`` to ``False`` discards the notes and annotations in
+    either mode. This is useful when the model is only used for analysis
+    since the notes of large models can take up a lot of memory and
+    :func:`convert_sbml_model` will skip parsing them.
+
+    The properties of the entries are parsed on first access.
+
     Args:
         file: File-like object to parse XML SBML content from.
         strict: Indicating whether strict parsing is enabled.
         ignore_boundary: Indicating whether boundary species are dropped.
         context: Optional file parsing context from
             :mod:`psamm.datasource.context`.
+        streaming: Parse the file incrementally.
+        read_notes: Whether to keep notes of entries (defaults to True
+            unless streaming).
+        read_annotation: Whether to keep annotations of entries (defaults
+            to True unless streaming).
     """
 
     def __init__(self, file, strict=False, ignore_boundary=True,
-                 context=None):
-        # Parse SBML file
-        tree = ET.parse(file)
-        root = tree.getroot()
-
+                 context=None, streaming=False, read_notes=None,
+                 read_annotation=None):
         self._strict = strict
         self._ignore_boundary = ignore_boundary
         self._context = context
 
-        # Parse level and version
+        # Notes and annotations are discarded when streaming unless requested
+        if read_notes is None:
+            read_notes = not streaming
+        if read_annotation is None:
+            read_annotation = not streaming
+        self._read_notes = read_notes
+        self._read_annotation = read_annotation
+
+        self._model_constants = {}
+        self._flux_bounds = []
+        self._reaction_flux_bounds = {}
+        self._model_compartments = {}
+        self._model_species = {}
+        self._model_reactions = {}
+        self._model_objectives = {}
+        self._active_objective = None
+
+        if streaming:
+            self._parse_stream(file)
+        else:
+            self._parse_tree(file)
+
+        if self._ignore_boundary:
+            # Remove compartments that only contain boundary compounds
+            empty_compartments = set(self._model_compartments)
+            valid_compartments = set()
+            for species in itervalues(self._model_species):
+                empty_compartments.discard(species.compartment)
+                if not species.boundary:
+                    valid_compartments.add(species.compartment)
+
+            boundary_compartments = (
+                set(self._model_compartments) - empty_compartments -
+                valid_compartments)
+            for compartment in boundary_compartments:
+                logger.info('Ignoring boundary compartment: {}'.format(
+                    compartment))
+                del self._model_compartments[compartment]
+
+    def _set_level(self, level, version):
+        """Set SBML level and version and the corresponding namespace."""
         self._sbml_tag = None
-        self._level = int(root.get('level'))
-        self._version = int(root.get('version'))
+        self._level = int(level)
+        self._version = int(version)
 
         if self._level == 1:
             self._sbml_tag = partial(_tag, namespace=SBML_NS_L1)
@@ -631,21 +715,73 @@ class SBMLReader(object):
             self._level = 1
             self._sbml_tag = partial(_tag, namespace=SBML_NS_L1)
 
+    def _parse_parameters(self, params):
+        """Parse constant parameters from listOfParameters element."""
+        for param in params.iterfind(self._sbml_tag('parameter')):
+            if param.get('constant') == 'true':
+                param_id = param.get('id')
+                value = Decimal(param.get('value'))
+                self._model_constants[param_id] = value
+
+    def _parse_flux_bounds(self, flux_bounds):
+        """Parse listOfFluxBounds element from FBC V1."""
+        for flux_bound in flux_bounds.iterfind(_tag('fluxBound', FBC_V1)):
+            entry = SBMLFluxBoundEntry(self, FBC_V1, flux_bound)
+            self._flux_bounds.append(entry)
+
+            # Create reference from reaction to flux bound
+            entries = self._reaction_flux_bounds.setdefault(
+                entry.reaction, [])
+            entries.append(entry)
+
+    def _parse_objectives(self, objectives, fbc_ns):
+        """Parse listOfObjectives element from FBC."""
+        for objective in objectives.iterfind(_tag('objective', fbc_ns)):
+            entry = SBMLObjectiveEntry(self, fbc_ns, objective)
+            self._model_objectives[entry.id] = entry
+
+        active = objectives.get(_tag('activeObjective', fbc_ns))
+        if active is None or active not in self._model_objectives:
+            raise ParseError('Active objective is invalid: {}'.format(
+                active))
+
+        self._active_objective = self._model_objectives[active]
+
+    def _add_compartment(self, compartment):
+        filemark = FileMark(
+            self._context, self._get_sourceline(compartment), None)
+        entry = SBMLCompartmentEntry(self, compartment, filemark=filemark)
+        self._model_compartments[entry.id] = entry
+        return entry
+
+    def _add_species(self, species):
+        filemark = FileMark(
+            self._context, self._get_sourceline(species), None)
+        entry = SBMLSpeciesEntry(self, species, filemark=filemark)
+        self._model_species[entry.id] = entry
+        return entry
+
+    def _add_reaction(self, reaction):
+        filemark = FileMark(
+            self._context, self._get_sourceline(reaction), None)
+        entry = SBMLReactionEntry(self, reaction, filemark=filemark)
+        self._model_reactions[entry.id] = entry
+        return entry
+
+    def _parse_tree(self, file):
+        """Parse the SBML document as a complete element tree."""
+        tree = ET.parse(file)
+        root = tree.getroot()
+
+        self._set_level(root.get('level'), root.get('version'))
         self._model = root.find(self._sbml_tag('model'))
 
         # Parameters
-        self._model_constants = {}
         params = self._model.find(self._sbml_tag('listOfParameters'))
         if params is not None:
-            for param in params.iterfind(self._sbml_tag('parameter')):
-                if param.get('constant') == 'true':
-                    param_id = param.get('id')
-                    value = Decimal(param.get('value'))
-                    self._model_constants[param_id] = value
+            self._parse_parameters(params)
 
         # Flux bounds
-        self._flux_bounds = []
-        self._reaction_flux_bounds = {}
         if self._level == 3:
             # Only represented with this tag in FBC V1. In FBC V2 the flux
             # bounds are instead represented in the global listOfParameters
@@ -653,84 +789,168 @@ class SBMLReader(object):
             # are FluxBoundEntry objects created.
             flux_bounds = self._model.find(_tag('listOfFluxBounds', FBC_V1))
             if flux_bounds is not None:
-                for flux_bound in flux_bounds.iterfind(
-                        _tag('fluxBound', FBC_V1)):
-                    entry = SBMLFluxBoundEntry(self, FBC_V1, flux_bound)
-                    self._flux_bounds.append(entry)
-
-                    # Create reference from reaction to flux bound
-                    entries = self._reaction_flux_bounds.setdefault(
-                        entry.reaction, [])
-                    entries.append(entry)
+                self._parse_flux_bounds(flux_bounds)
 
         # Compartments
-        self._model_compartments = {}
-        self._compartments = self._model.find(
-            self._sbml_tag('listOfCompartments'))
-        for compartment in self._compartments.iterfind(
+        compartments = self._model.find(self._sbml_tag('listOfCompartments'))
+        for compartment in compartments.iterfind(
                 self._sbml_tag('compartment')):
-            filemark = FileMark(
-                self._context, self._get_sourceline(compartment), None)
-            entry = SBMLCompartmentEntry(self, compartment, filemark=filemark)
-            self._model_compartments[entry.id] = entry
+            self._add_compartment(compartment)
 
         # Species
-        self._model_species = {}
-        self._species = self._model.find(self._sbml_tag('listOfSpecies'))
-        for species in self._species.iterfind(self._sbml_tag('species')):
-            filemark = FileMark(
-                self._context, self._get_sourceline(species), None)
-            entry = SBMLSpeciesEntry(self, species, filemark=filemark)
-            self._model_species[entry.id] = entry
+        species_list = self._model.find(self._sbml_tag('listOfSpecies'))
+        for species in species_list.iterfind(self._sbml_tag('species')):
+            self._add_species(species)
 
         # Reactions
-        self._model_reactions = {}
-        self._reactions = self._model.find(self._sbml_tag('listOfReactions'))
-        for reaction in self._reactions.iterfind(self._sbml_tag('reaction')):
-            filemark = FileMark(
-                self._context, self._get_sourceline(reaction), None)
-            entry = SBMLReactionEntry(self, reaction, filemark=filemark)
-            self._model_reactions[entry.id] = entry
-
-        if self._ignore_boundary:
-            # Remove compartments that only contain boundary compounds
-            empty_compartments = set(self._model_compartments)
-            valid_compartments = set()
-            for species in itervalues(self._model_species):
-                empty_compartments.discard(species.compartment)
-                if not species.boundary:
-                    valid_compartments.add(species.compartment)
-
-            boundary_compartments = (
-                set(self._model_compartments) - empty_compartments -
-                valid_compartments)
-            for compartment in boundary_compartments:
-                logger.info('Ignoring boundary compartment: {}'.format(
-                    compartment))
-                del self._model_compartments[compartment]
+        reactions = self._model.find(self._sbml_tag('listOfReactions'))
+        for reaction in reactions.iterfind(self._sbml_tag('reaction')):
+            self._add_reaction(reaction)
+
+        # Discard notes and annotations that were not requested
+        discard_tags = set()
+        if not self._read_notes:
+            discard_tags.add(self._sbml_tag('notes'))
+        if not self._read_annotation:
+            discard_tags.add(self._sbml_tag('annotation'))
+        if len(discard_tags) > 0:
+            for entries in (self._model_compartments, self._model_species,
+                            self._model_reactions):
+                for entry in itervalues(entries):
+                    for child in list(entry._root):
+                        if child.tag in discard_tags:
+                            entry._root.remove(child)
 
         # Objectives
-        self._model_objectives = {}
-        self._active_objective = None
         if self._level == 3:
-            objectives = None
             for fbc_ns in (FBC_V2, FBC_V1):
                 objectives = self._model.find(_tag('listOfObjectives', fbc_ns))
                 if objectives is not None:
+                    self._parse_objectives(objectives, fbc_ns)
                     break
 
-            if objectives is not None:
-                for objective in objectives.iterfind(
-                        _tag('objective', fbc_ns)):
-                    entry = SBMLObjectiveEntry(self, fbc_ns, objective)
-                    self._model_objectives[entry.id] = entry
+    def _detach_element(self, element, keep_tags):
+        """Return copy of element with only attributes and kept children.
 
-                active = objectives.get(_tag('activeObjective', fbc_ns))
-                if active is None or active not in self._model_objectives:
-                    raise ParseError('Active objective is invalid: {}'.format(
-                        active))
+        The original element is cleared so that the memory used by the
+        children that were not kept can be released.
+        """
+        copy = ET.Element(element.tag, dict(element.attrib))
+        for child in element:
+            if child.tag in keep_tags:
+                copy.append(child)
+        element.clear()
+        return copy
+
+    def _parse_stream(self, file):
+        """Parse the SBML document incrementally.
+
+        Compartment, species and reaction entries are created and added to
+        the reader as soon as the corresponding elements have been parsed.
+        Elements are removed from the document after they have been
+        processed so the full document is never kept in memory; only the
+        entries are kept. The elements of the model must appear in the order
+        given by the SBML specification (e.g. species before reactions),
+        otherwise :class:`ParseError` is raised.
+        """
+        stack = []
+        reactions_started = False
+        entity_lists = {}
+        list_tags = {}
+        notes_tags = set()
+        entry_keep = {}
+
+        for event, element in ET.iterparse(file, events=('start', 'end')):
+            if event == 'start':
+                if len(stack) == 0:
+                    self._set_level(
+                        element.get('level'), element.get('version'))
+                    sbml = self._sbml_tag
+                    entity_lists = {
+                        sbml('listOfCompartments'): (
+                            sbml('compartment'), self._add_compartment),
+                        sbml('listOfSpecies'): (
+                            sbml('species'), self._add_species),
+                        sbml('listOfReactions'): (
+                            sbml('reaction'), self._add_reaction)
+                    }
+                    if self._read_notes:
+                        notes_tags.add(sbml('notes'))
+                    if self._read_annotation:
+                        notes_tags.add(sbml('annotation'))
+                    entry_keep = {
+                        sbml('compartment'): notes_tags,
+                        sbml('species'): notes_tags,
+                        sbml('reaction'): notes_tags | {sbml('kineticLaw')}
+                    }
+                    list_tags = {
+                        sbml('listOfParameters'): self._parse_parameters
+                    }
+                    if self._level == 3:
+                        list_tags[_tag('listOfFluxBounds', FBC_V1)] = (
+                            self._parse_flux_bounds)
+                        for fbc_ns in (FBC_V2, FBC_V1):
+                            list_tags[_tag('listOfObjectives', fbc_ns)] = (
+                                partial(self._parse_objectives,
+                                        fbc_ns=fbc_ns))
+                elif len(stack) == 1 and element.tag == self._sbml_tag(
+                        'model'):
+                    # Only the attributes of the model element are kept
+                    self._model = ET.Element(
+                        element.tag, dict(element.attrib))
+                elif len(stack) == 2 and stack[-1].tag == self._sbml_tag(
+                        'model'):
+                    # Reactions are created as soon as they are parsed so
+                    # the species and parameters must already be known.
+                    if element.tag == self._sbml_tag('listOfReactions'):
+                        reactions_started = True
+                    elif reactions_started and element.tag in (
+                            self._sbml_tag('listOfSpecies'),
+                            self._sbml_tag('listOfParameters')):
+                        raise ParseError(
+                            '{} appears after listOfReactions which is not'
+                            ' supported when parsing the document'
+                            ' incrementally'.format(
+                                element.tag.rpartition('}')[2]))
+                stack.append(element)
+                continue
+
+            stack.pop()
+            if len(stack) == 0:
+                element.clear()
+                continue
 
-                self._active_objective = self._model_objectives[active]
+            parent = stack[-1]
+            depth = len(stack)
+            if depth == 2 and parent.tag == self._sbml_tag('model'):
+                # Element in the model
+                if element.tag in list_tags:
+                    list_tags[element.tag](element)
+                parent.remove(element)
+                element.clear()
+            elif depth == 3 and parent.tag in entity_lists:
+                entity_tag, add_entry = entity_lists[parent.tag]
+                if element.tag == entity_tag:
+                    entry = add_entry(element)
+                    entry._root = self._detach_element(
+                        element, entry_keep[element.tag])
+                parent.remove(element)
+            elif (depth == 4 and element.tag in (
+                    self._sbml_tag('notes'), self._sbml_tag('annotation')) and
+                    element.tag not in notes_tags):
+                # Discard notes and annotations of entries when not requested
+                parent.remove(element)
+                element.clear()
+            elif depth == 1:
+                # Elements outside the model (e.g. notes)
+                parent.remove(element)
+                element.clear()
+
+        # Flux bounds from FBC V1 follow the reactions in the document
+        for entry in itervalues(self._model_reactions):
+            if (entry._lower_flux is None and entry._upper_flux is None and
+                    entry.id in self._reaction_flux_bounds):
+                entry._set_flux_bounds(self._reaction_flux_bounds[entry.id])
 
     def _get_sourceline(self, element):
         """Get source line of element (only supported by lxml)."""
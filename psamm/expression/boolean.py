@@ -293,6 +293,124 @@ class Expression(object):
         return NotImplemented
 
 
+class CompiledExpressions(object):
+    """Set of expressions compiled for batched evaluation.
+
+    The expression trees are flattened once into a list of operations on
+    bitsets where each bit corresponds to one assignment of the variables.
+    This allows a large number of assignments to be evaluated in a single
+    pass over the operations. Identical subterms (e.g. enzyme complexes
+    shared by several expressions) are only evaluated once.
+
+    >>> c = CompiledExpressions({'r1': Expression('a and (b or c)'),
+    ...                          'r2': Expression('b or c')})
+    >>> [sorted(k) for k in c.false_expressions([{'a'}, {'b', 'c'}])]
+    [['r1'], ['r1', 'r2']]
+
+    Args:
+        expressions: Dictionary or iterable of (key, expression)-pairs.
+    """
+
+    _CONST, _VAR, _AND, _OR = range(4)
+
+    def __init__(self, expressions):
+        if hasattr(expressions, 'items'):
+            expressions = expressions.items()
+
+        self._keys = []
+        self._outputs = []
+        self._variables = {}
+        self._operations = []
+        registers = {}
+
+        def compile_term(term):
+            # Booleans are distinct from the integers 0 and 1 as keys here
+            key = (type(term), term)
+            if key in registers:
+                return registers[key]
+
+            if isinstance(term, bool):
+                op = self._CONST, term
+            elif isinstance(term, Variable):
+                index = self._variables.setdefault(
+                    term.symbol, len(self._variables))
+                op = self._VAR, index
+            elif isinstance(term, _OperatorTerm):
+                args = tuple(compile_term(t) for t in term)
+                op = (self._AND if isinstance(term, And) else self._OR,
+                      args)
+            else:
+                raise ValueError(
+                    'Invalid node in expression tree: {!r}'.format(term))
+
+            registers[key] = len(self._operations)
+            self._operations.append(op)
+            return registers[key]
+
+        for key, expression in expressions:
+            self._keys.append(key)
+            self._outputs.append(compile_term(expression.root))
+
+    @property
+    def keys(self):
+        """List of the keys of the compiled expressions."""
+        return list(self._keys)
+
+    @property
+    def variables(self):
+        """Set of variable symbols in the compiled expressions."""
+        return set(self._variables)
+
+    def false_expressions(self, false_variables):
+        """Return keys of the expressions that are false for each assignment.
+
+        Each element of false_variables is a set of variable symbols that are
+        false in that assignment. All other variables are true. Symbols that
+        are not used in any expression are ignored. A list of sets of keys is
+        returned in the same order.
+        """
+        false_variables = list(false_variables)
+        count = len(false_variables)
+        full = (1 << count) - 1
+
+        # Bit i of a variable mask is set if the variable is false in
+        # assignment i.
+        variable_masks = [0] * len(self._variables)
+        for i, symbols in enumerate(false_variables):
+            bit = 1 << i
+            for symbol in symbols:
+                index = self._variables.get(symbol)
+                if index is not None:
+                    variable_masks[index] |= bit
+
+        # Bit i of a register is set if the term is true in assignment i
+        values = []
+        for op, arg in self._operations:
+            if op == self._VAR:
+                value = full & ~variable_masks[arg]
+            elif op == self._AND:
+                value = full
+                for register in arg:
+                    value &= values[register]
+            elif op == self._OR:
+                value = 0
+                for register in arg:
+                    value |= values[register]
+            else:
+                value = full if arg else 0
+            values.append(value)
+
+        result = [set() for _ in range(count)]
+        for key, register in zip(self._keys, self._outputs):
+            mask = full & ~values[register]
+            while mask:
+                low = mask & -mask
+                result[low.bit_length() - 1].add(key)
+                mask ^= low
+
+        return result
+
+
 class ParseError(Exception):
     """Signals error parsing boolean expression."""
 
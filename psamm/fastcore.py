@@ -27,6 +27,7 @@ from __future__ import unicode_literals
 import logging
 
 from .fluxanalysis import FluxBalanceProblem
+from .presolve import remove_blocked_reactions
 
 # Module-level logging
 logger = logging.getLogger(__name__)
@@ -127,9 +128,10 @@ class FastcoreProblem(FluxBalanceProblem):
             return
 
         self.lp7(core)
+        fluxes = self.get_fluxes(core)
         k = set()
         for reaction_id in core:
-            flux = self.get_flux(reaction_id)
+            flux = fluxes[reaction_id]
             if self.is_flipped(reaction_id):
                 flux *= -1
             if flux >= self._epsilon:
@@ -139,8 +141,9 @@ class FastcoreProblem(FluxBalanceProblem):
             return
 
         self.lp10(k, additional, weights)
+        fluxes = self.get_fluxes()
         for reaction_id in self._model.reactions:
-            flux = self.get_flux(reaction_id)
+            flux = fluxes[reaction_id]
             if abs(flux) >= self._epsilon / scaling:
                 yield reaction_id
 
@@ -168,6 +171,14 @@ def fastcc(model, epsilon, solver):
         epsilon: Flux threshold value.
         solver: LP solver instance to use.
     """
+    # Structurally blocked reactions are reported without solving any LP
+    # problems and are removed from the model that is solved.
+    blocked, reduced = remove_blocked_reactions(model)
+    if reduced is not model:
+        for reaction in sorted(blocked):
+            yield reaction
+        model = reduced
+
     reaction_set = set(model.reactions)
     subset = set(reaction_id for reaction_id in reaction_set
                  if model.limits[reaction_id].lower >= 0)
@@ -178,9 +189,10 @@ def fastcc(model, epsilon, solver):
     p = FastcoreProblem(model, solver, epsilon=epsilon)
     p.lp7(subset)
 
+    fluxes = p.get_fluxes()
     consistent_subset = set(
         reaction_id for reaction_id in model.reactions
-        if abs(p.get_flux(reaction_id)) >= 0.999 * epsilon)
+        if abs(fluxes[reaction_id]) >= 0.999 * epsilon)
 
     logger.debug('|A| = {}, A = {}'.format(
         len(consistent_subset), consistent_subset))
@@ -212,9 +224,10 @@ def fastcc(model, epsilon, solver):
             logger.debug('LP7 on {}'.format(subset_i))
             p.lp7(subset_i)
 
+        fluxes = p.get_fluxes(subset)
         consistent_subset.update(
             reaction_id for reaction_id in subset
-            if abs(p.get_flux(reaction_id) >= 0.999 * epsilon))
+            if abs(fluxes[reaction_id] >= 0.999 * epsilon))
 
         logger.debug('|A| = {}, A = {}'.format(
             len(consistent_subset), consistent_subset))
@@ -21,16 +21,21 @@ from __future__ import unicode_literals
 
 import logging
 import random
+from collections import deque, Mapping
 
 from .lpsolver import lp
 
 from six import iteritems, raise_from
+from six.moves import zip
 
 # Module-level logging
 logger = logging.getLogger(__name__)
 
 _INF = float('inf')
 
+# Relative tolerance of fixed fluxes that are outside of the flux bounds
+_BOUND_TOLERANCE = 1e-9
+
 
 def _get_fba_problem(model, tfba, solver):
     """Convenience function for returning the right FBA problem instance"""
@@ -40,6 +45,176 @@ def _get_fba_problem(model, tfba, solver):
     return p
 
 
+def flux_variability_order(model, reactions):
+    """Return reactions in an order suited for flux variability analysis.
+
+    Reactions are ordered by a breadth-first traversal of the reaction graph
+    of the model where reactions are adjacent when they share a compound
+    (only the given reactions are included in the result). Consecutive
+    problems then maximize/minimize fluxes in the same region of the network
+    which means that the optimal basis of the previous problem is a good
+    starting point for the next.
+
+    Args:
+        model: :class:`MetabolicModel` containing the reactions.
+        reactions: Reactions to order.
+
+    Returns:
+        List of the given reactions.
+    """
+    matrix = model.sparse_matrix
+    indptr, indices = matrix.indptr, matrix.indices
+
+    reactions = list(reactions)
+    selected = set(reactions)
+    visited = set()
+    expanded = set()
+    order = []
+    for start in reactions:
+        if start in visited:
+            continue
+
+        visited.add(start)
+        queue = deque([start])
+        while len(queue) > 0:
+            reaction_id = queue.popleft()
+            if reaction_id in selected:
+                order.append(reaction_id)
+
+            column = matrix.columns[matrix.reaction_index[reaction_id]]
+            for i, _ in column:
+                if i in expanded:
+                    continue
+                expanded.add(i)
+                for k in range(indptr[i], indptr[i + 1]):
+                    other = matrix.reactions[indices[k]]
+                    if other not in visited:
+                        visited.add(other)
+                        queue.append(other)
+
+    return order
+
+
+class FluxBoundTracker(object):
+    """Keep track of flux bounds that have been reached by flux solutions.
+
+    When a flux solution has a reaction flux at the upper (or lower) flux
+    bound of the reaction, this bound is necessarily also the maximum (or
+    minimum) flux of the reaction. The corresponding flux variability problem
+    does not have to be solved.
+
+    Args:
+        model: :class:`MetabolicModel` with the flux bounds.
+        reactions: Reactions to track.
+        tolerance: Relative tolerance when comparing fluxes to bounds.
+    """
+
+    def __init__(self, model, reactions, tolerance=1e-9):
+        self._tolerance = tolerance
+        self._reached = {}
+        self._unreached = {}
+        for reaction_id in reactions:
+            bounds = []
+            for direction, bound in zip(
+                    (-1, 1), model.limits[reaction_id].bounds):
+                if bound is not None and abs(bound) != _INF:
+                    bounds.append((direction, float(bound)))
+            if len(bounds) > 0:
+                self._unreached[reaction_id] = bounds
+
+    def unreached_reactions(self):
+        """Return list of reactions where a bound has not been reached."""
+        return list(self._unreached)
+
+    def update(self, fluxes):
+        """Update the reached bounds from a flux solution.
+
+        Args:
+            fluxes: Iterable of reaction ID and flux pairs.
+        """
+        for reaction_id, flux in fluxes:
+            bounds = self._unreached.get(reaction_id)
+            if bounds is None:
+                continue
+
+            for direction, bound in list(bounds):
+                tolerance = self._tolerance * max(1, abs(bound))
+                if direction * (flux - bound) >= -tolerance:
+                    self._reached[reaction_id, direction] = bound
+                    bounds.remove((direction, bound))
+
+            if len(bounds) == 0:
+                del self._unreached[reaction_id]
+
+    def get_bound(self, reaction_id, direction):
+        """Return the reached bound of reaction or None if not reached.
+
+        Direction is a negative number for the lower bound or a positive
+        number for the upper bound.
+        """
+        return self._reached.get((reaction_id, 1 if direction > 0 else -1))
+
+
+class FluxVariabilityCoordinator(object):
+    """Coordinate flux variability problems that are solved in parallel.
+
+    The tasks are pairs of reaction ID and direction (see
+    :meth:`FluxBalanceProblem.flux_bound`). The result of each task must be
+    a pair of the flux bound and the fluxes of the flux solution, given as a
+    sequence ordered as :attr:`reactions` (or None if no solution is
+    available). Every solution is used to update a
+    :class:`FluxBoundTracker`, and tasks for bounds that have already been
+    reached are not submitted but still produce a result.
+
+    >>> coordinator = FluxVariabilityCoordinator(model, model.reactions)
+    >>> results = executor.imap_unordered(coordinator.tasks())
+    >>> for (reaction_id, direction), bound in coordinator.results(results):
+    ...     print(reaction_id, direction, bound)
+
+    Args:
+        model: :class:`MetabolicModel` to solve.
+        reactions: Reactions on which to report variability.
+    """
+
+    def __init__(self, model, reactions):
+        self._reactions = flux_variability_order(model, reactions)
+        self._tracker = FluxBoundTracker(model, self._reactions)
+        self._reached = deque()
+
+    @property
+    def reactions(self):
+        """Reactions in the order that fluxes of solutions are reported."""
+        return self._reactions
+
+    def tasks(self):
+        """Iterate over the tasks that remain to be solved."""
+        for reaction_id in self._reactions:
+            for direction in (1, -1):
+                bound = self._tracker.get_bound(reaction_id, direction)
+                if bound is None:
+                    yield reaction_id, direction
+                else:
+                    self._reached.append(((reaction_id, direction), bound))
+
+    def results(self, task_results):
+        """Iterate over task and bound of every task.
+
+        Args:
+            task_results: Iterable of task and task result pairs for the
+                tasks obtained from :meth:`tasks`.
+        """
+        for task, (bound, fluxes) in task_results:
+            if fluxes is not None:
+                self._tracker.update(zip(self._reactions, fluxes))
+            yield task, bound
+
+            while len(self._reached) > 0:
+                yield self._reached.popleft()
+
+        while len(self._reached) > 0:
+            yield self._reached.popleft()
+
+
 class FluxBalanceError(Exception):
     """Error indicating that a flux balance cannot be solved."""
 
@@ -52,6 +227,114 @@ class FluxBalanceError(Exception):
         return self._result
 
 
+class FluxBoundsGroup(object):
+    """Flux bounds that are temporarily imposed on a flux balance problem.
+
+    The bounds are changed on the flux variables directly so the constraints
+    of the problem are not changed. When the group is deleted (or the
+    ``with``-block is exited) the previous bounds are set up to be restored
+    before the next solve so the solution found with the bounds can still be
+    accessed. Groups should be created using
+    :meth:`FluxBalanceProblem.flux_bounds` or
+    :meth:`FluxBalanceProblem.knockout`.
+
+    Args:
+        problem: :class:`FluxBalanceProblem` to change.
+        bounds: Dictionary of reaction IDs to (lower, upper)-tuples.
+    """
+    def __init__(self, problem, bounds):
+        self._problem = problem
+        self._reactions = []
+        self._previous = []
+
+        problem._restore_flux_bounds()
+        bounds = dict(bounds)
+        self._reactions = list(bounds)
+        self._previous = problem._v.get_bounds(self._reactions)
+        problem._v.set_bounds(
+            self._reactions,
+            lower=[bounds[reaction][0] for reaction in self._reactions],
+            upper=[bounds[reaction][1] for reaction in self._reactions])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.delete()
+
+    def delete(self):
+        """Set up the previous bounds to be restored on the next solve."""
+        if len(self._reactions) > 0:
+            self._problem._restore_bounds.append(
+                (self._reactions, self._previous))
+            self._reactions = []
+
+
+class FluxVector(Mapping):
+    """Fluxes of a sequence of reactions.
+
+    The fluxes are stored in the order of :attr:`reactions` and can be
+    obtained as a NumPy array from :attr:`array`. The object is also a
+    read-only mapping from reaction IDs to fluxes.
+
+    >>> fluxes = p.get_fluxes()
+    >>> fluxes['ACK'] == fluxes.array[fluxes.index['ACK']]
+    True
+
+    Args:
+        reactions: Sequence of reaction IDs.
+        values: Sequence of flux values in the same order as the reactions.
+        index: Dictionary of reaction IDs to the position in reactions. This
+            is created from the reactions if not given.
+    """
+
+    def __init__(self, reactions, values, index=None):
+        self._reactions = tuple(reactions)
+        self._values = list(values)
+        if len(self._values) != len(self._reactions):
+            raise ValueError('Number of values does not match reactions')
+        self._index = index
+        self._array = None
+
+    @property
+    def reactions(self):
+        """Tuple of reaction IDs in the order of the fluxes."""
+        return self._reactions
+
+    @property
+    def index(self):
+        """Dictionary of reaction IDs to the index in :attr:`array`."""
+        if self._index is None:
+            self._index = {
+                reaction: i for i, reaction in enumerate(self._reactions)}
+        return self._index
+
+    @property
+    def array(self):
+        """Fluxes as NumPy array in the order of :attr:`reactions`."""
+        if self._array is None:
+            import numpy  # NumPy is only required for this property
+            self._array = numpy.array(self._values)
+        return self._array
+
+    def tolist(self):
+        """Return list of fluxes in the order of :attr:`reactions`."""
+        return list(self._values)
+
+    def __array__(self, dtype=None):
+        import numpy
+        return numpy.asarray(self.array, dtype=dtype)
+
+    def __getitem__(self, reaction):
+        return self._values[self.index[reaction]]
+
+    def __iter__(self):
+        return iter(self._reactions)
+
+    def __len__(self):
+        return len(self._reactions)
+
+
 class FluxBalanceProblem(object):
     """Model as a flux optimization problem with steady state assumption.
 
@@ -83,18 +366,21 @@ class FluxBalanceProblem(object):
         self._temp_constr = []
         self._remove_constr = []
 
+        # Flux bounds of deleted FluxBoundsGroups, restored on next solve
+        self._restore_bounds = []
+
         # Define flux variables
-        for reaction_id in self._model.reactions:
-            lower, upper = self._model.limits[reaction_id]
-            v.define([reaction_id], lower=lower, upper=upper)
+        matrix = self._model.sparse_matrix
+        lower, upper = self._model.limits_arrays
+        v.define(matrix.reactions, lower=lower, upper=upper)
 
-        # Define constraints
-        massbalance_lhs = {compound: 0 for compound in model.compounds}
-        for spec, value in iteritems(self._model.matrix):
-            compound, reaction_id = spec
-            massbalance_lhs[compound] += v(reaction_id) * value
-        for compound, lhs in iteritems(massbalance_lhs):
-            self._prob.add_linear_constraints(lhs == 0)
+        # Order of the flux variables is used by get_fluxes()
+        self._reactions = tuple(matrix.reactions)
+        self._reaction_index = dict(matrix.reaction_index)
+
+        # Define mass balance constraints from the stoichiometric matrix
+        self._prob.add_linear_constraints_matrix(
+            v.set(matrix.reactions), matrix, lp.RelationSense.Equals)
 
     @property
     def prob(self):
@@ -125,47 +411,54 @@ class FluxBalanceProblem(object):
         model is not unusually large.
         """
 
-        internal = set(r for r in self._model.reactions
-                       if not self._model.is_exchange(r))
-
-        # Reaction fluxes
-        v = self._v
+        matrix = self._model.sparse_matrix
+        lower, upper = self._model.limits_arrays
+        internal = [j for j, reaction_id in enumerate(matrix.reactions)
+                    if not self._model.is_exchange(reaction_id)]
+        internal_reactions = [matrix.reactions[j] for j in internal]
 
         # Indicator variable
-        alpha = self._prob.namespace(internal, types=lp.VariableType.Binary)
+        alpha = self._prob.namespace(
+            internal_reactions, types=lp.VariableType.Binary)
 
         # Delta mu is the stoichiometrically weighted sum of the compound mus.
-        dmu = self._prob.namespace(internal)
-
-        for reaction_id in self._model.reactions:
-            if not self._model.is_exchange(reaction_id):
-                flux = v(reaction_id)
-                alpha_r = alpha(reaction_id)
-                dmu_r = dmu(reaction_id)
-
-                lower, upper = self._model.limits[reaction_id]
-
-                # Constrain the reaction to a direction determined by alpha
-                # and contrain the delta mu to a value in [-em; -1] if
-                # alpha is one, otherwise in [1; em].
-                self._prob.add_linear_constraints(
-                    flux >= lower * (1 - alpha_r),
-                    flux <= upper * alpha_r,
-                    dmu_r >= -em * alpha_r + (1 - alpha_r),
-                    dmu_r <= em * (1 - alpha_r) - alpha_r)
+        dmu = self._prob.namespace(internal_reactions)
 
         # Define mu variables
-        mu = self._prob.namespace(self._model.compounds)
-
-        tdbalance_lhs = {reaction_id: 0
-                         for reaction_id in self._model.reactions}
-        for spec, value in iteritems(self._model.matrix):
-            compound, reaction_id = spec
-            if not self._model.is_exchange(reaction_id):
-                tdbalance_lhs[reaction_id] += mu(compound) * value
-        for reaction_id, lhs in iteritems(tdbalance_lhs):
-            if not self._model.is_exchange(reaction_id):
-                self._prob.add_linear_constraints(lhs == dmu(reaction_id))
+        mu = self._prob.namespace(matrix.compounds)
+
+        v_columns = self._v.columns(internal_reactions)
+        alpha_columns = alpha.columns(internal_reactions)
+        dmu_columns = dmu.columns(internal_reactions)
+
+        # The columns of the delta mu balances are the mu variables followed
+        # by the delta mu variables.
+        balance_columns = mu.columns(matrix.compounds) + dmu_columns
+        dmu_offset = len(matrix.compounds)
+
+        for k, j in enumerate(internal):
+            flux_columns = v_columns[k], alpha_columns[k]
+            delta_columns = dmu_columns[k], alpha_columns[k]
+            lower_j, upper_j = lower[j], upper[j]
+
+            # Constrain the reaction to a direction determined by alpha
+            # and contrain the delta mu to a value in [-em; -1] if
+            # alpha is one, otherwise in [1; em].
+            self._prob.add_linear_constraints(
+                lp.ArrayExpression(
+                    flux_columns, (0, 1), (1, lower_j), -lower_j) >= 0,
+                lp.ArrayExpression(flux_columns, (0, 1), (1, -upper_j)) <= 0,
+                lp.ArrayExpression(
+                    delta_columns, (0, 1), (1, em + 1), -1) >= 0,
+                lp.ArrayExpression(
+                    delta_columns, (0, 1), (1, em + 1), -em) <= 0)
+
+            indices = [i for i, _ in matrix.columns[j]]
+            values = [value for _, value in matrix.columns[j]]
+            indices.append(dmu_offset + k)
+            values.append(-1)
+            self._prob.add_linear_constraints(lp.ArrayExpression(
+                balance_columns, indices, values) == 0)
 
     def maximize(self, reaction):
         """Solve the model by maximizing the given reaction.
@@ -175,7 +468,10 @@ class FluxBalanceProblem(object):
         have zero weight).
         """
 
-        self._prob.set_objective(self.flux_expr(reaction))
+        if isinstance(reaction, dict):
+            self._prob.set_objective(self.flux_expr(reaction))
+        else:
+            self._v.set_objective_variable(reaction)
         self._solve()
 
     def flux_bound(self, reaction, direction):
@@ -185,8 +481,11 @@ class FluxBalanceProblem(object):
         negative number to obtain the lower bound. A value of inf or -inf is
         returned if the problem is unbounded.
         """
+        # Only the coefficients that changed since the previous objective
+        # are updated in the solver.
+        self._v.set_objective_variable(reaction, direction)
         try:
-            self.maximize({reaction: direction})
+            self._solve()
         except FluxBalanceError as e:
             if not e.result.unbounded:
                 raise
@@ -258,6 +557,43 @@ class FluxBalanceProblem(object):
         self._prob.set_objective(0)
         self._solve()
 
+    def flux_bounds(self, bounds):
+        """Temporarily change the flux bounds of reactions.
+
+        Returns a :class:`FluxBoundsGroup` that restores the previous bounds
+        when deleted. This is faster than adding and deleting constraints
+        since the solver can reuse the previous solution.
+
+        >>> with p.flux_bounds({'rxn_1': (0, 10)}):
+        ...     p.maximize('Biomass')
+
+        Args:
+            bounds: Dictionary of reaction IDs to (lower, upper)-tuples.
+        """
+        return FluxBoundsGroup(self, bounds)
+
+    def knockout(self, reactions):
+        """Temporarily constrain the fluxes of reactions to zero.
+
+        >>> with p.knockout(['rxn_1', 'rxn_2']):
+        ...     p.maximize('Biomass')
+
+        Args:
+            reactions: Reaction IDs to knock out.
+        """
+        return FluxBoundsGroup(
+            self, {reaction: (0, 0) for reaction in reactions})
+
+    def _restore_flux_bounds(self):
+        """Restore flux bounds of deleted groups."""
+        # Restore in the order the groups were deleted so that the bounds
+        # of nested groups end up at the outermost previous bounds.
+        for reactions, bounds in self._restore_bounds:
+            self._v.set_bounds(
+                reactions, lower=[lower for lower, _ in bounds],
+                upper=[upper for _, upper in bounds])
+        del self._restore_bounds[:]
+
     def _solve(self):
         """Solve the problem with the current objective."""
 
@@ -265,6 +601,8 @@ class FluxBalanceProblem(object):
         while len(self._remove_constr) > 0:
             self._remove_constr.pop().delete()
 
+        self._restore_flux_bounds()
+
         try:
             self._prob.solve(lp.ObjectiveSense.Maximize)
         except lp.SolverError as e:
@@ -279,6 +617,16 @@ class FluxBalanceProblem(object):
         """Get LP variable representing the reaction flux."""
         return self._v(reaction)
 
+    def get_flux_bounds(self, reaction):
+        """Get the current (lower, upper)-bounds of the reaction flux.
+
+        The bounds include the changes of flux bound groups that have not
+        been deleted.
+        """
+        self._restore_flux_bounds()
+        (lower, upper), = self._v.get_bounds([reaction])
+        return lower, upper
+
     def flux_expr(self, reaction):
         """Get LP expression representing the reaction flux."""
         if isinstance(reaction, dict):
@@ -289,6 +637,25 @@ class FluxBalanceProblem(object):
         """Get resulting flux value for reaction."""
         return self._prob.result.get_value(self._v(reaction))
 
+    def get_fluxes(self, reactions=None):
+        """Get resulting flux values for reactions as a :class:`FluxVector`.
+
+        The values are obtained from the solver in one call which is much
+        faster than calling :meth:`get_flux` for each reaction. If reactions
+        is not given, the fluxes of all reactions in the problem are
+        returned in the order of the reactions in the sparse stoichiometric
+        matrix of the model.
+        """
+        if reactions is None:
+            reactions = self._reactions
+            index = self._reaction_index
+        else:
+            reactions = tuple(reactions)
+            index = None
+
+        return FluxVector(
+            reactions, self._v.values(reactions), index=index)
+
 
 def flux_balance(model, reaction, tfba, solver):
     """Run flux balance analysis on the given model.
@@ -316,8 +683,126 @@ def flux_balance(model, reaction, tfba, solver):
 
     fba = _get_fba_problem(model, tfba, solver)
     fba.maximize(reaction)
+    fluxes = fba.get_fluxes()
     for reaction in model.reactions:
-        yield reaction, fba.get_flux(reaction)
+        yield reaction, fluxes[reaction]
+
+
+def objective_breakpoints(problem, objective, reaction, flux_min, flux_max,
+                          tolerance=1e-6):
+    """Find the breakpoints of the objective flux over a range of fixed flux.
+
+    The maximum flux of the objective reaction as a function of the fixed
+    flux of another reaction is a concave, piecewise linear function. The
+    function is evaluated adaptively where the curve bends: the lines through
+    the neighboring pairs of points are extended into an interval and the
+    curve is evaluated where they intersect. The intersection is an exact
+    breakpoint when it lies on both lines. The result is the exact curve
+    using far fewer solves than sampling at evenly spaced points.
+
+    The problem must not have integer constraints (e.g. thermodynamic
+    constraints) since the function is then not concave. The flux of the
+    reaction is fixed by changing the flux bounds which are restored
+    afterwards. Raises :class:`FluxBalanceError` if the problem is infeasible
+    at any point in the range.
+
+    Args:
+        problem: :class:`FluxBalanceProblem` to solve.
+        objective: Reaction to maximize.
+        reaction: Reaction to fix.
+        flux_min: Lower end of the range of fixed flux.
+        flux_max: Upper end of the range of fixed flux.
+        tolerance: Relative tolerance used when comparing objective values.
+            Intervals that are smaller than this fraction of the range are
+            not split further.
+
+    Returns:
+        Tuple of the list of (fixed flux, objective flux)-pairs at the ends
+        of the range and at the breakpoints, and the number of problems that
+        were solved.
+    """
+    # Ends that are only outside of the bounds because of rounding are
+    # moved onto the bounds.
+    lower, upper = problem.get_flux_bounds(reaction)
+    if lower - _BOUND_TOLERANCE * max(1, abs(lower)) <= flux_min < lower:
+        flux_min = lower
+    if upper < flux_max <= upper + _BOUND_TOLERANCE * max(1, abs(upper)):
+        flux_max = upper
+    if flux_min < lower or flux_max > upper or flux_min > flux_max:
+        raise ValueError('Invalid flux range for {}: {}, {}'.format(
+            reaction, flux_min, flux_max))
+
+    solves = [0]
+
+    def solve(flux):
+        solves[0] += 1
+        with problem.flux_bounds({reaction: (flux, flux)}):
+            problem.maximize(objective)
+            return problem.get_flux(objective)
+
+    def is_close(value, expected):
+        return abs(value - expected) <= tolerance * max(1.0, abs(expected))
+
+    points = [(flux_min, solve(flux_min))]
+    if flux_max == flux_min:
+        return points, solves[0]
+    points.append((flux_max, solve(flux_max)))
+
+    def slope(i):
+        (a, fa), (b, fb) = points[i], points[i + 1]
+        return (fb - fa) / (b - a)
+
+    def is_collinear(i):
+        (a, fa), (b, fb), (c, fc) = points[i:i + 3]
+        return is_close(fb, fa + (fc - fa) * (b - a) / (c - a))
+
+    # Intervals between consecutive points where the curve is known to be
+    # linear. Since the curve is concave, it is linear between three points
+    # if they are collinear, and the line through two points lies above the
+    # curve outside of the two points. The next point of an unknown interval
+    # is the intersection of the lines through the neighboring intervals
+    # which is a breakpoint if it is on both lines.
+    min_width = (flux_max - flux_min) * tolerance
+    linear = [False]
+    i = 0
+    while i < len(linear):
+        if linear[i]:
+            i += 1
+            continue
+
+        (a, fa), (b, fb) = points[i], points[i + 1]
+        if b - a <= min_width:
+            linear[i] = True
+            i += 1
+            continue
+
+        flux = a + (b - a) / 2.0
+        if i > 0 and i + 1 < len(linear):
+            left, right = slope(i - 1), slope(i + 1)
+            if left > right:
+                t = (fb - fa + left * a - right * b) / (left - right)
+                if a + min_width < t < b - min_width:
+                    flux = t
+
+        points.insert(i + 1, (flux, solve(flux)))
+        linear.insert(i, False)
+
+        # Check the triples of points that include the new point
+        for k in (i - 1, i, i + 1):
+            if 0 <= k and k + 2 < len(points) and is_collinear(k):
+                linear[k] = linear[k + 1] = True
+
+        # Continue from the first interval that may have changed
+        i = max(0, i - 1)
+
+    # Remove points that are not breakpoints
+    breakpoints = [points[0]]
+    for i in range(1, len(points) - 1):
+        if not is_close(slope(i), slope(i - 1)):
+            breakpoints.append(points[i])
+    breakpoints.append(points[-1])
+
+    return breakpoints, solves[0]
 
 
 def flux_variability(model, reactions, fixed, tfba, solver):
@@ -328,7 +813,11 @@ def flux_variability(model, reactions, fixed, tfba, solver):
     a reaction id to value mapping.
 
     This is an implementation of flux variability analysis (FVA) as described
-    in [Mahadevan03]_.
+    in [Mahadevan03]_. The reactions are solved (and yielded) in the order
+    given by :func:`flux_variability_order` so that the solver can reuse the
+    previous basis, and the problems for bounds that have already been
+    reached by a previous flux solution are skipped (see
+    :class:`FluxBoundTracker`).
 
     Args:
         model: MetabolicModel to solve.
@@ -348,9 +837,18 @@ def flux_variability(model, reactions, fixed, tfba, solver):
         flux = fba.get_flux_var(reaction_id)
         fba.prob.add_linear_constraints(flux >= value)
 
+    reactions = flux_variability_order(model, reactions)
+    tracker = FluxBoundTracker(model, reactions)
+
     def min_max_solve(reaction_id):
         for direction in (-1, 1):
-            yield fba.flux_bound(reaction_id, direction)
+            bound = tracker.get_bound(reaction_id, direction)
+            if bound is None:
+                bound = fba.flux_bound(reaction_id, direction)
+                if abs(bound) != _INF:
+                    tracker.update(iteritems(
+                        fba.get_fluxes(tracker.unreached_reactions())))
+            yield bound
 
     # Solve for each reaction
     for reaction_id in reactions:
@@ -380,8 +878,9 @@ def flux_minimization(model, fixed, solver, weights={}):
         fba.prob.add_linear_constraints(flux >= value)
 
     fba.minimize_l1()
+    fluxes = fba.get_fluxes()
 
-    return ((reaction_id, fba.get_flux(reaction_id))
+    return ((reaction_id, fluxes[reaction_id])
             for reaction_id in model.reactions)
 
 
@@ -413,8 +912,9 @@ def flux_randomization(model, threshold, tfba, solver):
         fba.prob.add_linear_constraints(fba.get_flux_var(reaction_id) >= value)
 
     fba.maximize(optimize)
+    fluxes = fba.get_fluxes()
     for reaction_id in model.reactions:
-        yield reaction_id, fba.get_flux(reaction_id)
+        yield reaction_id, fluxes[reaction_id]
 
 
 def consistency_check(model, subset, epsilon, tfba, solver):
@@ -453,14 +953,16 @@ def consistency_check(model, subset, epsilon, tfba, solver):
         logger.info('{} left, checking {}...'.format(len(subset), reaction))
 
         fba.maximize(reaction)
+        fluxes = fba.get_fluxes(subset)
         subset = set(reaction_id for reaction_id in subset
-                     if abs(fba.get_flux(reaction_id)) <= epsilon)
+                     if abs(fluxes[reaction_id]) <= epsilon)
         if reaction not in subset:
             continue
         elif model.is_reversible(reaction):
             fba.maximize({reaction: -1})
+            fluxes = fba.get_fluxes(subset)
             subset = set(reaction_id for reaction_id in subset
-                         if abs(fba.get_flux(reaction_id)) <= epsilon)
+                         if abs(fluxes[reaction_id]) <= epsilon)
             if reaction not in subset:
                 continue
 
@@ -17,13 +17,19 @@
 
 """Flux coupling analysis
 
-Described in [Burgard04]_.
+Described in [Burgard04]_. The pairs of reactions that have to be solved are
+pruned as described in [Larhlimi12]_. Enzyme subsets of fully coupled
+reactions can also be found directly from the nullspace of the stoichiometric
+matrix without solving any LP problems (see :func:`enzyme_subsets`).
 """
 
 import enum
+import heapq
 import logging
+from fractions import Fraction
 
-from six import iteritems
+from six import iteritems, itervalues
+from six.moves import range
 
 from psamm.lpsolver import lp
 
@@ -70,7 +76,8 @@ class FluxCouplingProblem(object):
         self._prob.define('t')
         t = self._prob.var('t')
 
-        self._vbow = self._prob.namespace(model.reactions)
+        self._reactions = list(model.reactions)
+        self._vbow = self._prob.namespace(self._reactions)
 
         # Define flux bounds
         for reaction_id in model.reactions:
@@ -90,6 +97,23 @@ class FluxCouplingProblem(object):
             self._prob.add_linear_constraints(lhs == 0)
 
         self._reaction_constr = None
+        self._solutions = []
+
+    @property
+    def reactions(self):
+        """Reactions of the problem in the order of :attr:`solutions`."""
+        return self._reactions
+
+    @property
+    def solutions(self):
+        """Flux solutions found by the latest call to :meth:`solve`.
+
+        Each solution is a list of the fluxes ordered as :attr:`reactions`.
+        The fluxes are scaled by the ``t`` variable of the problem so the
+        solutions are steady state flux directions rather than fluxes within
+        the flux bounds.
+        """
+        return self._solutions
 
     def solve(self, reaction_1, reaction_2):
         """Return the flux coupling between two reactions
@@ -110,6 +134,7 @@ class FluxCouplingProblem(object):
             self._vbow(reaction_2) == 1)
 
         results = []
+        self._solutions = []
         for sense in (lp.ObjectiveSense.Minimize, lp.ObjectiveSense.Maximize):
             try:
                 result = self._prob.solve(sense)
@@ -117,6 +142,7 @@ class FluxCouplingProblem(object):
                 results.append(None)
             else:
                 results.append(result.get_value(self._vbow(reaction_1)))
+                self._solutions.append(self._vbow.values(self._reactions))
 
         return tuple(results)
 
@@ -144,3 +170,350 @@ def classify_coupling(coupling):
         return CouplingClass.Full
     else:
         return CouplingClass.Partial
+
+
+class FluxCouplingCoordinator(object):
+    """Coordinate flux coupling problems that are solved in parallel.
+
+    The tasks are pairs of reactions that are solved with
+    :meth:`FluxCouplingProblem.solve`. The result of each task must be a
+    pair of the flux ratio bounds and the solutions found (see
+    :attr:`FluxCouplingProblem.solutions`) where every solution is given as
+    a sequence of fluxes ordered as :attr:`reactions`.
+
+    The pairs are generated in sorted order but most pairs never have to be
+    solved [Larhlimi12]_. First, every reaction that has not yet had a
+    positive flux in a solution is paired with itself to find the reactions
+    that are unable to take a positive flux. Any solution where reaction 2
+    has zero flux shows that the flux ratio ``v1 / v2`` is unbounded in the
+    direction of the flux of reaction 1. Pairs with bounded flux ratios are
+    directionally coupled and since directional coupling is transitive, any
+    reaction that can have flux when reaction 2 has zero flux can also have
+    flux when reaction 1 has zero flux. Pairs where reaction 1 is found to
+    be blocked or uncoupled from reaction 2 in this way are skipped. When a
+    pair is found to be fully coupled, reaction 2 is merged into the class
+    of reaction 1 and no further pairs are generated with reaction 2.
+
+    >>> coordinator = FluxCouplingCoordinator(model)
+    >>> results = executor.imap_unordered(coordinator.tasks())
+    >>> for (reaction_1, reaction_2), bounds in coordinator.results(results):
+    ...     print(reaction_1, reaction_2, bounds)
+
+    Args:
+        model: :class:`MetabolicModel` that the problems are solved on.
+        reactions: Reactions to find coupling between (default is all
+            reactions of the model).
+        tolerance: Fluxes with a smaller absolute value are considered zero.
+    """
+
+    def __init__(self, model, reactions=None, tolerance=1e-9):
+        if reactions is None:
+            reactions = model.reactions
+        self._reactions = sorted(reactions)
+        self._index = {
+            reaction_id: i for i, reaction_id in enumerate(self._reactions)}
+        self._tolerance = tolerance
+
+        # Reactions that can only have positive flux
+        self._irreversible = [
+            model.limits[reaction_id].lower >= 0
+            for reaction_id in self._reactions]
+
+        # Bit sets of reactions that had positive or non-zero flux in a
+        # solution, and set of reactions that cannot have positive flux.
+        self._positive = 0
+        self._nonzero = 0
+        self._infeasible = set()
+
+        # For each reaction, bit sets of the reactions that can have positive
+        # (or negative) flux when the reaction has zero flux.
+        count = len(self._reactions)
+        self._zero_positive = [0] * count
+        self._zero_negative = [0] * count
+
+        # For each reaction, the reactions that are directionally coupled
+        # to it.
+        self._coupled_from = [[] for _ in range(count)]
+
+        self._merged = {}
+        self._classes = {}
+
+    @property
+    def reactions(self):
+        """Reactions in the order that fluxes of solutions are reported."""
+        return self._reactions
+
+    @property
+    def classes(self):
+        """Dictionary of the fully coupled classes that have been merged.
+
+        Each class is keyed by the first reaction of the class and the value
+        is a list of reaction and ratio pairs such that the flux of each
+        reaction is the ratio times the flux of the first reaction.
+        """
+        return {
+            self._reactions[i]: [(self._reactions[j], ratio)
+                                 for j, ratio in members]
+            for i, members in iteritems(self._classes)}
+
+    def has_flux(self, reaction_id):
+        """Return True if the reaction had non-zero flux in any solution."""
+        return bool((self._nonzero >> self._index[reaction_id]) & 1)
+
+    def tasks(self):
+        """Iterate over the tasks that remain to be solved."""
+        for i, reaction_id in enumerate(self._reactions):
+            if not (self._positive >> i) & 1 and i not in self._infeasible:
+                yield reaction_id, reaction_id
+
+        for i, reaction_1 in enumerate(self._reactions):
+            for j in range(i + 1, len(self._reactions)):
+                if i in self._merged:
+                    break
+                if j not in self._merged and not self._is_implied(i, j):
+                    yield reaction_1, self._reactions[j]
+
+    def results(self, task_results):
+        """Iterate over task and flux ratio bounds of the solved pairs.
+
+        Args:
+            task_results: Iterable of task and task result pairs for the
+                tasks obtained from :meth:`tasks`.
+        """
+        for task, (bounds, solutions) in task_results:
+            for fluxes in solutions:
+                self._add_solution(fluxes)
+
+            reaction_1, reaction_2 = task
+            i, j = self._index[reaction_1], self._index[reaction_2]
+            if i == j:
+                if bounds[0] is None:
+                    self._infeasible.add(i)
+                continue
+
+            self._add_bounds(i, j, bounds)
+            yield task, bounds
+
+    def _is_implied(self, i, j):
+        """Return True if the pair does not need to be solved.
+
+        The pair can be skipped if reaction 2 cannot have positive flux, if
+        reaction 1 is irreversible and blocked, or if reaction 1 is
+        uncoupled from reaction 2.
+        """
+        if j in self._infeasible:
+            return True
+        if not (self._positive >> j) & 1:
+            return False
+
+        positive = (self._zero_positive[j] >> i) & 1
+        if self._irreversible[i]:
+            return (i in self._infeasible or
+                    (positive and (self._zero_positive[i] >> j) & 1))
+        return positive and (self._zero_negative[j] >> i) & 1
+
+    def _add_solution(self, fluxes):
+        positive, negative = 0, 0
+        zero = []
+        for i, flux in enumerate(fluxes):
+            if flux > self._tolerance:
+                positive |= 1 << i
+            elif flux < -self._tolerance:
+                negative |= 1 << i
+            else:
+                zero.append(i)
+
+        self._positive |= positive
+        self._nonzero |= positive | negative
+        for i in zero:
+            self._add_uncoupled(i, positive, negative)
+
+    def _add_uncoupled(self, i, positive, negative):
+        """Add reactions that can have flux when reaction i has zero flux.
+
+        The reactions are also added to every reaction that is directionally
+        coupled to reaction i.
+        """
+        stack = [i]
+        while len(stack) > 0:
+            i = stack.pop()
+            zero_positive = self._zero_positive[i] | positive
+            zero_negative = self._zero_negative[i] | negative
+            if (zero_positive == self._zero_positive[i] and
+                    zero_negative == self._zero_negative[i]):
+                continue
+
+            self._zero_positive[i] = zero_positive
+            self._zero_negative[i] = zero_negative
+            stack.extend(self._coupled_from[i])
+
+    def _add_bounds(self, i, j, bounds):
+        lower, upper = bounds
+        if lower is None and upper is None:
+            # The problem is either infeasible or unbounded in both
+            # directions which can only be distinguished if reaction 2 is
+            # known to have positive flux.
+            if not (self._positive >> j) & 1:
+                return
+
+        if lower is None:
+            self._add_uncoupled(j, 0, 1 << i)
+        if upper is None:
+            self._add_uncoupled(j, 1 << i, 0)
+
+        if ((lower is None or lower <= 0.0) and
+                (upper is None or upper >= 0.0)):
+            # Reaction 1 can have zero flux while reaction 2 is positive
+            self._add_uncoupled(i, 1 << j, 0)
+
+        if lower is not None and upper is not None:
+            self._coupled_from[j].append(i)
+            self._add_uncoupled(
+                i, self._zero_positive[j], self._zero_negative[j])
+
+            if (classify_coupling(bounds) == CouplingClass.Full and
+                    j not in self._merged):
+                root, ratio = self._merged.get(i, (i, 1))
+                self._merged[j] = root, ratio / lower
+                members = self._classes.setdefault(root, [(root, 1)])
+                members.append((j, ratio / lower))
+
+
+def _exact(value):
+    """Return rational value as an integer if possible.
+
+    Arithmetic on integers is much faster than on fractions and most
+    stoichiometric values are integers.
+    """
+    if isinstance(value, Fraction) and value.denominator == 1:
+        return value.numerator
+    return value
+
+
+def enzyme_subsets(model):
+    """Return enzyme subsets of fully coupled reactions in the model.
+
+    The enzyme subsets are found from the right nullspace of the
+    stoichiometric matrix. Two reactions are fully coupled at steady state if
+    their rows of the nullspace basis are proportional, in which case the
+    ratio of the rows is the ratio of the fluxes. Flux bounds are not taken
+    into account so every pair of reactions in a subset is fully coupled
+    with the same ratio when the flux bounds are imposed unless the reactions
+    are blocked. Reactions with zero rows have zero flux in every steady state
+    and are not included in any subset.
+
+    The nullspace is obtained from a Gauss-Jordan elimination of the sparse
+    matrix where pivots are selected to reduce fill-in. The elimination is
+    performed with exact rational arithmetic so the rank and the ratios are
+    exact.
+
+    Args:
+        model: :class:`psamm.metabolicmodel.MetabolicModel`.
+
+    Returns:
+        List of subsets where each subset is a list of reaction and ratio
+        pairs such that the flux of each reaction is the ratio (a
+        :class:`fractions.Fraction`) times the flux of the first reaction.
+        Every reaction that is not blocked is in exactly one subset (possibly
+        on its own).
+    """
+    reactions = sorted(model.reactions)
+    index = {reaction_id: i for i, reaction_id in enumerate(reactions)}
+
+    # Rows of the stoichiometric matrix indexed by compound
+    compound_index = {}
+    rows = []
+    for (compound, reaction_id), value in iteritems(model.matrix):
+        try:
+            value = _exact(Fraction(value))
+        except TypeError:
+            raise ValueError(
+                'Unable to find nullspace with stoichiometry {} of {} in'
+                ' {}'.format(value, compound, reaction_id))
+        if value != 0:
+            if compound not in compound_index:
+                compound_index[compound] = len(rows)
+                rows.append({})
+            rows[compound_index[compound]][index[reaction_id]] = value
+
+    column_rows = [set() for _ in reactions]
+    for i, row in enumerate(rows):
+        for j in row:
+            column_rows[j].add(i)
+
+    # Each row is eliminated from all other rows (including the previous
+    # pivot rows) so the pivot rows end up in reduced row echelon form. The
+    # sparsest remaining row is selected next and the pivot is the column of
+    # the row with the fewest other non-zeros. The heap can contain outdated
+    # entries for rows that have changed since they were added.
+    remaining = set(range(len(rows)))
+    heap = [(len(row), i) for i, row in enumerate(rows)]
+    heapq.heapify(heap)
+    pivots = {}
+    while len(heap) > 0:
+        count, i = heapq.heappop(heap)
+        if i not in remaining or count != len(rows[i]):
+            continue
+
+        remaining.remove(i)
+        row = rows[i]
+        if len(row) == 0:
+            continue
+
+        pivot = min(row, key=lambda j: (len(column_rows[j]), j))
+        pivot_value = row[pivot]
+        if pivot_value == -1:
+            for j in row:
+                row[j] = -row[j]
+        elif pivot_value != 1:
+            for j in row:
+                row[j] = _exact(Fraction(row[j]) / pivot_value)
+        pivots[i] = pivot
+
+        for other in list(column_rows[pivot]):
+            if other == i:
+                continue
+
+            other_row = rows[other]
+            factor = other_row.pop(pivot)
+            column_rows[pivot].discard(other)
+            for j, value in iteritems(row):
+                if j == pivot:
+                    continue
+                new_value = _exact(other_row.get(j, 0) - factor * value)
+                if new_value != 0:
+                    if j not in other_row:
+                        column_rows[j].add(other)
+                    other_row[j] = new_value
+                elif j in other_row:
+                    del other_row[j]
+                    column_rows[j].discard(other)
+
+            if other in remaining:
+                heapq.heappush(heap, (len(other_row), other))
+
+    # The nullspace basis has a vector for each free column. The row of a
+    # free column is the unit vector and the row of a pivot column is the
+    # negated pivot row.
+    kernel = [{j: 1} for j in range(len(reactions))]
+    for i, pivot in iteritems(pivots):
+        kernel[pivot] = {
+            j: -value for j, value in iteritems(rows[i]) if j != pivot}
+
+    subsets = {}
+    for i, row in enumerate(kernel):
+        if len(row) == 0:
+            continue
+        first = min(row)
+        scale = Fraction(row[first])
+        key = tuple(sorted((j, value / scale) for j, value in iteritems(row)))
+        subsets.setdefault(key, []).append((i, scale))
+
+    result = []
+    for members in itervalues(subsets):
+        members.sort()
+        _, first_scale = members[0]
+        result.append([
+            (reactions[i], scale / first_scale) for i, scale in members])
+
+    return sorted(result)
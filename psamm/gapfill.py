@@ -23,6 +23,7 @@ This implements a variant of the algorithms described in [Kumar07]_.
 import logging
 
 from six import iteritems, raise_from
+from six.moves import range, zip
 
 from .lpsolver import lp
 
@@ -82,52 +83,62 @@ def gapfind(model, solver, epsilon=0.001, v_max=1000, implicit_sinks=True):
         prob.integrality_tolerance.value = int_tol
 
     # Define flux variables
+    matrix = model.sparse_matrix
+    limits_lower, limits_upper = model.limits_arrays
     v = prob.namespace()
-    for reaction_id in model.reactions:
-        lower, upper = model.limits[reaction_id]
-        v.define([reaction_id], lower=lower, upper=upper)
+    v.define(matrix.reactions, lower=limits_lower, upper=limits_upper)
 
     # Define constraints on production of metabolites in reaction
-    w = prob.namespace(types=lp.VariableType.Binary)
-    binary_cons_lhs = {compound: 0 for compound in model.compounds}
-    for spec, value in iteritems(model.matrix):
-        compound, reaction_id = spec
-        if value != 0:
-            w.define([spec])
-            w_var = w(spec)
-
-            lower, upper = (float(x) for x in model.limits[reaction_id])
-            if value > 0:
-                dv = v(reaction_id)
-            else:
-                dv = -v(reaction_id)
-                lower, upper = -upper, -lower
+    specs = []
+    for j, reaction_id in enumerate(matrix.reactions):
+        for i, value in matrix.columns[j]:
+            if value != 0:
+                specs.append((j, i, value))
+
+    w_names = [(matrix.compounds[i], matrix.reactions[j])
+               for j, i, _ in specs]
+    w = prob.namespace(w_names, types=lp.VariableType.Binary)
+    w_columns = w.columns(w_names)
+    v_columns = v.columns(matrix.reactions)
+
+    binary_cons_columns = {compound: [] for compound in model.compounds}
+    for (j, i, value), w_column in zip(specs, w_columns):
+        lower, upper = float(limits_lower[j]), float(limits_upper[j])
+        if value > 0:
+            direction = 1
+        else:
+            direction = -1
+            lower, upper = -upper, -lower
 
-            prob.add_linear_constraints(
-                dv <= upper * w_var,
-                dv >= epsilon + (lower - epsilon) * (1 - w_var))
+        # The flux producing the compound is in [epsilon; upper] if w is
+        # one, otherwise it is in [lower; 0].
+        columns = v_columns[j], w_column
+        prob.add_linear_constraints(
+            lp.ArrayExpression(columns, (0, 1), (direction, -upper)) <= 0,
+            lp.ArrayExpression(
+                columns, (0, 1), (direction, lower - epsilon), -lower) >= 0)
 
-            binary_cons_lhs[compound] += w_var
+        binary_cons_columns[matrix.compounds[i]].append(w_column)
 
     xp = prob.namespace(model.compounds, types=lp.VariableType.Binary)
     objective = xp.sum(model.compounds)
     prob.set_objective(objective)
 
-    for compound, lhs in iteritems(binary_cons_lhs):
-        prob.add_linear_constraints(lhs >= xp(compound))
+    for compound, columns in iteritems(binary_cons_columns):
+        count = len(columns)
+        columns = tuple(columns) + xp.columns([compound])
+        prob.add_linear_constraints(lp.ArrayExpression(
+            columns, range(count + 1), [1] * count + [-1]) >= 0)
 
     # Define mass balance constraints
-    massbalance_lhs = {compound: 0 for compound in model.compounds}
-    for spec, value in iteritems(model.matrix):
-        compound, reaction_id = spec
-        massbalance_lhs[compound] += v(reaction_id) * value
-    for compound, lhs in iteritems(massbalance_lhs):
-        if implicit_sinks:
-            # The constraint is merely >0 meaning that we have implicit sinks
-            # for all compounds.
-            prob.add_linear_constraints(lhs >= 0)
-        else:
-            prob.add_linear_constraints(lhs == 0)
+    if implicit_sinks:
+        # The constraint is merely >0 meaning that we have implicit sinks
+        # for all compounds.
+        sense = lp.RelationSense.Greater
+    else:
+        sense = lp.RelationSense.Equals
+    prob.add_linear_constraints_matrix(
+        v.set(matrix.reactions), matrix, sense)
 
     # Solve
     try:
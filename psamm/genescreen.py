@@ -0,0 +1,183 @@
+# This file is part of PSAMM.
+#
+# PSAMM is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PSAMM is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PSAMM.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Copyright 2014-2017  Jon Lund Steffensen <jon_steffensen@uri.edu>
+
+"""Screening of gene knockouts.
+
+The gene associations of the model are parsed once into a
+:class:`GeneKnockoutMap` which determines the reactions that are deleted
+when a set of genes is knocked out. The gene associations are compiled with
+:class:`psamm.expression.boolean.CompiledExpressions` so that many gene sets
+can be evaluated in one batch. Gene sets that result in identical reaction
+deletions only have to be evaluated once, see :func:`group_gene_knockouts`.
+"""
+
+from __future__ import unicode_literals
+
+import logging
+from collections import defaultdict, OrderedDict
+from itertools import chain, combinations, islice
+
+from six import iteritems
+from six.moves import zip
+
+from . import fluxanalysis, moma
+from .expression.boolean import CompiledExpressions
+
+logger = logging.getLogger(__name__)
+
+
+class GeneKnockoutMap(object):
+    """Map from genes to the reactions deleted by knocking out the genes.
+
+    Args:
+        gene_assoc: Dictionary of reaction IDs to
+            :class:`psamm.expression.boolean.Expression` objects, e.g. as
+            returned by :func:`psamm.randomsparse.get_gene_associations`.
+    """
+
+    def __init__(self, gene_assoc):
+        self._gene_assoc = dict(gene_assoc)
+        self._gene_reactions = defaultdict(set)
+        for reaction, assoc in iteritems(self._gene_assoc):
+            for variable in assoc.variables:
+                self._gene_reactions[variable.symbol].add(reaction)
+        self._compiled = CompiledExpressions(self._gene_assoc)
+
+    @property
+    def genes(self):
+        """Set of genes in the gene associations."""
+        return set(self._gene_reactions)
+
+    def gene_reactions(self, gene):
+        """Return set of reactions associated with the gene."""
+        return frozenset(self._gene_reactions.get(gene, ()))
+
+    def deleted_reactions(self, genes):
+        """Return set of reactions deleted when the genes are knocked out.
+
+        A reaction is deleted if its gene association evaluates to false
+        when the given genes are false.
+        """
+        return self.deleted_reactions_batch([genes])[0]
+
+    def deleted_reactions_batch(self, gene_sets):
+        """Return list of deleted reactions for each of the gene sets.
+
+        This evaluates all gene sets in one pass over the compiled gene
+        associations which is much faster than calling
+        :meth:`deleted_reactions` for each gene set.
+        """
+        return [frozenset(deleted) for deleted in
+                self._compiled.false_expressions(gene_sets)]
+
+
+def iter_gene_knockouts(knockout_map, genes=None, pairs=False,
+                        batch_size=4096):
+    """Yield gene knockouts and the reactions that they delete.
+
+    Yields (genes, deleted reactions)-tuples where genes is a tuple of one
+    gene (single knockouts) or, if pairs is True, two genes (double
+    knockouts). The single knockouts are yielded first.
+
+    Args:
+        knockout_map: :class:`GeneKnockoutMap` of the model.
+        genes: Genes to knock out. Defaults to all genes of the map.
+        pairs: Whether to also yield all pairwise knockouts.
+        batch_size: Number of knockouts to evaluate in each batch.
+    """
+    if genes is None:
+        genes = knockout_map.genes
+    genes = sorted(genes)
+
+    knockouts = ((gene,) for gene in genes)
+    if pairs:
+        knockouts = chain(knockouts, combinations(genes, 2))
+
+    while True:
+        batch = list(islice(knockouts, batch_size))
+        if len(batch) == 0:
+            break
+        for gene_set, deleted in zip(
+                batch, knockout_map.deleted_reactions_batch(batch)):
+            yield gene_set, deleted
+
+
+def group_gene_knockouts(knockouts):
+    """Group gene knockouts that delete the same reactions.
+
+    Returns an ordered dictionary of the deleted reactions as frozensets to
+    the list of gene tuples that result in these deletions.
+
+    Args:
+        knockouts: Iterable of (genes, deleted reactions)-tuples, e.g. from
+            :func:`iter_gene_knockouts`.
+    """
+    groups = OrderedDict()
+    for genes, deleted in knockouts:
+        groups.setdefault(frozenset(deleted), []).append(genes)
+    return groups
+
+
+class GeneKnockoutProblem(object):
+    """Objective flux of the model when reactions are deleted.
+
+    The problem is created once and the deleted reactions are changed for
+    each call to :meth:`solve`.
+
+    Args:
+        model: :class:`psamm.metabolicmodel.MetabolicModel` to solve.
+        solver: LP solver instance to use (must support quadratic
+            objectives for the ``moma`` method).
+        objective: Objective reaction.
+        method: One of ``fba``, ``lin_moma`` or ``moma``.
+        wt_fluxes: Wild type fluxes for the MOMA methods. These are computed
+            if not given.
+    """
+
+    def __init__(self, model, solver, objective, method='fba',
+                 wt_fluxes=None):
+        if method not in ('fba', 'lin_moma', 'moma'):
+            raise ValueError('Invalid method: {}'.format(method))
+
+        self._objective = objective
+        self._method = method
+        if method == 'fba':
+            self._problem = fluxanalysis.FluxBalanceProblem(model, solver)
+        else:
+            if wt_fluxes is None:
+                wt_fluxes = moma.minimal_fba_fluxes(model, objective, solver)
+            self._problem = moma.KnockoutMOMAProblem(
+                model, solver, wt_fluxes, linear=(method == 'lin_moma'))
+
+    def solve(self, reactions):
+        """Return objective flux when the given reactions are deleted.
+
+        Returns None if the problem is infeasible.
+        """
+        if self._method == 'fba':
+            with self._problem.knockout(reactions):
+                try:
+                    self._problem.maximize(self._objective)
+                except fluxanalysis.FluxBalanceError:
+                    return None
+                return self._problem.get_flux(self._objective)
+
+        try:
+            self._problem.solve(reactions)
+        except moma.MOMAError:
+            return None
+        return self._problem.get_flux(self._objective)
@@ -33,7 +33,15 @@ logger = logging.getLogger(__name__)
 
 
 class BaseImporter(Importer):
-    """Base importer for reading metabolic model from an SBML file."""
+    """Base importer for reading metabolic model from an SBML file.
+
+    Args:
+        streaming: Parse the SBML file incrementally (see
+            :class:`psamm.datasource.sbml.SBMLReader`).
+    """
+
+    def __init__(self, streaming=False):
+        self._streaming = streaming
 
     def help(self):
         """Print importer help text."""
@@ -75,7 +83,9 @@ class StrictImporter(BaseImporter):
 
     def _open_reader(self, f):
         try:
-            return sbml.SBMLReader(f, strict=True, ignore_boundary=True)
+            return sbml.SBMLReader(
+                f, strict=True, ignore_boundary=True,
+                streaming=self._streaming)
         except sbml.ParseError as e:
             raise ParseError(e)
 
@@ -112,7 +122,10 @@ class NonstrictImporter(BaseImporter):
 
     def _open_reader(self, f):
         try:
-            return sbml.SBMLReader(f, strict=False, ignore_boundary=True)
+            # Notes are needed to convert the model
+            return sbml.SBMLReader(
+                f, strict=False, ignore_boundary=True,
+                streaming=self._streaming, read_notes=True)
         except sbml.ParseError as e:
             raise ParseError(e)
 
@@ -23,7 +23,7 @@ import logging
 from itertools import repeat, count
 import numbers
 
-from six import text_type, raise_from
+from six import text_type, raise_from, iteritems
 from six.moves import zip
 import cplex as cp
 
@@ -117,8 +117,8 @@ class Problem(BaseProblem):
         self._var_names = (i for i in count(0))
         self._constr_names = ('c'+str(i) for i in count(1))
 
-        # Keep track of the objective variables that are non-zero
-        self._non_zero_objective = set()
+        # Keep track of the objective coefficients that are non-zero
+        self._non_zero_objective = {}
 
         self._result = None
         self._solve_count = 0
@@ -181,6 +181,40 @@ class Problem(BaseProblem):
         """Check whether variable is defined in the model."""
         return name in self._variables
 
+    def get_variable_bounds(self, names):
+        """Return the bounds of the given variables.
+
+        See :meth:`.lp.Problem.get_variable_bounds`.
+        """
+        indices = [self._variables[name] for name, _, _ in
+                   self._variable_bounds(names, None, None)]
+        if len(indices) == 0:
+            return []
+
+        lower = self._cp.variables.get_lower_bounds(indices)
+        upper = self._cp.variables.get_upper_bounds(indices)
+        return [(-_INF if lb <= -cp.infinity else lb,
+                 _INF if ub >= cp.infinity else ub)
+                for lb, ub in zip(lower, upper)]
+
+    def set_variable_bounds(self, names, lower=None, upper=None):
+        """Change the bounds of the given variables.
+
+        See :meth:`.lp.Problem.set_variable_bounds`.
+        """
+        lower_values = []
+        upper_values = []
+        for name, lb, ub in self._variable_bounds(names, lower, upper):
+            i = self._variables[name]
+            lower_values.append(
+                (i, -cp.infinity if lb is None or lb == -_INF else float(lb)))
+            upper_values.append(
+                (i, cp.infinity if ub is None or ub == _INF else float(ub)))
+
+        if len(lower_values) > 0:
+            self._cp.variables.set_lower_bounds(lower_values)
+            self._cp.variables.set_upper_bounds(upper_values)
+
     def _add_constraints(self, relation):
         """Add the given relation as one or more constraints
 
@@ -220,6 +254,40 @@ class Problem(BaseProblem):
 
         return constraints
 
+    def add_linear_constraints_matrix(self, variables, matrix, sense, rhs=0):
+        """Add a constraint for each row of a sparse matrix.
+
+        All rows are added in a single call to the Cplex API. See
+        :meth:`.lp.Problem.add_linear_constraints_matrix`.
+        """
+        variables = self._matrix_columns(variables, matrix)
+        columns = [self._variables[variable] for variable in variables]
+
+        constraints = []
+        names = []
+        pairs = []
+        rhs_values = []
+        for indices, data, value in self._matrix_rows(matrix, rhs):
+            if self._check_matrix_row(sense, len(indices), value):
+                constraints.append(Constraint(self, None))
+                continue
+
+            name = next(self._constr_names)
+            names.append(name)
+            pairs.append(cp.SparsePair(
+                ind=[columns[j] for j in indices],
+                val=[float(v) for v in data]))
+            rhs_values.append(float(value))
+            constraints.append(Constraint(self, name))
+
+        if len(names) > 0:
+            self._cp.linear_constraints.add(
+                names=names, lin_expr=pairs,
+                senses=[self.CONSTR_SENSE_MAP[sense]] * len(names),
+                rhs=rhs_values)
+
+        return constraints
+
     def set_objective(self, expression):
         """Set objective expression of the problem."""
 
@@ -231,8 +299,11 @@ class Problem(BaseProblem):
         linear = []
         quad = []
 
+        previous = self._non_zero_objective
+        self._non_zero_objective = {}
+
         # Reset previous objective.
-        for var in self._non_zero_objective:
+        for var in previous:
             if var not in expression:
                 if not isinstance(var, Product):
                     linear.append((self._variables[var], 0))
@@ -240,22 +311,24 @@ class Problem(BaseProblem):
                     t = self._variables[var[0]], self._variables[var[1]], 0
                     quad.append(t)
 
-        self._non_zero_objective.clear()
-
-        # Set actual objective values
+        # Set actual objective values. Only coefficients that changed since
+        # the previous objective are passed to Cplex.
         for var, value in expression.values():
+            value = float(value)
             if not isinstance(var, Product):
-                self._non_zero_objective.add(var)
-                linear.append((self._variables[var], float(value)))
+                self._non_zero_objective[var] = value
+                if previous.get(var) != value:
+                    linear.append((self._variables[var], value))
             else:
                 if len(var) > 2:
                     raise ValueError('Invalid objective: {}'.format(var))
-                self._non_zero_objective.add(var)
-                var1 = self._variables[var[0]]
-                var2 = self._variables[var[1]]
-                if var1 == var2:
-                    value *= 2
-                quad.append((var1, var2, float(value)))
+                self._non_zero_objective[var] = value
+                if previous.get(var) != value:
+                    var1 = self._variables[var[0]]
+                    var2 = self._variables[var[1]]
+                    if var1 == var2:
+                        value *= 2
+                    quad.append((var1, var2, value))
 
         # We have to build the set of variables to
         # update so that we can avoid calling set_linear if the set is empty.
@@ -276,6 +349,33 @@ class Problem(BaseProblem):
        Use :meth:`set_objective` instead.
     """
 
+    def update_objective(self, values):
+        """Change the linear objective coefficients of the given variables."""
+        if isinstance(values, dict):
+            values = iteritems(values)
+
+        linear = [(self._variables[var], value)
+                  for var, value in self._objective_changes(
+                      self._non_zero_objective,
+                      ((var, float(value)) for var, value in values))]
+        if len(linear) > 0:
+            self._cp.objective.set_linear(linear)
+
+    def set_objective_variable(self, name, value=1):
+        """Set objective of the problem to a single variable."""
+        if any(isinstance(var, Product) for var in self._non_zero_objective):
+            # Quadratic terms have to be reset through set_objective()
+            self.set_objective(self.expr({name: value}))
+            return
+
+        values = {var: 0.0 for var in self._non_zero_objective
+                  if var != name}
+        values[name] = float(value)
+        self.update_objective(values)
+
+        if hasattr(self._cp.objective, 'set_offset'):
+            self._cp.objective.set_offset(0.0)
+
     def set_objective_sense(self, sense):
         """Set type of problem (maximize or minimize)"""
         if sense == ObjectiveSense.Minimize:
@@ -318,9 +418,13 @@ class Problem(BaseProblem):
                 else:
                     new_type = self._cp.problem_type.MILP
 
-            logger.debug('Setting problem type to {}...'.format(
-                self._cp.problem_type[new_type]))
-            self._cp.set_problem_type(new_type)
+            # Changing the problem type discards the current basis so only
+            # do this when necessary to allow warm-starting from the
+            # previous solution.
+            if new_type != self._cp.get_problem_type():
+                logger.debug('Setting problem type to {}...'.format(
+                    self._cp.problem_type[new_type]))
+                self._cp.set_problem_type(new_type)
         else:
             logger.debug('Problem type is {}'.format(
                 self._cp.problem_type[self._cp.get_problem_type()]))
@@ -469,3 +573,15 @@ class Result(BaseResult):
         """Return value of expression."""
         self._check_valid()
         return super(Result, self).get_value(expression)
+
+    def _get_values(self, variables):
+        """Return values of variables in solution."""
+        if len(variables) == 0:
+            return []
+        return self._problem._cp.solution.get_values(
+            [self._problem._variables[var] for var in variables])
+
+    def get_values(self, variables):
+        """Return values of variables."""
+        self._check_valid()
+        return super(Result, self).get_values(variables)
@@ -23,6 +23,7 @@ import logging
 from itertools import repeat, count
 import numbers
 
+from six import iteritems
 from six.moves import zip
 
 import swiglpk
@@ -88,6 +89,9 @@ class Problem(BaseProblem):
         self._variables = {}
         self._constraints = {}
 
+        # Non-zero linear objective coefficients
+        self._objective = {}
+
         self._do_presolve = True
 
         # Initialize simplex tolerances to default values
@@ -153,34 +157,65 @@ class Problem(BaseProblem):
         for i, name, lb, ub, vt in zip(
                 var_indices, names, lower, upper, vartype):
             self._variables[name] = i
-
-            lb = None if lb == -_INF else lb
-            ub = None if ub == _INF else ub
-
-            if lb is None and ub is None:
-                swiglpk.glp_set_col_bnds(self._p, i, swiglpk.GLP_FR, 0, 0)
-            elif lb is None:
-                swiglpk.glp_set_col_bnds(
-                    self._p, i, swiglpk.GLP_UP, 0, float(ub))
-            elif ub is None:
-                swiglpk.glp_set_col_bnds(
-                    self._p, i, swiglpk.GLP_LO, float(lb), 0)
-            elif lb == ub:
-                swiglpk.glp_set_col_bnds(
-                    self._p, i, swiglpk.GLP_FX, float(lb), 0)
-            else:
-                swiglpk.glp_set_col_bnds(
-                    self._p, i, swiglpk.GLP_DB, float(lb), float(ub))
+            self._set_col_bounds(i, lb, ub)
 
             if vt != VariableType.Continuous:
                 swiglpk.glp_set_col_kind(self._p, i, self.VARTYPE_MAP[vt])
 
         self._do_presolve = True
 
+    def _set_col_bounds(self, i, lb, ub):
+        """Set bounds of column with index i."""
+        lb = None if lb == -_INF else lb
+        ub = None if ub == _INF else ub
+
+        if lb is None and ub is None:
+            swiglpk.glp_set_col_bnds(self._p, i, swiglpk.GLP_FR, 0, 0)
+        elif lb is None:
+            swiglpk.glp_set_col_bnds(
+                self._p, i, swiglpk.GLP_UP, 0, float(ub))
+        elif ub is None:
+            swiglpk.glp_set_col_bnds(
+                self._p, i, swiglpk.GLP_LO, float(lb), 0)
+        elif lb == ub:
+            swiglpk.glp_set_col_bnds(
+                self._p, i, swiglpk.GLP_FX, float(lb), 0)
+        else:
+            swiglpk.glp_set_col_bnds(
+                self._p, i, swiglpk.GLP_DB, float(lb), float(ub))
+
     def has_variable(self, name):
         """Check whether variable is defined in the model."""
         return name in self._variables
 
+    def get_variable_bounds(self, names):
+        """Return the bounds of the given variables.
+
+        See :meth:`.lp.Problem.get_variable_bounds`.
+        """
+        bounds = []
+        for name, _, _ in self._variable_bounds(names, None, None):
+            i = self._variables[name]
+            col_type = swiglpk.glp_get_col_type(self._p, i)
+            lb, ub = -_INF, _INF
+            if col_type in (
+                    swiglpk.GLP_LO, swiglpk.GLP_DB, swiglpk.GLP_FX):
+                lb = swiglpk.glp_get_col_lb(self._p, i)
+            if col_type in (
+                    swiglpk.GLP_UP, swiglpk.GLP_DB, swiglpk.GLP_FX):
+                ub = swiglpk.glp_get_col_ub(self._p, i)
+            bounds.append((lb, ub))
+        return bounds
+
+    def set_variable_bounds(self, names, lower=None, upper=None):
+        """Change the bounds of the given variables.
+
+        The basis of the last solution is kept so the next solve is warm
+        started. See :meth:`.lp.Problem.set_variable_bounds`.
+        """
+        for name, lb, ub in self._variable_bounds(names, lower, upper):
+            self._set_col_bounds(self._variables[name], lb, ub)
+
     def _add_constraints(self, relation):
         """Add the given relation as one or more constraints.
 
@@ -239,6 +274,61 @@ class Problem(BaseProblem):
 
         return constraints
 
+    def add_linear_constraints_matrix(self, variables, matrix, sense, rhs=0):
+        """Add a constraint for each row of a sparse matrix.
+
+        The rows are allocated in a single call to GLPK. See
+        :meth:`.lp.Problem.add_linear_constraints_matrix`.
+        """
+        variables = self._matrix_columns(variables, matrix)
+        columns = [self._variables[variable] for variable in variables]
+
+        rows = []
+        for indices, data, value in self._matrix_rows(matrix, rhs):
+            if self._check_matrix_row(sense, len(indices), value):
+                rows.append(None)
+            else:
+                rows.append((indices, data, float(value)))
+
+        row_count = sum(row is not None for row in rows)
+        if row_count == 0:
+            return [Constraint(self, None) for _ in rows]
+
+        row_indices = count(swiglpk.glp_add_rows(self._p, row_count))
+
+        # Buffers are reused for all rows and sized for the longest row
+        length = max(len(row[0]) for row in rows if row is not None)
+        var_indices = swiglpk.intArray(1 + length)
+        var_values = swiglpk.doubleArray(1 + length)
+
+        constraints = []
+        for row in rows:
+            if row is None:
+                constraints.append(Constraint(self, None))
+                continue
+
+            indices, data, value = row
+            for j, (column, coeff) in enumerate(zip(indices, data)):
+                var_indices[1 + j] = columns[column]
+                var_values[1 + j] = float(coeff)
+
+            i = next(row_indices)
+            swiglpk.glp_set_mat_row(
+                self._p, i, len(indices), var_indices, var_values)
+
+            if sense == RelationSense.Greater:
+                swiglpk.glp_set_row_bnds(self._p, i, swiglpk.GLP_LO, value, 0)
+            elif sense == RelationSense.Less:
+                swiglpk.glp_set_row_bnds(self._p, i, swiglpk.GLP_UP, 0, value)
+            else:
+                swiglpk.glp_set_row_bnds(self._p, i, swiglpk.GLP_FX, value, 0)
+
+            constraints.append(Constraint(self, i))
+
+        self._do_presolve = True
+
+        return constraints
+
     def set_objective(self, expression):
         """Set objective of problem."""
 
@@ -247,14 +337,15 @@ class Problem(BaseProblem):
             # represented as a number
             expression = Expression(offset=expression)
 
-        # Clear previous objective
-        for i in range(swiglpk.glp_get_num_cols(self._p)):
-            swiglpk.glp_set_obj_coef(self._p, 1 + i, 0)
+        values = {variable: float(value)
+                  for variable, value in expression.values()}
 
-        for variable, value in expression.values():
-            var_index = self._variables[variable]
-            swiglpk.glp_set_obj_coef(self._p, var_index, float(value))
+        # Clear previous objective
+        for variable in self._objective:
+            if variable not in values:
+                values[variable] = 0.0
 
+        self.update_objective(values)
         swiglpk.glp_set_obj_coef(self._p, 0, float(expression.offset))
 
     set_linear_objective = set_objective
@@ -264,6 +355,24 @@ class Problem(BaseProblem):
        Use :meth:`set_objective` instead.
     """
 
+    def update_objective(self, values):
+        """Change the objective coefficients of the given variables."""
+        if isinstance(values, dict):
+            values = iteritems(values)
+
+        for variable, value in self._objective_changes(
+                self._objective, ((v, float(c)) for v, c in values)):
+            swiglpk.glp_set_obj_coef(
+                self._p, self._variables[variable], value)
+
+    def set_objective_variable(self, name, value=1):
+        """Set objective of problem to a single variable."""
+        values = {variable: 0.0 for variable in self._objective
+                  if variable != name}
+        values[name] = float(value)
+        self.update_objective(values)
+        swiglpk.glp_set_obj_coef(self._p, 0, 0.0)
+
     def set_objective_sense(self, sense):
         """Set type of problem (maximize or minimize)."""
 
@@ -422,11 +531,22 @@ class Result(BaseResult):
         return swiglpk.glp_get_col_prim(
             self._problem._p, self._problem._variables[variable])
 
+    def _get_values(self, variables):
+        """Return values of variables in solution."""
+        p, indices = self._problem._p, self._problem._variables
+        get_col_prim = swiglpk.glp_get_col_prim
+        return [get_col_prim(p, indices[variable]) for variable in variables]
+
     def get_value(self, expression):
         """Return value of expression."""
         self._check_valid()
         return super(Result, self).get_value(expression)
 
+    def get_values(self, variables):
+        """Return values of variables."""
+        self._check_valid()
+        return super(Result, self).get_values(variables)
+
 
 class MIPResult(Result):
     """Specialization of Result for MIP problems."""
@@ -445,3 +565,9 @@ class MIPResult(Result):
         """Return value of variable in solution."""
         return swiglpk.glp_mip_col_val(
             self._problem._p, self._problem._variables[variable])
+
+    def _get_values(self, variables):
+        """Return values of variables in solution."""
+        p, indices = self._problem._p, self._problem._variables
+        mip_col_val = swiglpk.glp_mip_col_val
+        return [mip_col_val(p, indices[variable]) for variable in variables]
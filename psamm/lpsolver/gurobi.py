@@ -23,7 +23,7 @@ import logging
 from itertools import repeat, count
 import numbers
 
-from six import raise_from
+from six import raise_from, iteritems
 from six.moves import zip
 
 import gurobipy
@@ -38,6 +38,8 @@ from .lp import (Expression, Product, RelationSense, ObjectiveSense,
 # Module-level logging
 logger = logging.getLogger(__name__)
 
+_INF = float('inf')
+
 
 class Solver(BaseSolver):
     """Represents an LP-solver using Gurobi."""
@@ -96,6 +98,11 @@ class Problem(BaseProblem):
         self._var_names = ('x'+str(i) for i in count(1))
         self._constr_names = ('c'+str(i) for i in count(1))
 
+        # Non-zero linear objective coefficients and whether the objective
+        # has quadratic terms.
+        self._objective = {}
+        self._quadratic_objective = False
+
         self._result = None
 
     @property
@@ -153,6 +160,45 @@ class Problem(BaseProblem):
         """Check whether variable is defined in the model."""
         return name in self._variables
 
+    def get_variable_bounds(self, names):
+        """Return the bounds of the given variables.
+
+        See :meth:`.lp.Problem.get_variable_bounds`.
+        """
+        variables = [self._p.getVarByName(self._variables[name])
+                     for name, _, _ in
+                     self._variable_bounds(names, None, None)]
+        if len(variables) == 0:
+            return []
+
+        lower = self._p.getAttr('LB', variables)
+        upper = self._p.getAttr('UB', variables)
+        return [(-_INF if lb <= -gurobipy.GRB.INFINITY else lb,
+                 _INF if ub >= gurobipy.GRB.INFINITY else ub)
+                for lb, ub in zip(lower, upper)]
+
+    def set_variable_bounds(self, names, lower=None, upper=None):
+        """Change the bounds of the given variables.
+
+        See :meth:`.lp.Problem.set_variable_bounds`.
+        """
+        variables = []
+        lower_values = []
+        upper_values = []
+        for name, lb, ub in self._variable_bounds(names, lower, upper):
+            variables.append(self._p.getVarByName(self._variables[name]))
+            lower_values.append(
+                -gurobipy.GRB.INFINITY if lb is None or lb == -_INF
+                else float(lb))
+            upper_values.append(
+                gurobipy.GRB.INFINITY if ub is None or ub == _INF
+                else float(ub))
+
+        if len(variables) > 0:
+            self._p.setAttr('LB', variables, lower_values)
+            self._p.setAttr('UB', variables, upper_values)
+            self._p.update()
+
     def _grb_expr_from_value_set(self, value_set):
         linear = []
         quad = []
@@ -214,6 +260,33 @@ class Problem(BaseProblem):
 
         return constraints
 
+    def add_linear_constraints_matrix(self, variables, matrix, sense, rhs=0):
+        """Add a constraint for each row of a sparse matrix.
+
+        The model is only updated once after all rows have been added. See
+        :meth:`.lp.Problem.add_linear_constraints_matrix`.
+        """
+        variables = self._matrix_columns(variables, matrix)
+        columns = [self._p.getVarByName(self._variables[variable])
+                   for variable in variables]
+        grb_sense = self.CONSTR_SENSE_MAP[sense]
+
+        constraints = []
+        for indices, data, value in self._matrix_rows(matrix, rhs):
+            if self._check_matrix_row(sense, len(indices), value):
+                constraints.append(Constraint(self, None))
+                continue
+
+            expr = gurobipy.LinExpr(
+                [float(v) for v in data], [columns[j] for j in indices])
+            name = next(self._constr_names)
+            self._p.addConstr(expr, grb_sense, float(value), name)
+            constraints.append(Constraint(self, name))
+
+        self._p.update()
+
+        return constraints
+
     def set_objective(self, expression):
         """Set linear objective of problem."""
 
@@ -225,6 +298,14 @@ class Problem(BaseProblem):
         self._p.setObjective(
             self._grb_expr_from_value_set(expression.values()))
 
+        self._objective = {}
+        self._quadratic_objective = False
+        for var, value in expression.values():
+            if isinstance(var, Product):
+                self._quadratic_objective = True
+            elif value != 0:
+                self._objective[var] = float(value)
+
     set_linear_objective = set_objective
     """Set objective of the problem.
 
@@ -232,6 +313,27 @@ class Problem(BaseProblem):
        Use :meth:`set_objective` instead.
     """
 
+    def update_objective(self, values):
+        """Change the linear objective coefficients of the given variables."""
+        if isinstance(values, dict):
+            values = iteritems(values)
+
+        for var, value in self._objective_changes(
+                self._objective,
+                ((var, float(value)) for var, value in values)):
+            self._p.getVarByName(self._variables[var]).Obj = value
+
+    def set_objective_variable(self, name, value=1):
+        """Set objective of the problem to a single variable."""
+        if self._quadratic_objective:
+            # Quadratic terms have to be reset through set_objective()
+            self.set_objective(self.expr({name: value}))
+            return
+
+        values = {var: 0.0 for var in self._objective if var != name}
+        values[name] = float(value)
+        self.update_objective(values)
+
     def set_objective_sense(self, sense):
         """Set type of problem (maximize or minimize)."""
 
@@ -372,3 +474,17 @@ class Result(BaseResult):
 
         self._check_valid()
         return super(Result, self).get_value(expression)
+
+    def _get_values(self, variables):
+        """Return values of variables in solution."""
+        if len(variables) == 0:
+            return []
+        model = self._problem._p
+        return model.getAttr('X', [
+            model.getVarByName(self._problem._variables[var])
+            for var in variables])
+
+    def get_values(self, variables):
+        """Return values of variables."""
+        self._check_valid()
+        return super(Result, self).get_values(variables)
@@ -26,7 +26,10 @@ Expressions are built from variables defined in the :class:`.Problem` instance.
 In addition, an expression can contain a :class:`.VariableSet` instead of a
 single variable. This allows many similar expressions to be represented by one
 :class:`.Expression` instance which means that the LP problem can be
-constructed faster.
+constructed faster. Large numbers of expressions over a shared sequence of
+variables (e.g. the columns of a stoichiometric matrix) can be created as
+:class:`.ArrayExpression` which stores the terms as arrays of column indices
+and coefficients.
 """
 
 from __future__ import unicode_literals
@@ -35,6 +38,7 @@ import math
 import numbers
 import operator
 from collections import Counter, defaultdict
+from itertools import repeat
 import abc
 import enum
 from fractions import Fraction
@@ -42,7 +46,7 @@ from decimal import Decimal
 
 import six
 from six import add_metaclass, iteritems, viewkeys, viewitems, text_type
-from six.moves import range, reduce
+from six.moves import range, reduce, zip
 
 _INF = float('inf')
 
@@ -59,6 +63,63 @@ class Product(tuple):
     """A tuple used to represent a variable product."""
 
 
+class CSRMatrix(object):
+    """Sparse matrix in compressed sparse row (CSR) format.
+
+    The non-zero values of row ``i`` are stored in
+    ``data[indptr[i]:indptr[i+1]]`` with the corresponding column indices in
+    ``indices[indptr[i]:indptr[i+1]]``. The attributes are named as in
+    :class:`scipy.sparse.csr_matrix` so either type of matrix can be passed
+    to :meth:`.Problem.add_linear_constraints_matrix`.
+
+    >>> m = CSRMatrix((2, 3), [0, 2, 3], [0, 2, 1], [1, -1, 4])
+    >>> list(m.row(0))
+    [(0, 1), (2, -1)]
+    """
+
+    __slots__ = ('shape', 'indptr', 'indices', 'data')
+
+    def __init__(self, shape, indptr, indices, data):
+        rows, _ = shape
+        if len(indptr) != rows + 1:
+            raise ValueError('Invalid length of indptr: {}'.format(
+                len(indptr)))
+        if len(indices) != len(data):
+            raise ValueError('Length of indices and data must be equal')
+
+        self.shape = tuple(shape)
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+    @classmethod
+    def from_rows(cls, rows, columns):
+        """Create matrix from an iterable of rows.
+
+        Each row is given as an iterable of (column index, value)-pairs.
+        """
+        indptr = [0]
+        indices = []
+        data = []
+        for row in rows:
+            for column, value in row:
+                indices.append(column)
+                data.append(value)
+            indptr.append(len(indices))
+
+        return cls((len(indptr) - 1, columns), indptr, indices, data)
+
+    def row(self, i):
+        """Return iterator of (column index, value)-pairs of row."""
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return zip(self.indices[start:end], self.data[start:end])
+
+    def __repr__(self):
+        return str('<{} {}x{}, {} non-zero>').format(
+            self.__class__.__name__, self.shape[0], self.shape[1],
+            len(self.data))
+
+
 class _RangedAccessor(object):
     """Accessor to value bounded by minimum/maximum."""
     def __init__(self, obj, prop):
@@ -178,6 +239,8 @@ class Expression(object):
         relations!
     """
 
+    __slots__ = ('_variables', '_offset')
+
     def __init__(self, variables={}, offset=0):
         self._variables = Counter(variables)
         self._offset = offset
@@ -460,6 +523,158 @@ class Expression(object):
             self.__class__.__name__, repr(str(self)))
 
 
+class ArrayExpression(Expression):
+    """Linear expression stored as arrays of indices and coefficients.
+
+    The variables of the expression are given as a sequence of column names
+    that can be shared between many expressions, e.g. the variables
+    corresponding to the columns of a stoichiometric matrix. Each term of the
+    expression is given by an index into the columns and a coefficient. This
+    avoids creating a dictionary for each expression when a large number of
+    similar expressions are built and the expression can be used everywhere
+    an :class:`.Expression` is accepted.
+
+    >>> columns = ('x', 'y', 'z')
+    >>> e = ArrayExpression(columns, [0, 2], [2, -1])
+    >>> str(e)
+    '2*x - z'
+
+    Multiplying by or adding a number results in a new
+    :class:`.ArrayExpression` sharing the columns and indices. Other
+    operations convert the terms to a dictionary and behave exactly as
+    :class:`.Expression`.
+
+    Args:
+        columns: Sequence of variable names.
+        indices: Sequence of indices into columns, one for each term.
+        coefficients: Sequence of coefficients, one for each term.
+        offset: Value of the offset.
+    """
+
+    __slots__ = ('_columns', '_indices', '_coefficients', '_counter')
+
+    def __init__(self, columns, indices, coefficients, offset=0):
+        if len(indices) != len(coefficients):
+            raise ValueError(
+                'Number of indices and coefficients must be equal:'
+                ' {} != {}'.format(len(indices), len(coefficients)))
+        if len(set(indices)) != len(indices):
+            raise ValueError('Indices of expression must be unique')
+
+        self._columns = columns
+        self._indices = indices
+        self._coefficients = coefficients
+        self._counter = None
+        self._offset = offset
+
+    @property
+    def _variables(self):
+        # The terms are converted to a Counter when the expression is used
+        # as a plain Expression. The Counter may be modified in place so it
+        # replaces the arrays from this point.
+        if self._counter is None:
+            columns = self._columns
+            self._counter = Counter(
+                {columns[i]: value for i, value in
+                 zip(self._indices, self._coefficients)})
+            self._columns = self._indices = self._coefficients = None
+        return self._counter
+
+    @_variables.setter
+    def _variables(self, value):
+        self._counter = value
+        self._columns = self._indices = self._coefficients = None
+
+    def _array_terms(self):
+        columns = self._columns
+        return ((columns[i], value) for i, value in
+                zip(self._indices, self._coefficients))
+
+    def _with_coefficients(self, coefficients, offset):
+        return self.__class__(
+            self._columns, self._indices, coefficients, offset)
+
+    def variables(self):
+        """Return iterable of variables in expression."""
+        if self._counter is None:
+            columns = self._columns
+            return [columns[i] for i in self._indices]
+        return super(ArrayExpression, self).variables()
+
+    def values(self):
+        """Return iterable of (variable, value)-pairs in expression."""
+        if self._counter is None:
+            return list(self._array_terms())
+        return super(ArrayExpression, self).values()
+
+    def value(self, variable):
+        if self._counter is None:
+            for var, value in self._array_terms():
+                if var == variable:
+                    return value
+            return 0
+        return super(ArrayExpression, self).value(variable)
+
+    def value_sets(self):
+        """Iterator of expression sets (see :meth:`.Expression.value_sets`).
+
+        The columns of an :class:`.ArrayExpression` are single variables so
+        a single iterator is always yielded.
+        """
+        if self._counter is None:
+            yield self._array_terms()
+        else:
+            for value_set in super(ArrayExpression, self).value_sets():
+                yield value_set
+
+    def __contains__(self, variable):
+        if self._counter is None:
+            return any(var == variable for var, _ in self._array_terms())
+        return variable in self._counter
+
+    def _expression(self):
+        return Expression(self._variables, self._offset)
+
+    def __add__(self, other):
+        if isinstance(other, numbers.Number) and self._counter is None:
+            if math.isinf(self._offset) or math.isinf(other):
+                return Expression(offset=self._offset + other)
+            return self._with_coefficients(
+                self._coefficients, self._offset + other)
+        elif isinstance(other, (numbers.Number, Expression)):
+            return self._expression() + other
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __mul__(self, other):
+        if isinstance(other, numbers.Number) and self._counter is None:
+            if math.isinf(other):
+                return Expression(offset=float('nan'))
+            return self._with_coefficients(
+                [value * other for value in self._coefficients],
+                self._offset * other)
+        elif isinstance(other, (numbers.Number, Expression)):
+            return self._expression() * other
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        if self._counter is None:
+            return self._with_coefficients(
+                [-value for value in self._coefficients], -self._offset)
+        return -self._expression()
+
+    def __pow__(self, other):
+        return self._expression() ** other
+
+    def __ipow__(self, other):
+        result = self._expression()
+        result **= other
+        return result
+
+
 @enum.unique
 class RelationSense(enum.Enum):
     Equals = '=='
@@ -593,9 +808,49 @@ class VariableNamespace(object):
     def __getitem__(self, key):
         return self._problem.var((self, key))
 
+    def get_bounds(self, names):
+        """Return the bounds of the given names in the namespace.
+
+        See :meth:`.Problem.get_variable_bounds`.
+        """
+        return self._problem.get_variable_bounds(
+            [(self, name) for name in names])
+
+    def set_bounds(self, names, lower=None, upper=None):
+        """Change the bounds of the given names in the namespace.
+
+        See :meth:`.Problem.set_variable_bounds`.
+
+        >>> v = prob.namespace(name='v')
+        >>> v.define([1, 2, 5], lower=0, upper=10)
+        >>> v.set_bounds([2, 5], lower=0, upper=0)
+        """
+        self._problem.set_variable_bounds(
+            [(self, name) for name in names], lower=lower, upper=upper)
+
+    def set_objective_variable(self, name, value=1):
+        """Set objective of the problem to a single name in the namespace.
+
+        See :meth:`.Problem.set_objective_variable`.
+        """
+        self._problem.set_objective_variable((self, name), value)
+
     def __contains__(self, key):
         return self._problem.has_variable((self, key))
 
+    def values(self, names):
+        """Return list of the values of the given names in the namespace.
+
+        See :meth:`.Result.get_values`.
+
+        >>> v = prob.namespace(name='v')
+        >>> v.define([1, 2, 5], lower=0, upper=10)
+        >>> prob.solve()
+        >>> print(v.values([1, 2]))
+        """
+        return self._problem.result.get_values(
+            (self, name) for name in names)
+
     def has_variable(self, name):
         return self._problem.has_variable((self, name))
 
@@ -620,6 +875,20 @@ class VariableNamespace(object):
         """
         return Expression({(self, name): 1 for name in names})
 
+    def columns(self, names):
+        """Return tuple of the problem variables of names in the namespace.
+
+        The variables can be used as the columns of an
+        :class:`.ArrayExpression` or a constraint matrix (see
+        :meth:`.Problem.add_linear_constraints_matrix`).
+
+        >>> v = prob.namespace(name='v')
+        >>> v.define(['a', 'b', 'c'], lower=0, upper=10)
+        >>> columns = v.columns(['a', 'b', 'c'])
+        >>> prob.set_objective(ArrayExpression(columns, [0, 2], [2, 1]))
+        """
+        return tuple((self, name) for name in names)
+
     def expr(self, items):
         """Return the sum of each name multiplied by a coefficient.
 
@@ -670,6 +939,51 @@ class Problem(object):
     def has_variable(self, name):
         """Check whether a variable is defined in the problem."""
 
+    @abc.abstractmethod
+    def get_variable_bounds(self, names):
+        """Return the bounds of the given variables.
+
+        Returns a list of (lower, upper)-tuples in the same order as the
+        names. Unbounded values are returned as negative or positive
+        infinity. Raises ValueError if a name is not defined.
+        """
+
+    @abc.abstractmethod
+    def set_variable_bounds(self, names, lower=None, upper=None):
+        """Change the bounds of the given variables.
+
+        The lower and upper bounds are given as for :meth:`.define`, i.e.
+        either as a single value for all names or as a sequence with a value
+        for each name. None means that the variable is unbounded in that
+        direction. Changing the bounds does not change the constraints of the
+        problem so solvers can reuse the current basis when the problem is
+        solved again. Raises ValueError if a name is not defined.
+        """
+
+    def _variable_bounds(self, names, lower, upper):
+        """Return list of (name, lower, upper) for changing bounds.
+
+        Scalar lower and upper values are repeated for every name. Raises
+        ValueError if a name is not defined.
+        """
+        names = tuple(names)
+        for name in names:
+            if not self.has_variable(name):
+                raise ValueError('Undefined variable: {}'.format(name))
+
+        if lower is None or isinstance(lower, numbers.Number):
+            lower = repeat(lower, len(names))
+        if upper is None or isinstance(upper, numbers.Number):
+            upper = repeat(upper, len(names))
+
+        bounds = []
+        for name, lb, ub in zip(names, lower, upper):
+            if lb is not None and ub is not None and lb > ub:
+                raise ValueError(
+                    'Lower bound larger than upper bound: {}'.format(name))
+            bounds.append((name, lb, ub))
+        return bounds
+
     def namespace(self, names=None, **kwargs):
         """Return namespace for this problem.
 
@@ -751,6 +1065,69 @@ class Problem(object):
 
         return False
 
+    def _matrix_columns(self, variables, matrix):
+        """Return the variable names of the columns of a constraint matrix.
+
+        The variables can be given as a sequence of names or as a set
+        expression (see :meth:`.set`).
+        """
+        if isinstance(variables, Expression):
+            values = list(variables.values())
+            if (len(values) != 1 or
+                    not isinstance(values[0][0], VariableSet) or
+                    values[0][1] != 1):
+                raise ValueError(
+                    'Matrix columns must be given as a variable set')
+            variables = values[0][0]
+
+        variables = tuple(variables)
+        if len(variables) != matrix.shape[1]:
+            raise ValueError(
+                'Number of variables does not match matrix columns:'
+                ' {} != {}'.format(len(variables), matrix.shape[1]))
+
+        return variables
+
+    def _matrix_rows(self, matrix, rhs):
+        """Yield column indices, values and right-hand side of matrix rows.
+
+        The matrix must be in CSR format (see :class:`.CSRMatrix`). The
+        right-hand side is either a number or a sequence with a value for
+        each row.
+        """
+        rows, _ = matrix.shape
+        if isinstance(rhs, numbers.Number):
+            rhs = [rhs] * rows
+        elif len(rhs) != rows:
+            raise ValueError('Invalid length of right-hand side: {}'.format(
+                len(rhs)))
+
+        indptr, indices, data = matrix.indptr, matrix.indices, matrix.data
+        for i in range(rows):
+            start, end = indptr[i], indptr[i + 1]
+            yield indices[start:end], data[start:end], rhs[i]
+
+    def _check_matrix_row(self, sense, count, rhs):
+        """Check whether a row of a constraint matrix is valid.
+
+        This is similar to :meth:`._check_relation` but applies to a row with
+        ``count`` non-zero values that is related to the given right-hand
+        side. Returns true if the row is tautologically true.
+        """
+        if sense in (
+                RelationSense.StrictlyGreater, RelationSense.StrictlyLess):
+            raise ValueError('Strict relations are invalid in LP-problems')
+
+        if count == 0 and not math.isinf(rhs):
+            if ((sense == RelationSense.Equals and rhs == 0) or
+                    (sense == RelationSense.Greater and rhs <= 0) or
+                    (sense == RelationSense.Less and rhs >= 0)):
+                return True
+            raise ValueError('Unsatisfiable relation added: 0 {} {}'.format(
+                sense.value, rhs))
+
+        return self._check_relation(Relation(sense, Expression(offset=-rhs)))
+
     @abc.abstractmethod
     def add_linear_constraints(self, *relations):
         """Add constraints to the problem.
@@ -760,6 +1137,43 @@ class Problem(object):
         :class:`Constraints <.Constraint>`.
         """
 
+    def add_linear_constraints_matrix(self, variables, matrix, sense, rhs=0):
+        """Add a constraint for each row of a sparse matrix.
+
+        The matrix must be in compressed sparse row format, i.e. a
+        :class:`.CSRMatrix` or any object with the same attributes (e.g.
+        :class:`scipy.sparse.csr_matrix`). The variables corresponding to the
+        matrix columns are given either as a sequence of variable names or
+        as a set expression (see :meth:`.set`). Each row ``i`` results in a
+        constraint ``A[i] * x <sense> rhs[i]`` where the right-hand side is
+        either a number or a sequence of values for each row. Returns a
+        sequence of :class:`Constraints <.Constraint>` with one element for
+        each row.
+
+        >>> v = prob.namespace(['a', 'b'], lower=0, upper=10)
+        >>> m = CSRMatrix.from_rows([[(0, 1), (1, -2)]], 2)
+        >>> prob.add_linear_constraints_matrix(
+        ...     v.set(['a', 'b']), m, RelationSense.Equals)
+
+        Solver interfaces should override this method to add all rows
+        through a batch interface. The default implementation adds each row
+        using :meth:`.add_linear_constraints`.
+        """
+        variables = self._matrix_columns(variables, matrix)
+
+        constraints = []
+        for indices, data, value in self._matrix_rows(matrix, rhs):
+            if self._check_matrix_row(sense, len(indices), value):
+                relation = True
+            else:
+                expression = Expression(
+                    {variables[j]: v for j, v in zip(indices, data)},
+                    offset=-value)
+                relation = Relation(sense, expression)
+            constraints.extend(self.add_linear_constraints(relation))
+
+        return constraints
+
     @abc.abstractmethod
     def set_objective(self, expression):
         """Set objective of the problem to the given :class:`.Expression`."""
@@ -771,6 +1185,56 @@ class Problem(object):
        Use :meth:`set_objective` instead.
     """
 
+    @abc.abstractmethod
+    def update_objective(self, values):
+        """Change the linear objective coefficients of the given variables.
+
+        The values are given as a dictionary (or an iterable of pairs) of
+        variable names to the new coefficients. The coefficients of other
+        variables and the objective offset are left unchanged and a
+        coefficient of zero removes the variable from the objective. This is
+        much faster than :meth:`.set_objective` when only a few coefficients
+        change between solves since only the changed coefficients are passed
+        to the solver. Raises ValueError if a name is not defined.
+
+        >>> v = prob.namespace([1, 2, 5], lower=0, upper=10)
+        >>> prob.set_objective(v[1] + 3*v[2])
+        >>> prob.update_objective({(v, 1): 0, (v, 5): 2})  # 3*v[2] + 2*v[5]
+        """
+
+    def set_objective_variable(self, name, value=1):
+        """Set objective of the problem to a single variable.
+
+        This is equivalent to ``set_objective(value * var(name))`` but
+        solver interfaces can override this to avoid creating an
+        :class:`.Expression` and to only update the coefficients that have
+        changed since the previous objective.
+        """
+        self.set_objective(Expression({name: value}))
+
+    def _objective_changes(self, current, values):
+        """Return list of (name, value) of changed objective coefficients.
+
+        The current coefficients are given as a dictionary of the non-zero
+        values and are updated in place. Raises ValueError if a name is not
+        defined.
+        """
+        if isinstance(values, dict):
+            values = iteritems(values)
+
+        changes = []
+        for name, value in values:
+            if not self.has_variable(name):
+                raise ValueError('Undefined variable: {}'.format(name))
+            if current.get(name, 0) != value:
+                changes.append((name, value))
+                if value == 0:
+                    del current[name]
+                else:
+                    current[name] = value
+
+        return changes
+
     @abc.abstractmethod
     def set_objective_sense(self, sense):
         """Set type of problem (minimize or maximize)"""
@@ -856,6 +1320,14 @@ class Result(object):
     def _has_variable(self, var):
         """Return whether variable exists in the solution."""
 
+    def _get_values(self, variables):
+        """Return the solution values of a sequence of variables.
+
+        Solver interfaces should override this to obtain the values through
+        a single call to the solver.
+        """
+        return [self._get_value(var) for var in variables]
+
     def _evaluate_expression(self, expr):
         """Evaluate an :class:`.Expression` using :meth:`_get_value`."""
         def cast_value(v):
@@ -893,6 +1365,25 @@ class Result(object):
 
         return self._get_value(expression)
 
+    def get_values(self, variables):
+        """Return list of the values of the given variables in the result.
+
+        The variables are given as a sequence of names defined in the
+        problem. This is much faster than calling :meth:`.get_value` for each
+        variable since the solver interfaces can obtain all the values
+        through a single call to the solver.
+
+        >>> v = prob.namespace(['a', 'b', 'c'])
+        >>> result = prob.solve()
+        >>> a, b, c = result.get_values([(v, 'a'), (v, 'b'), (v, 'c')])
+        """
+        variables = list(variables)
+        for variable in variables:
+            if not self._has_variable(variable):
+                raise ValueError('Unknown expression: {}'.format(variable))
+
+        return self._get_values(variables)
+
 
 if __name__ == '__main__':
     import doctest
@@ -22,7 +22,6 @@ from __future__ import absolute_import
 from itertools import repeat, count
 import numbers
 
-from six import iteritems
 from six.moves import zip
 import qsoptex
 
@@ -33,6 +32,8 @@ from .lp import Result as BaseResult
 from .lp import (Expression, RelationSense, ObjectiveSense, VariableType,
                  InvalidResultError, ranged_property)
 
+_INF = float('inf')
+
 
 class Solver(BaseSolver):
     """Represents an LP solver using QSopt_ex"""
@@ -56,9 +57,14 @@ class Problem(BaseProblem):
         self._p.set_param(qsoptex.Parameter.SIMPLEX_DISPLAY, 1)
 
         self._variables = {}
+        self._bounds = {}
+        self._bound_constrs = {}
         self._var_names = ('x'+str(i) for i in count(1))
         self._constr_names = ('c'+str(i) for i in count(1))
 
+        # Non-zero objective coefficients
+        self._objective = {}
+
         self._result = None
 
     @property
@@ -101,16 +107,73 @@ class Problem(BaseProblem):
                    for value in vartype)
 
         self._variables.update(zip(names, lp_names))
-        for name, lower, upper, t in zip(lp_names, lower, upper, vartype):
+        for name, lp_name, lower, upper, t in zip(
+                names, lp_names, lower, upper, vartype):
             if t != VariableType.Continuous:
                 raise ValueError(
                     'Solver does not support non-continuous types')
-            self._p.add_variable(0, lower, upper, name)
+            self._p.add_variable(0, lower, upper, lp_name)
+            self._bounds[name] = (-_INF if lower is None else lower,
+                                  _INF if upper is None else upper)
 
     def has_variable(self, name):
         """Check whether variable is defined in the model."""
         return name in self._variables
 
+    def get_variable_bounds(self, names):
+        """Return the bounds of the given variables.
+
+        See :meth:`.lp.Problem.get_variable_bounds`.
+        """
+        bounds = []
+        for name, _, _ in self._variable_bounds(names, None, None):
+            if name in self._bound_constrs:
+                bounds.append(self._bound_constrs[name][0])
+            else:
+                bounds.append(self._bounds[name])
+        return bounds
+
+    def set_variable_bounds(self, names, lower=None, upper=None):
+        """Change the bounds of the given variables.
+
+        QSopt_ex does not provide a way to change the bounds of a defined
+        variable so bounds that are tighter than the bounds given to
+        :meth:`define` are added as constraints. The new bounds can
+        therefore not be looser than the bounds given to :meth:`define`.
+        See :meth:`.lp.Problem.set_variable_bounds`.
+        """
+        bounds = []
+        for name, lb, ub in self._variable_bounds(names, lower, upper):
+            lb = -_INF if lb is None else lb
+            ub = _INF if ub is None else ub
+            def_lower, def_upper = self._bounds[name]
+            if lb < def_lower or ub > def_upper:
+                raise ValueError(
+                    'Bounds can only be tightened in QSopt_ex: {}'.format(
+                        name))
+            bounds.append((name, lb, ub))
+
+        for name, lb, ub in bounds:
+            _, constr_names = self._bound_constrs.pop(name, (None, []))
+            for constr_name in constr_names:
+                self._p.delete_linear_constraint(constr_name)
+
+            def_lower, def_upper = self._bounds[name]
+            values = [(self._variables[name], 1)]
+            constr_names = []
+            if lb > def_lower:
+                constr_names.append(next(self._constr_names))
+                self._p.add_linear_constraint(
+                    sense=qsoptex.ConstraintSense.GREATER, values=values,
+                    rhs=lb, name=constr_names[-1])
+            if ub < def_upper:
+                constr_names.append(next(self._constr_names))
+                self._p.add_linear_constraint(
+                    sense=qsoptex.ConstraintSense.LESS, values=values,
+                    rhs=ub, name=constr_names[-1])
+            if len(constr_names) > 0:
+                self._bound_constrs[name] = (lb, ub), constr_names
+
     def _add_constraints(self, relation):
         """Add the given relation as one or more constraints
 
@@ -147,6 +210,32 @@ class Problem(BaseProblem):
 
         return constraints
 
+    def add_linear_constraints_matrix(self, variables, matrix, sense, rhs=0):
+        """Add a constraint for each row of a sparse matrix.
+
+        The matrix values are passed to QSopt_ex without conversion so exact
+        values are preserved. See
+        :meth:`.lp.Problem.add_linear_constraints_matrix`.
+        """
+        variables = self._matrix_columns(variables, matrix)
+        columns = [self._variables[variable] for variable in variables]
+        qs_sense = self.CONSTR_SENSE_MAP[sense]
+
+        constraints = []
+        for indices, data, value in self._matrix_rows(matrix, rhs):
+            if self._check_matrix_row(sense, len(indices), value):
+                constraints.append(Constraint(self, None))
+                continue
+
+            constr_name = next(self._constr_names)
+            self._p.add_linear_constraint(
+                sense=qs_sense,
+                values=((columns[j], v) for j, v in zip(indices, data)),
+                rhs=value, name=constr_name)
+            constraints.append(Constraint(self, constr_name))
+
+        return constraints
+
     def set_objective(self, expression):
         """Set linear objective of problem"""
 
@@ -155,9 +244,14 @@ class Problem(BaseProblem):
             # represented as a number
             expression = Expression()
 
-        self._p.set_linear_objective(
-            (lp_name, expression.value(var))
-            for var, lp_name in iteritems(self._variables))
+        values = dict(expression.values())
+
+        # Clear previous objective
+        for var in self._objective:
+            if var not in values:
+                values[var] = 0
+
+        self.update_objective(values)
 
     set_linear_objective = set_objective
     """Set objective of the problem.
@@ -166,6 +260,19 @@ class Problem(BaseProblem):
        Use :meth:`set_objective` instead.
     """
 
+    def update_objective(self, values):
+        """Change the objective coefficients of the given variables."""
+        changes = self._objective_changes(self._objective, values)
+        if len(changes) > 0:
+            self._p.set_linear_objective(
+                (self._variables[var], value) for var, value in changes)
+
+    def set_objective_variable(self, name, value=1):
+        """Set objective of the problem to a single variable."""
+        values = {var: 0 for var in self._objective if var != name}
+        values[name] = value
+        self.update_objective(values)
+
     def set_objective_sense(self, sense):
         """Set type of problem (maximize or minimize)"""
         if sense == ObjectiveSense.Minimize:
@@ -267,3 +374,8 @@ class Result(BaseResult):
 
         self._check_valid()
         return super(Result, self).get_value(expression)
+
+    def get_values(self, variables):
+        """Return values of variables."""
+        self._check_valid()
+        return super(Result, self).get_values(variables)
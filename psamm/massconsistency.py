@@ -29,7 +29,8 @@ pseudo-compounds (e.g. "photon") that also has to be excluded.
 
 from .lpsolver import lp
 
-from six import iteritems, raise_from
+from six import itervalues, raise_from
+from six.moves import zip
 
 
 class MassConsistencyError(Exception):
@@ -41,6 +42,45 @@ def _non_localized_compounds(database):
     return set(c.in_compartment(None) for c in database.compounds)
 
 
+def _mass_balance_lhs(database, m, zeromass):
+    """Yield reaction IDs and mass balance expression of each reaction.
+
+    The mass of each compound (excluding zero mass compounds) is given by
+    the non-localized compound variable in the namespace m.
+    """
+    matrix = database.sparse_matrix
+
+    # Map each compound of the matrix to a column of the non-localized
+    # compound variables (or None for zero mass compounds).
+    names = []
+    column_index = {}
+    compound_columns = []
+    for compound in matrix.compounds:
+        if compound in zeromass:
+            compound_columns.append(None)
+            continue
+
+        compound = compound.in_compartment(None)
+        if compound not in column_index:
+            column_index[compound] = len(names)
+            names.append(compound)
+        compound_columns.append(column_index[compound])
+
+    columns = m.columns(names)
+    for reaction_id, column in zip(matrix.reactions, matrix.columns):
+        masses = {}
+        for i, value in column:
+            index = compound_columns[i]
+            if index is not None:
+                masses[index] = masses.get(index, 0) + value
+
+        if len(masses) > 0:
+            yield reaction_id, lp.ArrayExpression(
+                columns, list(masses), list(itervalues(masses)))
+        else:
+            yield reaction_id, 0
+
+
 def is_consistent(database, solver, exchange=set(), zeromass=set()):
     """Try to assign a positive mass to each compound
 
@@ -58,12 +98,7 @@ def is_consistent(database, solver, exchange=set(), zeromass=set()):
     prob.set_objective(m.sum(mass_compounds))
 
     # Define constraints
-    massbalance_lhs = {reaction: 0 for reaction in database.reactions}
-    for (compound, reaction), value in iteritems(database.matrix):
-        if compound not in zeromass:
-            mass = m(compound.in_compartment(None))
-            massbalance_lhs[reaction] += mass * value
-    for reaction, lhs in iteritems(massbalance_lhs):
+    for reaction, lhs in _mass_balance_lhs(database, m, zeromass):
         if reaction not in exchange:
             prob.add_linear_constraints(lhs == 0)
 
@@ -106,12 +141,7 @@ def check_reaction_consistency(database, solver, exchange=set(),
     zs = z.set(database.reactions)
     prob.add_linear_constraints(zs >= rs, rs >= -zs)
 
-    massbalance_lhs = {reaction_id: 0 for reaction_id in database.reactions}
-    for (compound, reaction_id), value in iteritems(database.matrix):
-        if compound not in zeromass:
-            mass_var = m(compound.in_compartment(None))
-            massbalance_lhs[reaction_id] += mass_var * value
-    for reaction_id, lhs in iteritems(massbalance_lhs):
+    for reaction_id, lhs in _mass_balance_lhs(database, m, zeromass):
         if reaction_id not in exchange:
             if reaction_id not in checked:
                 prob.add_linear_constraints(lhs + r(reaction_id) == 0)
@@ -165,12 +195,7 @@ def check_compound_consistency(database, solver, exchange=set(),
 
     prob.add_linear_constraints(m.set(mass_compounds) >= z.set(mass_compounds))
 
-    massbalance_lhs = {reaction_id: 0 for reaction_id in database.reactions}
-    for (compound, reaction_id), value in iteritems(database.matrix):
-        if compound not in zeromass:
-            mass_var = m(compound.in_compartment(None))
-            massbalance_lhs[reaction_id] += mass_var * value
-    for reaction_id, lhs in iteritems(massbalance_lhs):
+    for reaction_id, lhs in _mass_balance_lhs(database, m, zeromass):
         if reaction_id not in exchange:
             prob.add_linear_constraints(lhs == 0)
 
@@ -21,7 +21,8 @@ from __future__ import unicode_literals
 
 from collections import Mapping
 
-from .database import MetabolicDatabase, StoichiometricMatrixView
+from .database import (MetabolicDatabase, StoichiometricMatrixView,
+                       SparseStoichiometricMatrix)
 from .reaction import Reaction, Direction
 from .util import create_unique_id
 
@@ -56,9 +57,11 @@ class FluxBounds(object):
 
     def _assign_lower(self, value):
         self._model._limits_lower[self._reaction] = value
+        self._model._limits_arrays = None
 
     def _assign_upper(self, value):
         self._model._limits_upper[self._reaction] = value
+        self._model._limits_arrays = None
 
     def _assign_both(self, lower, upper):
         self._assign_lower(lower)
@@ -87,6 +90,7 @@ class FluxBounds(object):
     @lower.deleter
     def lower(self):
         self._model._limits_lower.pop(self._reaction, None)
+        self._model._limits_arrays = None
 
     @property
     def upper(self):
@@ -104,6 +108,7 @@ class FluxBounds(object):
     @upper.deleter
     def upper(self):
         self._model._limits_upper.pop(self._reaction, None)
+        self._model._limits_arrays = None
 
     @property
     def bounds(self):
@@ -168,6 +173,12 @@ class MetabolicModel(MetabolicDatabase):
 
     The model contains a list of reactions referencing the reactions
     in the associated database.
+
+    The stoichiometric matrix of the model is available as a sparse matrix
+    (:attr:`sparse_matrix`) that is kept when the model is unchanged. Adding
+    a reaction appends a column to the matrix while removing a reaction
+    causes the matrix to be rebuilt (with new indices) the next time it is
+    accessed.
     """
 
     def __init__(self, database, v_max=1000):
@@ -180,6 +191,9 @@ class MetabolicModel(MetabolicDatabase):
 
         self._v_max = v_max
 
+        self._sparse_matrix = None
+        self._limits_arrays = None
+
     @property
     def database(self):
         return self._database
@@ -238,6 +252,38 @@ class MetabolicModel(MetabolicDatabase):
     def limits(self):
         return LimitsView(self)
 
+    @property
+    def sparse_matrix(self):
+        """Indexed sparse stoichiometric matrix of the model.
+
+        This is an instance of
+        :class:`SparseStoichiometricMatrix
+        <psamm.database.SparseStoichiometricMatrix>`. The same instance is
+        returned until the model is changed so the matrix should not be
+        modified by the caller.
+        """
+        if self._sparse_matrix is None:
+            self._sparse_matrix = SparseStoichiometricMatrix.from_database(
+                self._database, self._reaction_set)
+        return self._sparse_matrix
+
+    @property
+    def limits_arrays(self):
+        """Lower and upper flux bounds as lists.
+
+        The bounds are ordered as the reactions in :attr:`sparse_matrix`.
+        The lists are kept until the model or the flux bounds are changed
+        so they should not be modified by the caller.
+        """
+        if self._limits_arrays is None:
+            limits = LimitsView(self)
+            bounds = [limits[reaction_id].bounds
+                      for reaction_id in self.sparse_matrix.reactions]
+            self._limits_arrays = (
+                [lower for lower, _ in bounds],
+                [upper for _, upper in bounds])
+        return self._limits_arrays
+
     def add_reaction(self, reaction_id):
         """Add reaction to model"""
 
@@ -249,6 +295,11 @@ class MetabolicModel(MetabolicDatabase):
         for compound, _ in reaction.compounds:
             self._compound_set.add(compound)
 
+        if self._sparse_matrix is not None:
+            self._sparse_matrix.add_reaction(
+                reaction_id, self._database.get_reaction_values(reaction_id))
+        self._limits_arrays = None
+
     def remove_reaction(self, reaction):
         """Remove reaction from model"""
 
@@ -258,6 +309,8 @@ class MetabolicModel(MetabolicDatabase):
         self._reaction_set.remove(reaction)
         self._limits_lower.pop(reaction, None)
         self._limits_upper.pop(reaction, None)
+        self._sparse_matrix = None
+        self._limits_arrays = None
 
         # Remove compound from compound_set if it is not referenced
         # by any other reactions in the model.
@@ -276,6 +329,8 @@ class MetabolicModel(MetabolicDatabase):
         model._limits_upper = dict(self._limits_upper)
         model._reaction_set = set(self._reaction_set)
         model._compound_set = set(self._compound_set)
+        if self._sparse_matrix is not None:
+            model._sparse_matrix = self._sparse_matrix.copy()
         return model
 
     @classmethod
@@ -421,10 +476,21 @@ class FlipableModelView(object):
     def matrix(self):
         return FlipableStoichiometricMatrixView(self)
 
+    @property
+    def sparse_matrix(self):
+        return self._model.sparse_matrix.flipped(self._flipped)
+
     @property
     def limits(self):
         return FlipableLimitsView(self)
 
+    @property
+    def limits_arrays(self):
+        limits = self.limits
+        bounds = [limits[reaction_id].bounds
+                  for reaction_id in self._model.sparse_matrix.reactions]
+        return [lower for lower, _ in bounds], [upper for _, upper in bounds]
+
     def flip(self, subset):
         self._flipped ^= subset
 
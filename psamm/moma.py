@@ -19,10 +19,13 @@
 """Implementation of Minimization of Metabolic Adjustments (MOMA)."""
 
 import logging
+import math
 from itertools import product
 
 from six import iteritems, text_type, raise_from
+from six.moves import zip
 
+from psamm import fluxanalysis
 from psamm.lpsolver import lp
 
 logger = logging.getLogger(__name__)
@@ -359,3 +362,176 @@ class MOMAProblem(object):
     def get_flux_var(self, reaction):
         """Return the LP variable for a specific reaction."""
         return self._v[reaction]
+
+
+def minimal_fba_fluxes(model, objective, solver):
+    """Return the FBA solution that minimizes all the flux values.
+
+    This is the same wild type reference as
+    :meth:`MOMAProblem.get_minimal_fba_flux` but it is solved on a problem
+    with only one copy of the flux variables.
+
+    Raises :class:`psamm.fluxanalysis.FluxBalanceError` if the model cannot
+    be solved.
+
+    Args:
+        model: :class:`MetabolicModel` to solve.
+        objective: The objective reaction that is maximized.
+        solver: LP solver instance to use.
+
+    Returns:
+        A dictionary of all the reactions and their minimized fluxes.
+    """
+    p = fluxanalysis.FluxBalanceProblem(model, solver)
+    p.max_min_l1(objective)
+    return dict(p.get_fluxes())
+
+
+class KnockoutMOMAProblem(object):
+    """MOMA problem for solving many knockouts against one wild type.
+
+    The wild type fluxes are given as constants so the problem only contains
+    the knockout flux variables and a single copy of the mass balance
+    constraints. The objective (:meth:`MOMAProblem.moma` or, if linear is
+    True, :meth:`MOMAProblem.lin_moma`) is set up once. Knockouts are
+    applied by changing the bounds of the flux variables so the structure of
+    the problem is the same for every call to :meth:`solve` and the solver
+    can start from the previous solution.
+
+    Args:
+        model: :class:`MetabolicModel` to solve.
+        solver: LP solver instance to use (must support quadratic
+            objectives unless linear is True).
+        wt_fluxes: Dictionary of the wild type fluxes, e.g. from
+            :func:`minimal_fba_fluxes`.
+        linear: Minimize the L1 distance instead of the Euclidean distance.
+    """
+    def __init__(self, model, solver, wt_fluxes, linear=False):
+        self._prob = solver.create_problem()
+        self._model = model
+        self._linear = linear
+
+        self._v = v = self._prob.namespace(name='v')
+
+        # Define flux variables
+        matrix = self._model.sparse_matrix
+        lower, upper = self._model.limits_arrays
+        v.define(matrix.reactions, lower=lower, upper=upper)
+
+        # Define mass balance constraints from the stoichiometric matrix
+        self._prob.add_linear_constraints_matrix(
+            v.set(matrix.reactions), matrix, lp.RelationSense.Equals)
+
+        self._reactions = [
+            reaction_id for reaction_id in matrix.reactions
+            if (not self._model.is_exchange(reaction_id) and
+                reaction_id in wt_fluxes)]
+        self._wt_values = [wt_fluxes[r] for r in self._reactions]
+
+        if linear:
+            self._z_diff = z_diff = self._prob.namespace(
+                self._reactions, lower=0, name='z_diff')
+            constrs = []
+            for reaction_id, value in zip(self._reactions, self._wt_values):
+                constrs.append(z_diff[reaction_id] >= value - v[reaction_id])
+                constrs.append(value - v[reaction_id] >= -z_diff[reaction_id])
+            self._prob.add_linear_constraints(*constrs)
+            self._prob.set_objective(z_diff.sum(self._reactions))
+        else:
+            obj_expr = 0
+            for reaction_id, value in zip(self._reactions, self._wt_values):
+                obj_expr += (value - v[reaction_id])**2
+            self._prob.set_objective(obj_expr)
+
+        # Flux bounds of the last knockout, restored on next solve
+        self._restore_bounds = None
+
+    @property
+    def prob(self):
+        """Return the underlying LP problem."""
+        return self._prob
+
+    def _restore_flux_bounds(self):
+        if self._restore_bounds is not None:
+            reactions, bounds = self._restore_bounds
+            self._v.set_bounds(
+                reactions, lower=[lower for lower, _ in bounds],
+                upper=[upper for _, upper in bounds])
+            self._restore_bounds = None
+
+    def solve(self, reactions):
+        """Solve the problem with the given reactions knocked out.
+
+        The bounds of the reactions are restored before the next solve so
+        the solution can be accessed using :meth:`get_flux` and
+        :meth:`get_distance` after this method returns.
+
+        Raises :class:`MOMAError` if the problem is infeasible.
+        """
+        self._restore_flux_bounds()
+
+        reactions = list(reactions)
+        if len(reactions) > 0:
+            self._restore_bounds = reactions, self._v.get_bounds(reactions)
+            self._v.set_bounds(
+                reactions, lower=[0] * len(reactions),
+                upper=[0] * len(reactions))
+
+        try:
+            self._prob.solve(lp.ObjectiveSense.Minimize)
+        except lp.SolverError as e:
+            raise_from(MOMAError(text_type(e)), e)
+
+    def get_distance(self):
+        """Return distance between the knockout and the wild type fluxes.
+
+        This is the Euclidean distance or, for the linear problem, the sum of
+        absolute differences over the non-exchange reactions.
+        """
+        values = self._v.values(self._reactions)
+        if self._linear:
+            return sum(
+                abs(wt - v) for wt, v in zip(self._wt_values, values))
+        return math.sqrt(sum(
+            (wt - v)**2 for wt, v in zip(self._wt_values, values)))
+
+    def get_flux(self, reaction):
+        """Return the knockout flux for a specific reaction."""
+        return self._prob.result.get_value(self._v[reaction])
+
+    def get_flux_var(self, reaction):
+        """Return the LP variable for a specific reaction."""
+        return self._v[reaction]
+
+
+def moma_knockouts(model, objective, knockouts, solver, linear=False,
+                   wt_fluxes=None):
+    """Solve MOMA for each of the knockouts.
+
+    The wild type fluxes are computed once using
+    :func:`minimal_fba_fluxes` if not given and a single
+    :class:`KnockoutMOMAProblem` is solved for all the knockouts.
+
+    Yields (knockout, distance, objective flux)-tuples in the order of the
+    knockouts. The distance and flux are None if the knockout is infeasible.
+
+    Args:
+        model: :class:`MetabolicModel` to solve.
+        objective: The objective reaction of the wild type.
+        knockouts: Iterable of reaction sets to knock out.
+        solver: LP solver instance to use (must support quadratic
+            objectives unless linear is True).
+        linear: Use the linear MOMA objective.
+        wt_fluxes: Dictionary of the wild type fluxes.
+    """
+    if wt_fluxes is None:
+        wt_fluxes = minimal_fba_fluxes(model, objective, solver)
+
+    p = KnockoutMOMAProblem(model, solver, wt_fluxes, linear=linear)
+    for knockout in knockouts:
+        try:
+            p.solve(knockout)
+        except MOMAError:
+            yield knockout, None, None
+        else:
+            yield knockout, p.get_distance(), p.get_flux(objective)
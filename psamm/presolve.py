@@ -0,0 +1,624 @@
+# This file is part of PSAMM.
+#
+# PSAMM is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PSAMM is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PSAMM.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Copyright 2014-2017  Jon Lund Steffensen <jon_steffensen@uri.edu>
+
+"""Reduction of metabolic models before solving.
+
+The presolve stage creates a smaller model with the same steady state flux
+space as the original model. The reduced model is obtained by repeatedly
+applying the following reductions:
+
+- Reactions where both flux bounds are zero are removed.
+- Compounds that cannot be both produced and consumed by two different
+  reactions (given the flux bounds) are dead ends. All reactions of a dead
+  end compound are blocked and are removed.
+- Compounds that are only present in two reactions couple the fluxes of the
+  reactions by a fixed ratio. The two reactions are lumped into a single
+  reaction which uses the ID of one of the reactions.
+- Optionally, the enzyme subsets of fully coupled reactions found from the
+  nullspace of the stoichiometric matrix are lumped into single reactions.
+
+The :class:`PresolvedModel` keeps track of the removed and lumped reactions
+so that fluxes obtained from the reduced model can be expanded to the
+reactions of the original model.
+"""
+
+from __future__ import unicode_literals
+
+import logging
+from collections import deque
+from fractions import Fraction
+
+from six import iteritems
+from six.moves import range, zip
+
+from .database import DictDatabase
+from .fluxcoupling import enzyme_subsets
+from .metabolicmodel import MetabolicModel
+from .reaction import Reaction, Direction
+
+logger = logging.getLogger(__name__)
+
+
+class PresolveError(Exception):
+    """Indicates an error while presolving (e.g. the model is infeasible)."""
+
+
+def _add(a, b):
+    """Return sum of numbers that may not be of compatible types."""
+    try:
+        return a + b
+    except TypeError:
+        return float(a) + float(b)
+
+
+def _multiply(a, b):
+    """Return product of numbers that may not be of compatible types."""
+    try:
+        return a * b
+    except TypeError:
+        return float(a) * float(b)
+
+
+def _divide(a, b):
+    """Return quotient of numbers that may not be of compatible types."""
+    try:
+        return a / b
+    except TypeError:
+        return float(a) / float(b)
+
+
+def _from_fraction(value):
+    """Return fraction as an integer if possible or otherwise as a float."""
+    if value.denominator == 1:
+        return int(value)
+    return float(value)
+
+
+def blocked_reactions(model):
+    """Return set of reactions that are blocked for structural reasons.
+
+    A reaction is structurally blocked if both flux bounds are zero or if
+    it contains a dead-end compound. A compound is a dead end if it cannot
+    be both produced and consumed by two different reactions given the
+    directions allowed by the flux bounds. Blocking the reactions of a
+    dead-end compound can turn other compounds into dead ends so this is
+    repeated until no more reactions are blocked. The blocked reactions
+    always have zero flux at steady state so they can be reported as flux
+    inconsistent without solving any LP problems.
+
+    The time is linear in the number of non-zero values of the
+    stoichiometric matrix.
+
+    Args:
+        model: :class:`psamm.metabolicmodel.MetabolicModel`.
+    """
+    matrix = model.sparse_matrix
+    lower, upper = model.limits_arrays
+
+    # For each compound count the reactions that can produce it, consume it
+    # and either produce or consume it.
+    compound_count = len(matrix.compounds)
+    producers = [0] * compound_count
+    consumers = [0] * compound_count
+    active = [0] * compound_count
+
+    reaction_entries = []
+    blocked = []
+    for j, column in enumerate(matrix.columns):
+        forward, reverse = upper[j] > 0, lower[j] < 0
+        entries = []
+        for i, value in column:
+            produce = (value > 0 and forward) or (value < 0 and reverse)
+            consume = (value < 0 and forward) or (value > 0 and reverse)
+            if produce or consume:
+                entries.append((i, produce, consume))
+                producers[i] += produce
+                consumers[i] += consume
+                active[i] += 1
+        reaction_entries.append(entries)
+        blocked.append(not forward and not reverse)
+
+    def is_dead_end(i):
+        return producers[i] == 0 or consumers[i] == 0 or active[i] < 2
+
+    processed = [False] * compound_count
+    queue = deque(i for i in range(compound_count) if is_dead_end(i))
+    indptr, indices = matrix.indptr, matrix.indices
+    while len(queue) > 0:
+        i = queue.popleft()
+        if processed[i]:
+            continue
+        processed[i] = True
+
+        for k in range(indptr[i], indptr[i + 1]):
+            j = indices[k]
+            if blocked[j]:
+                continue
+
+            blocked[j] = True
+            for other, produce, consume in reaction_entries[j]:
+                producers[other] -= produce
+                consumers[other] -= consume
+                active[other] -= 1
+                if not processed[other] and is_dead_end(other):
+                    queue.append(other)
+
+    return set(reaction_id for reaction_id, is_blocked in zip(
+        matrix.reactions, blocked) if is_blocked)
+
+
+def remove_blocked_reactions(model):
+    """Return structurally blocked reactions and model without them.
+
+    The blocked reactions are found with :func:`blocked_reactions`. The
+    returned model is a copy of the model where these reactions have been
+    removed (or the model itself if no reactions are blocked). If the flux
+    bounds of a blocked reaction do not allow zero flux, the model is
+    infeasible. In this case no reactions are removed so that the
+    infeasibility is detected when the model is solved.
+
+    Args:
+        model: :class:`psamm.metabolicmodel.MetabolicModel`.
+
+    Returns:
+        Tuple of the set of blocked reactions and the reduced model.
+    """
+    blocked = blocked_reactions(model)
+    if len(blocked) == 0:
+        return blocked, model
+
+    for reaction_id in blocked:
+        lower, upper = model.limits[reaction_id]
+        if lower > 0 or upper < 0:
+            return blocked, model
+
+    reduced = model.copy()
+    for reaction_id in blocked:
+        reduced.remove_reaction(reaction_id)
+
+    logger.info('Removed {} structurally blocked reactions'.format(
+        len(blocked)))
+
+    return blocked, reduced
+
+
+class PresolvedModel(object):
+    """Reduced model and the mapping back to the original reactions.
+
+    The reduced model is available as :attr:`model`. Each reaction of the
+    original model is either removed (the flux is always zero) or mapped to
+    a reaction in the reduced model with a ratio such that the original flux
+    is the ratio times the flux of the reduced reaction.
+
+    Args:
+        reactions: Iterable of the reactions of the original model.
+        model: Reduced :class:`psamm.metabolicmodel.MetabolicModel`.
+        reaction_map: Dictionary of original reactions to
+            (reduced reaction, ratio)-tuples. Reactions that are not in the
+            dictionary have been removed.
+    """
+
+    def __init__(self, reactions, model, reaction_map):
+        self._reactions = list(reactions)
+        self._model = model
+        self._reaction_map = dict(reaction_map)
+
+    @property
+    def model(self):
+        """Reduced :class:`psamm.metabolicmodel.MetabolicModel`."""
+        return self._model
+
+    @property
+    def reactions(self):
+        """List of the reactions of the original model."""
+        return list(self._reactions)
+
+    @property
+    def removed(self):
+        """Set of reactions that were removed (the flux is always zero)."""
+        return set(r for r in self._reactions if r not in self._reaction_map)
+
+    @property
+    def lumped(self):
+        """Dictionary of reduced reactions to the lumped reactions.
+
+        Each reaction of the reduced model that represents more than one
+        reaction of the original model maps to a list of
+        (original reaction, ratio)-tuples.
+        """
+        members = {}
+        for reaction_id in self._reactions:
+            if reaction_id in self._reaction_map:
+                reduced, ratio = self._reaction_map[reaction_id]
+                members.setdefault(reduced, []).append((reaction_id, ratio))
+        return {reduced: reactions for reduced, reactions in
+                iteritems(members) if len(reactions) > 1}
+
+    def reaction_ratio(self, reaction_id):
+        """Return (reduced reaction, ratio) of reaction or None if removed."""
+        return self._reaction_map.get(reaction_id)
+
+    def expand_fluxes(self, fluxes):
+        """Yield reactions and fluxes of the original model.
+
+        Args:
+            fluxes: Dictionary (or other mapping) of the fluxes of the
+                reactions in the reduced model.
+        """
+        for reaction_id in self._reactions:
+            if reaction_id not in self._reaction_map:
+                yield reaction_id, 0
+            else:
+                reduced, ratio = self._reaction_map[reaction_id]
+                yield reaction_id, _multiply(ratio, fluxes[reduced])
+
+    def expand_flux_bounds(self, bounds):
+        """Yield reactions and flux bounds of the original model.
+
+        Args:
+            bounds: Dictionary (or other mapping) of (lower, upper)-tuples of
+                the reactions in the reduced model, e.g. as obtained from
+                flux variability analysis.
+        """
+        for reaction_id in self._reactions:
+            if reaction_id not in self._reaction_map:
+                yield reaction_id, (0, 0)
+            else:
+                reduced, ratio = self._reaction_map[reaction_id]
+                lower, upper = bounds[reduced]
+                lower, upper = (
+                    _multiply(ratio, lower), _multiply(ratio, upper))
+                if ratio < 0:
+                    lower, upper = upper, lower
+                yield reaction_id, (lower, upper)
+
+    def reduced_weights(self, weights={}):
+        """Return weights of the reduced reactions for L1 minimization.
+
+        The weighted L1 norm of the fluxes in the reduced model is equal to
+        the weighted L1 norm of the expanded fluxes when the weight of each
+        reduced reaction is the sum of the original weights (default 1)
+        multiplied by the absolute ratio.
+        """
+        reduced_weights = {}
+        for reaction_id, (reduced, ratio) in iteritems(self._reaction_map):
+            weight = _multiply(weights.get(reaction_id, 1), abs(ratio))
+            reduced_weights[reduced] = reduced_weights.get(reduced, 0) + weight
+        return reduced_weights
+
+
+class _Presolver(object):
+    """Reduce the stoichiometry and bounds of a model in place."""
+
+    def __init__(self, model, keep, lump):
+        self._keep = set(keep)
+        self._lump_reactions = lump
+
+        self._reactions = {}
+        self._bounds = {}
+        self._compound_reactions = {}
+        self._reaction_map = {}
+        self._members = {}
+        self._changed = set()
+
+        for reaction_id in model.reactions:
+            values = {compound: value for compound, value in
+                      model.get_reaction_values(reaction_id) if value != 0}
+            self._reactions[reaction_id] = values
+            self._bounds[reaction_id] = tuple(model.limits[reaction_id])
+            self._reaction_map[reaction_id] = reaction_id, 1
+            self._members[reaction_id] = [reaction_id]
+            for compound in values:
+                self._compound_reactions.setdefault(
+                    compound, set()).add(reaction_id)
+
+    def _can_produce(self, reaction_id, compound):
+        value = self._reactions[reaction_id][compound]
+        lower, upper = self._bounds[reaction_id]
+        return (value > 0 and upper > 0) or (value < 0 and lower < 0)
+
+    def _can_consume(self, reaction_id, compound):
+        value = self._reactions[reaction_id][compound]
+        lower, upper = self._bounds[reaction_id]
+        return (value < 0 and upper > 0) or (value > 0 and lower < 0)
+
+    def _is_dead_end(self, compound):
+        producers = set()
+        consumers = set()
+        for reaction_id in self._compound_reactions[compound]:
+            if self._can_produce(reaction_id, compound):
+                producers.add(reaction_id)
+            if self._can_consume(reaction_id, compound):
+                consumers.add(reaction_id)
+
+        # A single reversible reaction can both produce and consume the
+        # compound but this can never balance the compound.
+        return (len(producers) == 0 or len(consumers) == 0 or
+                (len(producers) == 1 and producers == consumers))
+
+    def _block(self, reaction_id):
+        """Block reaction and return compounds that have to be checked."""
+        if reaction_id in self._keep:
+            lower, upper = self._bounds[reaction_id]
+            if lower > 0 or upper < 0:
+                raise PresolveError(
+                    'Model is infeasible: Reaction {} is blocked but the flux'
+                    ' bounds exclude zero'.format(reaction_id))
+            elif (lower, upper) == (0, 0):
+                return set()
+            self._bounds[reaction_id] = 0, 0
+            return set(self._reactions[reaction_id])
+
+        lower, upper = self._bounds.pop(reaction_id)
+        if lower > 0 or upper < 0:
+            raise PresolveError(
+                'Model is infeasible: Reaction {} is blocked but the flux'
+                ' bounds exclude zero'.format(reaction_id))
+
+        compounds = self._reactions.pop(reaction_id)
+        for compound in compounds:
+            self._compound_reactions[compound].discard(reaction_id)
+        for member in self._members.pop(reaction_id):
+            del self._reaction_map[member]
+        self._changed.discard(reaction_id)
+        return set(compounds)
+
+    def _merge(self, reaction_id, other, ratio, compound):
+        """Merge other into reaction where other = ratio * reaction.
+
+        The given compound is balanced by the merged reaction. Returns
+        compounds that have to be checked.
+        """
+        lower, upper = self._merged_bounds(
+            reaction_id, self._bounds[reaction_id], other, ratio)
+
+        values = self._reactions[reaction_id]
+        other_values = self._reactions.pop(other)
+        del self._bounds[other]
+        self._bounds[reaction_id] = lower, upper
+
+        compounds = set(values)
+        for other_compound, value in iteritems(other_values):
+            self._compound_reactions[other_compound].discard(other)
+            new_value = _add(
+                values.get(other_compound, 0), _multiply(ratio, value))
+            if other_compound != compound and new_value != 0:
+                values[other_compound] = new_value
+                self._compound_reactions[other_compound].add(reaction_id)
+            else:
+                values.pop(other_compound, None)
+                self._compound_reactions[other_compound].discard(reaction_id)
+            compounds.add(other_compound)
+
+        self._move_members(reaction_id, other, ratio)
+
+        # The lumped reaction can end up with both bounds at zero
+        if self._bounds[reaction_id] == (0, 0):
+            compounds.update(self._block(reaction_id))
+
+        return compounds
+
+    def _merged_bounds(self, reaction_id, bounds, other, ratio):
+        """Return bounds intersected with bounds of other = ratio * reaction.
+        """
+        lower, upper = bounds
+        other_lower, other_upper = self._bounds[other]
+        if ratio > 0:
+            lower = max(lower, _divide(other_lower, ratio))
+            upper = min(upper, _divide(other_upper, ratio))
+        else:
+            lower = max(lower, _divide(other_upper, ratio))
+            upper = min(upper, _divide(other_lower, ratio))
+
+        if lower > upper:
+            if lower - upper > 1e-9 * max(1, abs(lower), abs(upper)):
+                raise PresolveError(
+                    'Model is infeasible: Flux bounds of {} and {} are not'
+                    ' compatible'.format(reaction_id, other))
+            lower = upper
+
+        return lower, upper
+
+    def _move_members(self, reaction_id, other, ratio):
+        """Map the members of other to reaction where other = ratio * reaction.
+        """
+        for member in self._members.pop(other):
+            _, member_ratio = self._reaction_map[member]
+            self._reaction_map[member] = (
+                reaction_id, _multiply(member_ratio, ratio))
+            self._members[reaction_id].append(member)
+
+        self._changed.add(reaction_id)
+        self._changed.discard(other)
+
+    def _merge_subset(self, reaction_id, others):
+        """Merge enzyme subset into reaction, return compounds to check.
+
+        The others are given as pairs of reaction and ratio such that the
+        flux of the other reaction is the ratio times the flux of the
+        reaction. The stoichiometry is combined using exact arithmetic so that
+        compounds balanced within the subset are removed from the reaction.
+        """
+        bounds = self._bounds[reaction_id]
+        values = {compound: Fraction(value) for compound, value in
+                  iteritems(self._reactions[reaction_id])}
+        for other, ratio in others:
+            bounds = self._merged_bounds(reaction_id, bounds, other, ratio)
+            for compound, value in iteritems(self._reactions.pop(other)):
+                values[compound] = (
+                    values.get(compound, 0) + ratio * Fraction(value))
+                self._compound_reactions[compound].discard(other)
+            del self._bounds[other]
+            self._move_members(reaction_id, other, ratio)
+
+        compounds = set(values)
+        self._reactions[reaction_id] = {}
+        for compound, value in iteritems(values):
+            if value != 0:
+                self._reactions[reaction_id][compound] = _from_fraction(value)
+                self._compound_reactions[compound].add(reaction_id)
+            else:
+                self._compound_reactions[compound].discard(reaction_id)
+
+        self._bounds[reaction_id] = bounds
+        if bounds == (0, 0):
+            compounds.update(self._block(reaction_id))
+
+        return compounds
+
+    def _lump(self, compound):
+        """Lump the two reactions of compound, return compounds to check."""
+        reaction_id, other = sorted(self._compound_reactions[compound])
+        if other in self._keep and reaction_id not in self._keep:
+            reaction_id, other = other, reaction_id
+        elif other in self._keep:
+            return set()
+
+        # The steady state of the compound requires that
+        # value * v(reaction) + other_value * v(other) = 0 so the flux of
+        # other is the flux of reaction multiplied by the ratio.
+        value = self._reactions[reaction_id][compound]
+        other_value = self._reactions[other][compound]
+        ratio = -_divide(value, other_value)
+        return self._merge(reaction_id, other, ratio, compound)
+
+    def presolve(self, blocked, subsets=()):
+        # Compounds are checked in a fixed order so that the result does not
+        # depend on the iteration order of sets.
+        queue = deque()
+        queued = set()
+
+        def enqueue(compounds):
+            for compound in sorted(compounds):
+                if compound not in queued:
+                    queued.add(compound)
+                    queue.append(compound)
+
+        for reaction_id in sorted(blocked):
+            enqueue(self._block(reaction_id))
+
+        for subset in subsets:
+            # All reactions of the subset are blocked if one is blocked
+            if any(reaction_id in blocked for reaction_id, _ in subset):
+                for reaction_id, _ in subset:
+                    if reaction_id not in blocked:
+                        enqueue(self._block(reaction_id))
+                continue
+
+            # Kept reactions cannot be merged into other reactions
+            kept = [(r, ratio) for r, ratio in subset if r in self._keep]
+            reaction_id, scale = kept[0] if len(kept) > 0 else subset[0]
+            others = [(r, ratio / scale) for r, ratio in subset
+                      if r != reaction_id and r not in self._keep]
+            if len(others) > 0:
+                enqueue(self._merge_subset(reaction_id, others))
+
+        enqueue(self._compound_reactions)
+
+        while len(queue) > 0:
+            compound = queue.popleft()
+            queued.remove(compound)
+            reactions = self._compound_reactions[compound]
+            if len(reactions) == 0:
+                continue
+
+            if self._is_dead_end(compound):
+                for reaction_id in sorted(reactions):
+                    enqueue(self._block(reaction_id))
+            elif self._lump_reactions and len(reactions) == 2:
+                enqueue(self._lump(compound))
+
+    def create_model(self, model):
+        """Return reduced model based on the original model."""
+        database = DictDatabase()
+        for reaction_id, values in iteritems(self._reactions):
+            if reaction_id in self._changed:
+                lower, upper = self._bounds[reaction_id]
+                if lower >= 0:
+                    direction = Direction.Forward
+                elif upper <= 0:
+                    direction = Direction.Reverse
+                else:
+                    direction = Direction.Both
+                reaction = Reaction(direction, values)
+            else:
+                reaction = model.get_reaction(reaction_id)
+            database.set_reaction(reaction_id, reaction)
+
+        reduced = MetabolicModel(database)
+        for reaction_id in sorted(self._reactions):
+            reduced.add_reaction(reaction_id)
+            reduced.limits[reaction_id].bounds = self._bounds[reaction_id]
+
+        return reduced
+
+
+def presolve(model, keep=(), lump=True, nullspace=False):
+    """Return reduced model with the same steady state flux space.
+
+    The reactions in ``keep`` are never removed from the model or lumped
+    into other reactions (but other reactions can be lumped into them) so
+    that these reactions can be used directly in the reduced model, e.g. as
+    the objective. Kept reactions that are blocked have their flux bounds
+    set to zero instead of being removed.
+
+    Raises :class:`PresolveError` if the model is found to be infeasible.
+
+    Args:
+        model: :class:`psamm.metabolicmodel.MetabolicModel` to reduce. The
+            model is not modified.
+        keep: Reactions that must be present in the reduced model.
+        lump: Whether to lump reactions that are coupled by compounds that
+            are only present in two reactions.
+        nullspace: Whether to also lump the enzyme subsets found from the
+            nullspace of the stoichiometric matrix (see
+            :func:`psamm.fluxcoupling.enzyme_subsets`) and remove the
+            reactions that have zero flux in every steady state. This finds
+            all fully coupled reactions but is slower on large models.
+
+    Returns:
+        :class:`PresolvedModel` with the reduced model.
+    """
+    reactions = sorted(model.reactions)
+    for reaction_id in keep:
+        if not model.has_reaction(reaction_id):
+            raise ValueError('Reaction not in model: {}'.format(reaction_id))
+
+    blocked = blocked_reactions(model)
+    subsets = []
+    if nullspace:
+        # Reactions that are not in any subset are blocked
+        unblocked = set()
+        for subset in enzyme_subsets(model):
+            unblocked.update(reaction_id for reaction_id, _ in subset)
+            if len(subset) > 1:
+                subsets.append(subset)
+        blocked.update(r for r in reactions if r not in unblocked)
+
+    presolver = _Presolver(model, keep, lump)
+    presolver.presolve(blocked, subsets)
+    reduced = presolver.create_model(model)
+
+    presolved = PresolvedModel(reactions, reduced, presolver._reaction_map)
+    logger.info(
+        'Presolve reduced the model from {} to {} reactions ({} removed,'
+        ' {} lumped)'.format(
+            len(reactions), len(presolver._reactions),
+            len(presolved.removed),
+            sum(len(r) - 1 for r in presolved.lumped.values())))
+
+    return presolved
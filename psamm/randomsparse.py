@@ -187,11 +187,8 @@ def random_sparse(strategy, prob, obj_reaction, flux_threshold):
         logger.info('Deleted reactions: {}'.format(
             ', '.join(deleted_reactions)))
 
-        constr = []
-        for r in deleted_reactions:
-            flux_var = prob.get_flux_var(r)
-            c, = prob.prob.add_linear_constraints(flux_var == 0)
-            constr.append(c)
+        # The bounds are kept if the entity is deleted
+        knockout = prob.knockout(deleted_reactions)
 
         logger.info('Trying FBA without reactions {}...'.format(
             ', '.join(deleted_reactions)))
@@ -202,8 +199,7 @@ def random_sparse(strategy, prob, obj_reaction, flux_threshold):
             logger.info(
                 'FBA is infeasible, marking {} as essential'.format(
                     entity))
-            for c in constr:
-                c.delete()
+            knockout.delete()
             essential.add(entity)
             continue
 
@@ -211,8 +207,7 @@ def random_sparse(strategy, prob, obj_reaction, flux_threshold):
             obj_reaction, prob.get_flux(obj_reaction)))
 
         if prob.get_flux(obj_reaction) < flux_threshold:
-            for c in constr:
-                c.delete()
+            knockout.delete()
             essential.add(entity)
             logger.info('Entity {} was essential'.format(
                 entity))
@@ -0,0 +1,288 @@
+# This file is part of PSAMM.
+#
+# PSAMM is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PSAMM is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PSAMM.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Copyright 2014-2017  Jon Lund Steffensen <jon_steffensen@uri.edu>
+
+"""Compact snapshots of metabolic models for worker processes.
+
+A :class:`ModelSnapshot` stores the flux bounds, the stoichiometric matrix
+(in compressed sparse row format) and the reaction and compound IDs of a
+:class:`MetabolicModel <psamm.metabolicmodel.MetabolicModel>` in a single
+flat buffer. When :mod:`multiprocessing.shared_memory` is available
+(Python 3.8+) the buffer is placed in shared memory so that worker
+processes can attach to it instead of receiving a pickled copy of the
+model. On older versions the buffer is pickled as bytes which is still
+much smaller than the pickled model.
+
+>>> snapshot = ModelSnapshot.from_model(model)
+>>> snapshot.share()
+>>> model = snapshot.load()  # In worker process
+>>> snapshot.close()
+>>> snapshot.unlink()
+"""
+
+from __future__ import unicode_literals
+
+import array
+import pickle
+import struct
+
+from six.moves import range
+
+from .database import MetabolicDatabase, SparseStoichiometricMatrix
+from .metabolicmodel import MetabolicModel
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+# Number of compounds, reactions, non-zero values and size of the ID tables
+_HEADER = struct.Struct(str('<4q'))
+
+
+def _array_view(buf, offset, typecode, count):
+    """Return array of count values of typecode stored in buf at offset."""
+    itemsize = array.array(str(typecode)).itemsize
+    end = offset + itemsize * count
+    view = memoryview(buf)[offset:end]
+    try:
+        return view.cast(str(typecode)), end
+    except AttributeError:
+        # Python 2 cannot cast memoryviews so the values are copied.
+        values = array.array(str(typecode))
+        values.fromstring(view.tobytes())
+        return values, end
+
+
+def _array_bytes(typecode, values):
+    """Return values packed as an array of typecode."""
+    values = array.array(str(typecode), values)
+    try:
+        return values.tobytes()
+    except AttributeError:
+        return values.tostring()
+
+
+class _SnapshotDatabase(MetabolicDatabase):
+    """Read-only database of the reactions in a snapshot.
+
+    The reactions are looked up directly in the stoichiometric matrix of the
+    snapshot.
+    """
+
+    def __init__(self, matrix, reversible):
+        self._matrix = matrix
+        self._reversible = reversible
+
+    @property
+    def reactions(self):
+        return iter(self._matrix.reactions)
+
+    @property
+    def compounds(self):
+        return iter(self._matrix.compounds)
+
+    @property
+    def compartments(self):
+        compartment_set = set()
+        for compound in self.compounds:
+            if compound.compartment not in compartment_set:
+                compartment_set.add(compound.compartment)
+                yield compound.compartment
+
+    def has_reaction(self, reaction_id):
+        return reaction_id in self._matrix.reaction_index
+
+    def is_reversible(self, reaction_id):
+        return bool(self._reversible[self._reaction_index(reaction_id)])
+
+    def _reaction_index(self, reaction_id):
+        try:
+            return self._matrix.reaction_index[reaction_id]
+        except KeyError:
+            raise ValueError('Unknown reaction: {}'.format(repr(reaction_id)))
+
+    def get_reaction_values(self, reaction_id):
+        j = self._reaction_index(reaction_id)
+        compounds = self._matrix.compounds
+        return iter([(compounds[i], value)
+                     for i, value in self._matrix.columns[j]])
+
+    def get_compound_reactions(self, compound_id):
+        i = self._matrix.compound_index.get(compound_id)
+        if i is None:
+            return iter([])
+        matrix = self._matrix
+        reactions = matrix.reactions
+        return iter([reactions[matrix.indices[k]]
+                     for k in range(matrix.indptr[i], matrix.indptr[i + 1])])
+
+    @property
+    def sparse_matrix(self):
+        return self._matrix
+
+
+class ModelSnapshot(object):
+    """Snapshot of a metabolic model stored in a flat buffer.
+
+    The snapshot is created from a model with :meth:`from_model`. Only the
+    state of the model at that time is stored; the stoichiometric values
+    and flux bounds are converted to floats. The model is recreated from
+    the buffer with :meth:`load`. Pickling the snapshot after calling
+    :meth:`share` only transfers the name of the shared memory block. Every
+    process should call :meth:`close` when the snapshot is no longer used
+    and the process that shared the snapshot must then call :meth:`unlink`.
+    """
+
+    def __init__(self, buf, name=None, shm=None):
+        self._buf = buf
+        self._name = name
+        self._shm = shm
+        self._owner = False
+
+    @classmethod
+    def from_model(cls, model):
+        """Create snapshot of model.
+
+        Raises ValueError if the stoichiometric values or flux bounds of the
+        model cannot be represented as floats (e.g. if the model contains
+        variable stoichiometry).
+        """
+        matrix = model.sparse_matrix
+        lower, upper = model.limits_arrays
+        reversible = [model.is_reversible(reaction_id)
+                      for reaction_id in matrix.reactions]
+
+        try:
+            parts = [
+                _array_bytes('d', [float(v) for v in matrix.data]),
+                _array_bytes('d', [float(v) for v in lower]),
+                _array_bytes('d', [float(v) for v in upper])]
+        except (TypeError, ValueError):
+            raise ValueError(
+                'Unable to represent model values as floating point')
+
+        parts.append(_array_bytes('i', matrix.indptr))
+        parts.append(_array_bytes('i', matrix.indices))
+        parts.append(_array_bytes('B', reversible))
+
+        ids = pickle.dumps(
+            (list(matrix.reactions), list(matrix.compounds),
+             model._v_max), -1)
+        parts.append(ids)
+
+        header = _HEADER.pack(
+            len(matrix.compounds), len(matrix.reactions), matrix.nnz,
+            len(ids))
+        return cls(header + b''.join(parts))
+
+    @property
+    def nbytes(self):
+        """Size of the snapshot buffer in bytes."""
+        return len(self._buf)
+
+    @property
+    def shared(self):
+        """Whether the snapshot is stored in shared memory."""
+        return self._name is not None
+
+    def share(self):
+        """Move the snapshot buffer to shared memory.
+
+        Return True if the buffer was moved or False if shared memory is not
+        available in this Python version.
+        """
+        if self._name is not None:
+            return True
+        if shared_memory is None:
+            return False
+
+        size = len(self._buf)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        shm.buf[:size] = self._buf
+        self._shm = shm
+        self._owner = True
+        self._name = shm.name
+        self._buf = shm.buf[:size]
+        return True
+
+    def close(self):
+        """Detach this process from the shared memory block.
+
+        Models loaded from the snapshot must not be used after the snapshot
+        is closed.
+        """
+        if self._shm is not None:
+            self._buf.release()
+            self._buf = None
+            self._shm.close()
+
+    def unlink(self):
+        """Remove the shared memory block.
+
+        This must only be called by the process that called :meth:`share`
+        after the worker processes have finished.
+        """
+        if self._shm is not None and self._owner:
+            self._shm.unlink()
+            self._shm = None
+
+    def __reduce__(self):
+        if self._name is not None:
+            return _attach_snapshot, (self._name, len(self._buf))
+        return self.__class__, (bytes(self._buf),)
+
+    def load(self):
+        """Create model from the snapshot.
+
+        The returned model is a regular
+        :class:`MetabolicModel <psamm.metabolicmodel.MetabolicModel>` whose
+        stoichiometric matrix and flux bound arrays refer to the snapshot
+        buffer.
+        """
+        buf = self._buf
+        compound_count, reaction_count, nnz, ids_size = _HEADER.unpack_from(
+            buf, 0)
+        offset = _HEADER.size
+        data, offset = _array_view(buf, offset, 'd', nnz)
+        lower, offset = _array_view(buf, offset, 'd', reaction_count)
+        upper, offset = _array_view(buf, offset, 'd', reaction_count)
+        indptr, offset = _array_view(buf, offset, 'i', compound_count + 1)
+        indices, offset = _array_view(buf, offset, 'i', nnz)
+        reversible, offset = _array_view(buf, offset, 'B', reaction_count)
+        reactions, compounds, v_max = pickle.loads(
+            bytes(buf[offset:offset + ids_size]))
+
+        matrix = SparseStoichiometricMatrix.from_csr(
+            compounds, reactions, indptr, indices, data)
+        database = _SnapshotDatabase(matrix, reversible)
+
+        model = MetabolicModel(database, v_max=v_max)
+        model._reaction_set = set(reactions)
+        model._compound_set = set(compounds)
+        model._limits_lower = dict(zip(reactions, lower))
+        model._limits_upper = dict(zip(reactions, upper))
+        model._sparse_matrix = matrix
+        model._limits_arrays = lower, upper
+        return model
+
+
+def _attach_snapshot(name, size):
+    """Attach to snapshot in shared memory (used when unpickling)."""
+    # Processes started by multiprocessing share the resource tracker of
+    # the parent so the block stays registered to the creating process.
+    shm = shared_memory.SharedMemory(name=name)
+    return ModelSnapshot(shm.buf[:size], name=name, shm=shm)
@@ -20,15 +20,22 @@ from __future__ import unicode_literals
 import sys
 import os
 import argparse
+import multiprocessing as mp
 import shutil
 import tempfile
+import struct
+import time
 from contextlib import contextmanager
 import unittest
+from fractions import Fraction
+from decimal import Decimal
 
 from six import StringIO, BytesIO
 
 from psamm.command import (main, Command, MetabolicMixin, SolverCommandMixin,
-                           CommandError)
+                           ParallelTaskMixin, CommandError,
+                           ProcessPoolExecutor, SequentialExecutor,
+                           TaskJournal)
 from psamm.lpsolver import generic
 from psamm.datasource import native, sbml
 
@@ -44,6 +51,7 @@ from psamm.commands.fva import FluxVariabilityCommand
 from psamm.commands.gapcheck import GapCheckCommand
 from psamm.commands.gapfill import GapFillCommand
 from psamm.commands.genedelete import GeneDeletionCommand
+from psamm.commands.genescreen import GeneScreenCommand
 from psamm.commands.masscheck import MassConsistencyCommand
 from psamm.commands.primarypairs import PrimaryPairsCommand
 from psamm.commands.randomsparse import RandomSparseNetworkCommand
@@ -106,6 +114,159 @@ class MockSolverCommand(SolverCommandMixin, Command):
         print(solver)
 
 
+class MockTaskHandler(object):
+    """Test task handler that sleeps for the given time."""
+    def __init__(self, offset):
+        self._offset = offset
+
+    def handle_task(self, value, delay):
+        time.sleep(delay)
+        return value + self._offset
+
+
+class MockParallelCommand(ParallelTaskMixin, Command):
+    """Test parallel command.
+
+    This is a command for testing the creation of executors.
+    """
+    def run(self):
+        pass
+
+
+class TestExecutor(unittest.TestCase):
+    def test_create_executor_with_fewer_cpus_than_per_worker(self):
+        parser = argparse.ArgumentParser()
+        MockParallelCommand.init_parser(parser)
+        command = MockParallelCommand(
+            native.NativeModel(), parser.parse_args([]))
+
+        cpu_count = mp.cpu_count
+        mp.cpu_count = lambda: 1
+        try:
+            executor = command._create_executor(
+                MockTaskHandler, (10,), cpus_per_worker=2)
+        finally:
+            mp.cpu_count = cpu_count
+
+        self.assertIsInstance(executor, SequentialExecutor)
+        with executor:
+            results = dict(executor.imap_unordered(iter([(1, 0)])))
+        executor.join()
+        self.assertEqual(results, {(1, 0): 11})
+
+    def test_sequential_executor(self):
+        tasks = [(i, 0) for i in range(5)]
+        with SequentialExecutor(MockTaskHandler, (10,)) as executor:
+            results = dict(executor.imap_unordered(iter(tasks)))
+        executor.join()
+        self.assertEqual(results, {task: task[0] + 10 for task in tasks})
+
+    def test_process_pool_executor_adaptive(self):
+        tasks = [(i, 0) for i in range(100)]
+        executor = ProcessPoolExecutor(MockTaskHandler, (10,), processes=2)
+        with executor:
+            results = list(executor.imap_unordered(iter(tasks)))
+        executor.join()
+        self.assertEqual(len(results), 100)
+        self.assertEqual(dict(results), {task: task[0] + 10 for task in tasks})
+        self.assertEqual(
+            sum(count for count, _ in executor.worker_stats.values()), 100)
+
+    def test_process_pool_executor_steal_tasks(self):
+        # A single chunk containing all tasks is split among the workers
+        tasks = [(i, 0.05) for i in range(10)]
+        executor = ProcessPoolExecutor(MockTaskHandler, (0,), processes=2)
+        with executor:
+            results = dict(executor.imap_unordered(iter(tasks), 10))
+        executor.join()
+        self.assertEqual(results, {task: task[0] for task in tasks})
+        self.assertEqual(len(executor.worker_stats), 2)
+
+    def test_process_pool_executor_error(self):
+        executor = ProcessPoolExecutor(MockTaskHandler, (10,), processes=2)
+        with executor:
+            with self.assertRaises(TypeError):
+                list(executor.imap_unordered(iter([(1, 0), ('a', 0)])))
+        executor.join()
+
+
+class TestTaskJournal(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._dir, 'journal.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def test_journal_resume(self):
+        journal = TaskJournal(self._path, 'key')
+        journal.add(('rxn_1', 1), (10.0, None))
+        journal.add(('rxn_1', -1), (float('-inf'), None))
+        journal.close()
+
+        journal = TaskJournal(self._path, 'key', resume=True)
+        self.assertEqual(len(journal), 2)
+        self.assertIn(('rxn_1', 1), journal)
+        self.assertNotIn(('rxn_2', 1), journal)
+        self.assertEqual(journal.get(('rxn_1', 1)), [10.0, None])
+        self.assertEqual(journal.get(('rxn_1', -1))[0], float('-inf'))
+        journal.close()
+
+    def test_journal_resume_exact_values(self):
+        journal = TaskJournal(self._path, 'key')
+        journal.add(('rxn_1', Fraction(1, 3)), (Fraction(10, 3), None))
+        journal.add(('rxn_2', 1), Decimal('0.1'))
+        journal.close()
+
+        journal = TaskJournal(self._path, 'key', resume=True)
+        self.assertEqual(len(journal), 2)
+        self.assertIn(('rxn_1', Fraction(1, 3)), journal)
+        result = journal.get(('rxn_1', Fraction(1, 3)))
+        self.assertEqual(result, [Fraction(10, 3), None])
+        self.assertIsInstance(result[0], Fraction)
+        self.assertEqual(journal.get(('rxn_2', 1)), Decimal('0.1'))
+        journal.close()
+
+    def test_journal_without_resume(self):
+        journal = TaskJournal(self._path, 'key')
+        journal.add(('rxn_1', 1), 10.0)
+        journal.close()
+
+        journal = TaskJournal(self._path, 'key')
+        self.assertEqual(len(journal), 0)
+        journal.close()
+
+    def test_journal_resume_other_key(self):
+        TaskJournal(self._path, 'key').close()
+        with self.assertRaises(ValueError):
+            TaskJournal(self._path, 'other', resume=True)
+
+    def test_journal_incomplete_line(self):
+        journal = TaskJournal(self._path, 'key')
+        journal.add(('rxn_1', 1), 10.0)
+        journal.close()
+        with open(self._path, 'a') as f:
+            f.write('{"task": ["rxn_2", 1], "res')
+
+        journal = TaskJournal(self._path, 'key', resume=True)
+        self.assertEqual(len(journal), 1)
+        journal.close()
+
+    def test_executor_skips_recorded_tasks(self):
+        journal = TaskJournal(self._path, 'key')
+        journal.add((1, 0), 100)
+        tasks = [(i, 0) for i in range(5)]
+        with SequentialExecutor(
+                MockTaskHandler, (10,), journal=journal) as executor:
+            results = dict(executor.imap_unordered(iter(tasks)))
+        self.assertEqual(results, {
+            (0, 0): 10, (1, 0): 100, (2, 0): 12, (3, 0): 13, (4, 0): 14})
+
+        journal = TaskJournal(self._path, 'key', resume=True)
+        self.assertEqual(len(journal), 5)
+        journal.close()
+
+
 class BaseCommandTest(object):
     """Generic methods used for different test cases.
 
@@ -330,6 +491,23 @@ class TestCommandMain(unittest.TestCase, BaseCommandTest):
                 FluxBalanceCommand, ['--loop-removal=l1min'],
                 model=self._infeasible_model)
 
+    def test_run_fba_with_presolve(self):
+        self.skip_test_if_no_solver()
+        f = self.run_command(
+            FluxBalanceCommand, ['--presolve', '--all-reactions'])
+        self.assertIn('rxn_3', f.getvalue())
+
+    def test_run_fba_with_l1min_and_presolve(self):
+        self.run_solver_command(
+            FluxBalanceCommand, ['--loop-removal=l1min', '--presolve'])
+
+    def test_run_fba_with_tfba_and_presolve(self):
+        self.skip_test_if_no_solver(integer=True)
+        with self.assertRaises(CommandError):
+            self.run_solver_command(
+                FluxBalanceCommand, ['--loop-removal=tfba', '--presolve'],
+                {'integer': True})
+
     def test_run_fluxcheck(self):
         self.run_solver_command(FluxConsistencyCommand)
 
@@ -388,6 +566,30 @@ class TestCommandMain(unittest.TestCase, BaseCommandTest):
     def test_run_fva(self):
         self.run_solver_command(FluxVariabilityCommand)
 
+    def test_run_fva_with_checkpoint(self):
+        self.skip_test_if_no_solver()
+        dest = tempfile.mkdtemp()
+        try:
+            path = os.path.join(dest, 'fva.jsonl')
+            args = ['--checkpoint', path, '--parallel', '1']
+            output = self.run_solver_command(
+                FluxVariabilityCommand, args).getvalue()
+            resumed = self.run_solver_command(
+                FluxVariabilityCommand, args + ['--resume']).getvalue()
+            self.assertEqual(output, resumed)
+
+            with self.assertRaises(SystemExit):
+                self.run_solver_command(
+                    FluxVariabilityCommand,
+                    args + ['--resume', '--threshold', '10'])
+        finally:
+            shutil.rmtree(dest)
+
+    def test_run_fva_resume_without_checkpoint(self):
+        self.skip_test_if_no_solver()
+        with self.assertRaises(CommandError):
+            self.run_solver_command(FluxVariabilityCommand, ['--resume'])
+
     def test_run_fva_with_infeasible(self):
         self.skip_test_if_no_solver()
         with self.assertRaises(SystemExit):
@@ -398,6 +600,11 @@ class TestCommandMain(unittest.TestCase, BaseCommandTest):
         self.run_solver_command(
             FluxVariabilityCommand, ['--loop-removal=tfba'], {'integer': True})
 
+    def test_run_fva_with_presolve(self):
+        self.skip_test_if_no_solver()
+        f = self.run_command(FluxVariabilityCommand, ['--presolve'])
+        self.assertIn('rxn_3\t0\t0', f.getvalue())
+
     def test_run_gapcheck_prodcheck(self):
         self.run_solver_command(
             GapCheckCommand, ['--method=prodcheck'])
@@ -469,6 +676,25 @@ class TestCommandMain(unittest.TestCase, BaseCommandTest):
                 GeneDeletionCommand, ['--gene=gene_1'],
                 model=self._infeasible_model)
 
+    def test_run_genescreen(self):
+        self.run_solver_command(GeneScreenCommand)
+
+    def test_run_genescreen_with_pairs(self):
+        self.run_solver_command(GeneScreenCommand, ['--pairs'])
+
+    def test_run_genescreen_with_lin_moma(self):
+        self.run_solver_command(GeneScreenCommand, ['--method=lin_moma'])
+
+    def test_run_genescreen_with_moma(self):
+        self.run_solver_command(
+            GeneScreenCommand, ['--method=moma'], {'quadratic': True})
+
+    def test_run_genescreen_with_infeasible(self):
+        self.skip_test_if_no_solver()
+        with self.assertRaises(SystemExit):
+            self.run_solver_command(
+                GeneScreenCommand, model=self._infeasible_model)
+
     def test_run_masscheck_compounds(self):
         self.run_solver_command(MassConsistencyCommand, ['--type', 'compound'])
 
@@ -541,6 +767,150 @@ class TestCommandMain(unittest.TestCase, BaseCommandTest):
                 RobustnessCommand, ['rxn_2_\u03c0'],
                 model=self._infeasible_model)
 
+    def _phase_plane_model(self):
+        return native.ModelReader({
+            'biomass': 'bio',
+            'reactions': [
+                {'id': 'rxn_1', 'equation': 'A[e] => A[c]'},
+                {'id': 'rxn_2', 'equation': 'C[e] => A[c]'},
+                {'id': 'bio', 'equation': 'A[c] =>'}
+            ],
+            'limits': [
+                {'reaction': 'rxn_1', 'upper': 10},
+                {'reaction': 'rxn_2', 'upper': 10}
+            ],
+            'exchange': [{
+                'compartment': 'e',
+                'compounds': [{'id': 'A'}, {'id': 'C'}]
+            }]
+        }).create_model()
+
+    def _read_npy_values(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.assertEqual(data[:8], b'\x93NUMPY\x01\x00')
+        header_length = struct.unpack(str('<H'), data[8:10])[0]
+        header = data[10:10 + header_length]
+        count = (len(data) - 10 - header_length) // 8
+        values = struct.unpack(
+            str('<{}d').format(count), data[10 + header_length:])
+        return header, values
+
+    def test_run_robustness_phase_plane(self):
+        self.skip_test_if_no_solver()
+        model = self._phase_plane_model()
+
+        dest = tempfile.mkdtemp()
+        try:
+            path = os.path.join(dest, 'plane.npy')
+            f = self.run_command(RobustnessCommand, [
+                '--steps=3', '--phase-plane=rxn_2', '--maximum=20',
+                '--output-array', path, 'rxn_1'], model=model)
+            header, values = self._read_npy_values(path)
+        finally:
+            shutil.rmtree(dest)
+
+        rows = {}
+        for line in f.getvalue().splitlines():
+            flux_1, flux_2, value = (float(v) for v in line.split('\t'))
+            rows[flux_1, flux_2] = value
+        self.assertEqual(len(rows), 6)
+        self.assertAlmostEqual(rows[10.0, 5.0], 15)
+        self.assertAlmostEqual(rows[0.0, 10.0], 10)
+
+        self.assertIn(b"'shape': (3,3,)", header)
+        self.assertAlmostEqual(values[3 * 1 + 1], 15)
+        self.assertAlmostEqual(values[3 * 1 + 2], 20)
+
+        # Points where rxn_1 is fixed beyond its upper bound are missing
+        self.assertTrue(all(v != v for v in values[6:9]))
+
+    def test_run_robustness_phase_plane_fixed_range(self):
+        self.skip_test_if_no_solver()
+        model = self._phase_plane_model()
+
+        # All steps of the first reaction have the same flux
+        dest = tempfile.mkdtemp()
+        try:
+            path = os.path.join(dest, 'plane.npy')
+            self.run_command(RobustnessCommand, [
+                '--steps=3', '--phase-plane=rxn_2', '--minimum=5',
+                '--maximum=5', '--parallel=2', '--output-array', path,
+                'rxn_1'], model=model)
+            header, values = self._read_npy_values(path)
+        finally:
+            shutil.rmtree(dest)
+
+        self.assertIn(b"'shape': (3,3,)", header)
+        for i in range(3):
+            for j, expected in enumerate([5, 10, 15]):
+                self.assertAlmostEqual(values[3 * i + j], expected)
+
+    def test_run_robustness_range_ends_on_limit(self):
+        self.skip_test_if_no_solver()
+        model = native.ModelReader({
+            'biomass': 'bio',
+            'reactions': [
+                {'id': 'rxn_1', 'equation': 'A[e] => A[c]'},
+                {'id': 'bio', 'equation': 'A[c] =>'}
+            ],
+            'limits': [
+                {'reaction': 'rxn_1', 'upper': 0.1}
+            ],
+            'exchange': [{
+                'compartment': 'e',
+                'compounds': [{'id': 'A'}]
+            }]
+        }).create_model()
+
+        # The last step is rounded to a value slightly above the limit
+        f = self.run_command(RobustnessCommand, [
+            '--steps=4', '--minimum=0', '--maximum=0.1', 'rxn_1'],
+            model=model)
+        rows = [[float(v) for v in line.split('\t')]
+                for line in f.getvalue().splitlines()]
+        self.assertEqual(len(rows), 4)
+        last = max(rows)
+        self.assertAlmostEqual(last[0], 0.1)
+        self.assertAlmostEqual(last[1], 0.1)
+
+    def test_run_robustness_parametric(self):
+        self.skip_test_if_no_solver()
+        model = native.ModelReader({
+            'biomass': 'bio',
+            'reactions': [
+                {'id': 'rxn_1', 'equation': 'A[c] => (2) X[c]'},
+                {'id': 'rxn_2', 'equation': 'A[c] + (2) O[c] => (6) X[c]'},
+                {'id': 'rxn_3', 'equation': 'O[c] =>'},
+                {'id': 'bio', 'equation': 'X[c] =>'}
+            ],
+            'limits': [
+                {'reaction': 'rxn_2', 'upper': 6}
+            ],
+            'exchange': [{
+                'compartment': 'c',
+                'compounds': [
+                    {'id': 'A', 'lower': -10, 'upper': 0},
+                    {'id': 'O', 'lower': -100}
+                ]
+            }]
+        }).create_model()
+
+        f = self.run_command(
+            RobustnessCommand, ['--parametric', 'EX_O[c]'], model=model)
+        rows = [[float(v) for v in line.split('\t')]
+                for line in f.getvalue().splitlines()]
+        expected = [(-100, 44), (-12, 44), (0, 20)]
+        self.assertEqual(len(rows), len(expected))
+        for row, expected_row in zip(rows, expected):
+            for value, expected_value in zip(row, expected_row):
+                self.assertAlmostEqual(value, expected_value)
+
+    def test_run_robustness_parametric_with_tfba(self):
+        with self.assertRaises(CommandError):
+            self.run_command(RobustnessCommand, [
+                '--parametric', '--loop-removal=tfba', 'rxn_2_\u03c0'])
+
     def test_run_sbmlexport(self):
         self.run_command(SBMLExport)
 
@@ -18,7 +18,8 @@
 
 import unittest
 
-from psamm.database import DictDatabase, ChainedDatabase
+from psamm.database import (DictDatabase, ChainedDatabase,
+                            SparseStoichiometricMatrix)
 from psamm.reaction import Compound, Reaction, Direction
 from psamm.datasource.reaction import parse_reaction
 
@@ -122,6 +123,62 @@ class TestMetabolicDatabase(unittest.TestCase):
     def test_matrix_len(self):
         self.assertEqual(len(self.database.matrix), 11)
 
+    def test_sparse_matrix_values(self):
+        matrix = self.database.sparse_matrix
+        self.assertEqual(matrix.shape, (4, 6))
+        self.assertEqual(matrix.nnz, 11)
+        for (compound, reaction_id), value in self.database.matrix.items():
+            i = matrix.compound_index[compound]
+            j = matrix.reaction_index[reaction_id]
+            self.assertIn((i, value), matrix.columns[j])
+
+    def test_sparse_matrix_csr(self):
+        matrix = self.database.sparse_matrix
+        values = {}
+        for i in range(matrix.shape[0]):
+            for k in range(matrix.indptr[i], matrix.indptr[i + 1]):
+                key = matrix.compounds[i], matrix.reactions[matrix.indices[k]]
+                values[key] = matrix.data[k]
+        self.assertEqual(values, dict(self.database.matrix))
+
+    def test_sparse_matrix_add_reaction(self):
+        matrix = self.database.sparse_matrix
+        indptr = list(matrix.indptr)
+        matrix.add_reaction('rxn_7', [(Compound('B'), -1), (Compound('E'), 1)])
+        self.assertEqual(matrix.shape, (5, 7))
+        self.assertEqual(matrix.reaction_index['rxn_7'], 6)
+        self.assertEqual(matrix.compound_index[Compound('E')], 4)
+        self.assertNotEqual(list(matrix.indptr), indptr)
+        self.assertEqual(len(matrix.data), 13)
+
+    def test_sparse_matrix_add_existing_reaction(self):
+        matrix = self.database.sparse_matrix
+        with self.assertRaises(ValueError):
+            matrix.add_reaction('rxn_1', [(Compound('A'), 1)])
+
+    def test_sparse_matrix_flipped(self):
+        matrix = self.database.sparse_matrix
+        flipped = matrix.flipped({'rxn_2'})
+        j = matrix.reaction_index['rxn_2']
+        i = matrix.compound_index[Compound('A')]
+        self.assertIn((i, -1), matrix.columns[j])
+        self.assertIn((i, 1), flipped.columns[j])
+
+    def test_sparse_matrix_from_csr(self):
+        matrix = self.database.sparse_matrix
+        copy = SparseStoichiometricMatrix.from_csr(
+            matrix.compounds, matrix.reactions, matrix.indptr,
+            matrix.indices, matrix.data)
+        self.assertEqual(copy.shape, matrix.shape)
+        self.assertEqual(copy.nnz, 11)
+        self.assertEqual(
+            [sorted(column) for column in copy.columns], matrix.columns)
+
+        copy.add_reaction('rxn_7', [(Compound('B'), -1)])
+        self.assertEqual(copy.nnz, 12)
+        self.assertEqual(matrix.nnz, 11)
+
+
 class TestChainedDatabase(unittest.TestCase):
     def setUp(self):
         database1 = DictDatabase()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# This file is part of PSAMM.
+#
+# PSAMM is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PSAMM is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PSAMM.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Copyright 2014-2017  Jon Lund Steffensen <jon_steffensen@uri.edu>
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from psamm.datasource import cache
+from psamm.datasource.context import FilePathContext
+
+
+class TestFilePathContextRecording(unittest.TestCase):
+    def test_record_opened_in_derived_contexts(self):
+        context = FilePathContext('/path/to/model.yaml')
+        opened = context.record_opened()
+        self.assertEqual(opened, {'/path/to/model.yaml'})
+
+        derived = FilePathContext(context.resolve('reactions.yaml'))
+        self.assertIs(derived.opened_files, opened)
+
+    def test_not_recording_by_default(self):
+        context = FilePathContext('/path/to/model.yaml')
+        self.assertIsNone(context.opened_files)
+        self.assertIsNone(context.resolve('other.yaml').opened_files)
+
+
+class TestModelCache(unittest.TestCase):
+    def setUp(self):
+        self._model_dir = tempfile.mkdtemp()
+        self._cache_dir = os.path.join(self._model_dir, 'cache')
+        self.write_file('model.yaml', '\n'.join([
+            '---',
+            'name: Test model',
+            'reactions:',
+            '  - include: reactions.yaml',
+            'compounds:',
+            '  - id: A',
+        ]))
+        self.write_file('reactions.yaml', '\n'.join([
+            '- id: rxn_1',
+            '  equation: A[e] => B[c]',
+        ]))
+
+    def tearDown(self):
+        shutil.rmtree(self._model_dir)
+
+    def write_file(self, name, content):
+        with open(os.path.join(self._model_dir, name), 'w') as f:
+            f.write(content)
+
+    def load_model(self):
+        return cache.ModelCache(self._cache_dir).load_model(self._model_dir)
+
+    def cache_files(self):
+        return [f for f in os.listdir(self._cache_dir)
+                if f.endswith('.pickle')]
+
+    def test_load_model_creates_cache(self):
+        model = self.load_model()
+        self.assertEqual(model.name, 'Test model')
+        self.assertEqual(len(self.cache_files()), 1)
+
+        cached_model = self.load_model()
+        self.assertEqual(
+            [r.id for r in cached_model.reactions], ['rxn_1'])
+        self.assertEqual(
+            str(cached_model.reactions['rxn_1'].equation),
+            str(model.reactions['rxn_1'].equation))
+
+    def test_load_model_from_cache_without_parsing(self):
+        self.load_model()
+
+        # Replace the cached model to detect that the cache entry is used
+        model = self.load_model()
+        cache_path = os.path.join(self._cache_dir, self.cache_files()[0])
+        entry = cache.ModelCache()._read_entry(cache_path)
+        entry['model'].name = 'Cached model'
+        cache.ModelCache()._write_entry(cache_path, entry)
+
+        self.assertEqual(self.load_model().name, 'Cached model')
+        self.assertEqual(model.name, 'Test model')
+
+    def test_changed_include_invalidates_cache(self):
+        self.load_model()
+        self.write_file('reactions.yaml', '\n'.join([
+            '- id: rxn_1',
+            '  equation: A[e] => B[c]',
+            '- id: rxn_2',
+            '  equation: B[c] => C[c]',
+        ]))
+
+        model = self.load_model()
+        self.assertEqual(
+            [r.id for r in model.reactions], ['rxn_1', 'rxn_2'])
+
+    def test_touched_file_keeps_cache(self):
+        self.load_model()
+        path = os.path.join(self._model_dir, 'reactions.yaml')
+        st = os.stat(path)
+        os.utime(path, (st.st_atime, st.st_mtime + 10))
+
+        files = cache.ModelCache()._validate_files(
+            [(path, (st.st_size, -1), cache._file_hash(path))])
+        self.assertIsNotNone(files)
+
+    def test_corrupt_cache_is_ignored(self):
+        self.load_model()
+        cache_path = os.path.join(self._cache_dir, self.cache_files()[0])
+        with open(cache_path, 'wb') as f:
+            f.write(b'not a pickle')
+
+        model = self.load_model()
+        self.assertEqual(model.name, 'Test model')
+
+
+if __name__ == '__main__':
+    unittest.main()
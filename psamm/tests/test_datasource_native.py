@@ -663,6 +663,121 @@ class TestYAMLFileSystemData(unittest.TestCase):
         self.assertEqual(reactions, ['rxn_1', 'rxn_2', 'rxn_3', 'rxn_4'])
 
 
+class TestParallelModelParsing(unittest.TestCase):
+    """Test parsing included files in parallel processes."""
+
+    def setUp(self):
+        self._model_dir = tempfile.mkdtemp()
+
+        includes = []
+        for i in range(6):
+            name = 'reactions_{}.yaml'.format(i)
+            self.write_model_file(name, '\n'.join(
+                '- id: rxn_{}_{}\n  equation: A[c] => B_{}[c]'.format(i, j, j)
+                for j in range(3)))
+            includes.append('  - include: {}'.format(name))
+        self.write_model_file('reactions.tsv', '\n'.join([
+            'id\tequation', 'rxn_tsv\tB_0[c] => C[c]']))
+        includes.append('  - include: reactions.tsv')
+        self.write_model_file('compounds.tsv', '\n'.join([
+            'id\tname', 'A\tCompound A', 'C\tCompound C']))
+        self.write_model_file('limits.tsv', 'rxn_0_0\t-5\t5\n')
+        self.write_model_file('exchange.yaml', '\n'.join([
+            'compounds:', '  - id: A', '    lower: -10']))
+        self.write_model_file('model_def.tsv', 'rxn_0_0\nrxn_1_1\n')
+
+        self.write_model_file('model.yaml', '\n'.join([
+            'name: Test model',
+            'compounds:',
+            '  - include: compounds.tsv',
+            '  - id: B_0',
+            'reactions:',
+            '  - id: rxn_main',
+            '    equation: C[c] =>'] + includes + [
+            'exchange:',
+            '  - include: exchange.yaml',
+            'limits:',
+            '  - include: limits.tsv',
+            'model:',
+            '  - include: model_def.tsv',
+            '  - reactions: [rxn_tsv]',
+        ]))
+
+    def tearDown(self):
+        shutil.rmtree(self._model_dir)
+
+    def write_model_file(self, filename, contents):
+        path = os.path.join(self._model_dir, filename)
+        with open(path, 'w') as f:
+            f.write(contents)
+        return path
+
+    def create_model(self, processes):
+        reader = native.ModelReader.reader_from_path(self._model_dir)
+        return reader.create_model(processes=processes)
+
+    def test_parallel_model_is_identical(self):
+        serial = self.create_model(1)
+        parallel = self.create_model(4)
+
+        for attr in ('compounds', 'reactions'):
+            serial_entries = list(getattr(serial, attr))
+            parallel_entries = list(getattr(parallel, attr))
+            self.assertEqual(
+                [e.id for e in serial_entries],
+                [e.id for e in parallel_entries])
+            self.assertEqual(
+                [e.properties for e in serial_entries],
+                [e.properties for e in parallel_entries])
+            self.assertEqual(
+                [str(e.filemark) for e in serial_entries],
+                [str(e.filemark) for e in parallel_entries])
+
+        self.assertEqual(list(serial.exchange.items()),
+                         list(parallel.exchange.items()))
+        self.assertEqual(list(serial.limits.items()),
+                         list(parallel.limits.items()))
+        self.assertEqual(list(serial.model), list(parallel.model))
+        self.assertEqual(list(parallel.model), ['rxn_0_0', 'rxn_1_1', 'rxn_tsv'])
+        self.assertEqual(len(list(parallel.reactions)), 6 * 3 + 2)
+
+    def test_serial_by_default(self):
+        def pool(*args, **kwargs):
+            raise AssertionError('Process pool was started')
+
+        reader = native.ModelReader.reader_from_path(self._model_dir)
+        mp_pool = native.mp.Pool
+        native.mp.Pool = pool
+        try:
+            model = reader.create_model()
+        finally:
+            native.mp.Pool = mp_pool
+
+        self.assertEqual(len(list(model.reactions)), 6 * 3 + 2)
+
+    def test_parallel_parse_error_is_identical(self):
+        self.write_model_file('reactions_3.yaml', '- equation: A[c] => B[c]')
+
+        errors = []
+        for processes in (1, 4):
+            with self.assertRaises(Exception) as context:
+                self.create_model(processes)
+            errors.append(context.exception)
+
+        self.assertEqual(type(errors[0]), type(errors[1]))
+        self.assertEqual(str(errors[0]), str(errors[1]))
+
+    def test_parallel_records_opened_files(self):
+        reader = native.ModelReader.reader_from_path(self._model_dir)
+        opened = reader.context.record_opened()
+        reader.create_model(processes=4)
+        self.assertEqual(
+            {os.path.basename(p) for p in opened},
+            {'model.yaml', 'compounds.tsv', 'reactions.tsv', 'limits.tsv',
+             'exchange.yaml', 'model_def.tsv'} |
+            {'reactions_{}.yaml'.format(i) for i in range(6)})
+
+
 class TestCheckId(unittest.TestCase):
     def test_check_id_none(self):
         with self.assertRaises(native.ParseError):
@@ -697,6 +812,76 @@ class TestNativeModel(unittest.TestCase):
         self.assertEqual(model.default_flux_limit, 1000)
 
 
+class TestNativeModelFloatValues(unittest.TestCase):
+    def setUp(self):
+        self._model_yaml = '''---
+default_flux_limit: 500.5
+reactions:
+  - id: rxn_1
+    equation: A[e] <=> (1.5) B[c]
+  - id: rxn_2
+    equation: (0.25) B[c] => C[c]
+exchange:
+  - compounds:
+      - id: A
+        lower: -10.5
+limits:
+  - reaction: rxn_2
+    upper: 100.25
+'''
+        self._env = os.environ.pop('PSAMM_FLOAT_VALUES', None)
+
+    def tearDown(self):
+        os.environ.pop('PSAMM_FLOAT_VALUES', None)
+        if self._env is not None:
+            os.environ['PSAMM_FLOAT_VALUES'] = self._env
+
+    def create_model(self, **kwargs):
+        return native.ModelReader(
+            StringIO(self._model_yaml), **kwargs).create_model()
+
+    def assert_float_model(self, mm):
+        values = dict(mm.get_reaction_values('rxn_1'))
+        self.assertIsInstance(values[Compound('B', 'c')], float)
+        self.assertEqual(values[Compound('B', 'c')], 1.5)
+
+        lower, upper = mm.limits_arrays
+        values = list(lower) + list(upper) + list(mm.sparse_matrix.data)
+        self.assertFalse(any(isinstance(v, Decimal) for v in values))
+        self.assertEqual(mm.limits['rxn_2'].upper, 100.25)
+        self.assertEqual(mm.limits['rxn_1'].upper, 500.5)
+
+    def test_decimal_values_by_default(self):
+        mm = self.create_model().create_metabolic_model()
+        values = dict(mm.get_reaction_values('rxn_1'))
+        self.assertIsInstance(values[Compound('B', 'c')], Decimal)
+
+    def test_float_values_option(self):
+        model = self.create_model()
+        mm = model.create_metabolic_model(float_values=True)
+        self.assert_float_model(mm)
+
+        # Native model keeps the exact values
+        reaction = model.reactions['rxn_2']
+        self.assertIsInstance(dict(reaction.equation.compounds)[
+            Compound('B', 'c')], Decimal)
+
+    def test_float_values_from_reader(self):
+        model = self.create_model(float_values=True)
+        self.assertTrue(model.float_values)
+        self.assert_float_model(model.create_metabolic_model())
+
+    def test_float_values_from_environment(self):
+        os.environ['PSAMM_FLOAT_VALUES'] = 'yes'
+        self.assert_float_model(
+            self.create_model().create_metabolic_model())
+
+        # Explicit option overrides environment
+        mm = self.create_model(float_values=False).create_metabolic_model()
+        values = dict(mm.get_reaction_values('rxn_1'))
+        self.assertIsInstance(values[Compound('B', 'c')], Decimal)
+
+
 class TestNativeModelWriter(unittest.TestCase):
     def setUp(self):
         self.writer = native.ModelWriter()
@@ -428,6 +428,39 @@ class TestSBMLDatabaseL2V5(unittest.TestCase):
         self.assertEqual(model.biomass_reaction, 'Biomass')
         self.assertEqual(set(model.model), {'Biomass', 'G6Pase'})
 
+        reaction = model.reactions['G6Pase']
+        self.assertEqual(reaction.properties['genes'], 'b0822')
+        self.assertEqual(reaction.properties['confidence'], 3)
+
+    def test_properties_parsed_once(self):
+        reader = sbml.SBMLReader(self.doc)
+        species = reader.get_species('M_Glucose_LPAREN_c_RPAREN_')
+        self.assertIs(species.properties, species.properties)
+        self.assertEqual(species.properties['charge'], 0)
+
+    def test_discard_notes(self):
+        reader = sbml.SBMLReader(
+            self.doc, read_notes=False, read_annotation=False)
+        species = reader.get_species('M_Glucose_LPAREN_c_RPAREN_')
+        self.assertIsNone(species.xml_notes)
+        reaction = reader.get_reaction('R_G6Pase')
+        self.assertIsNone(reaction.xml_notes)
+        self.assertIsNone(reaction.xml_annotation)
+
+    def test_create_and_convert_model_without_notes(self):
+        reader = sbml.SBMLReader(self.doc, read_notes=False)
+        model = reader.create_model()
+        sbml.convert_sbml_model(model)
+
+        # Bounds from kinetic law parameters are still available
+        self.assertEqual(model.limits['Biomass'], ('Biomass', 0, 1000))
+        self.assertEqual(model.biomass_reaction, 'Biomass')
+
+        reaction = model.reactions['G6Pase']
+        self.assertNotIn('genes', reaction.properties)
+        compound = model.compounds['Glucose(c)']
+        self.assertNotIn('kegg', compound.properties)
+
 
 class TestSBMLDatabaseL3V1(unittest.TestCase):
     """Test parsing of a simple level 3 version 1 SBML file"""
@@ -1074,6 +1107,134 @@ class TestSBMLDatabaseL3V1WithFBCV2(unittest.TestCase):
         self.assertEqual(model.biomass_reaction, 'Biomass')
 
 
+class TestSBMLStreamingReader(unittest.TestCase):
+    """Test that streaming reader gives the same result as the tree reader"""
+
+    def _get_doc(self, test_class):
+        test = test_class()
+        test.setUp()
+        return test.doc.getvalue()
+
+    def _assert_same_entries(self, entries1, entries2):
+        entries1 = {entry.id: entry for entry in entries1}
+        entries2 = {entry.id: entry for entry in entries2}
+        self.assertEqual(set(entries1), set(entries2))
+        for entry_id, entry in entries1.items():
+            self.assertEqual(entry.properties, entries2[entry_id].properties)
+
+    def _assert_same_readers(self, doc, **kwargs):
+        reader = sbml.SBMLReader(BytesIO(doc), **kwargs)
+        streaming = sbml.SBMLReader(BytesIO(doc), streaming=True, **kwargs)
+
+        self.assertEqual(reader.id, streaming.id)
+        self.assertEqual(reader.name, streaming.name)
+        self._assert_same_entries(reader.compartments, streaming.compartments)
+        self._assert_same_entries(reader.species, streaming.species)
+        self._assert_same_entries(reader.reactions, streaming.reactions)
+
+        objectives = {entry.id: dict(entry.reactions)
+                      for entry in reader.objectives}
+        streaming_objectives = {entry.id: dict(entry.reactions)
+                                for entry in streaming.objectives}
+        self.assertEqual(objectives, streaming_objectives)
+
+        return reader, streaming
+
+    def test_same_as_tree_reader(self):
+        for test_class in (
+                TestSBMLDatabaseL1V2, TestSBMLDatabaseL2V5,
+                TestSBMLDatabaseL3V1, TestSBMLDatabaseL3V1WithFBCV1,
+                TestSBMLDatabaseL3V1WithFBCV2):
+            doc = self._get_doc(test_class)
+            for ignore_boundary in (False, True):
+                self._assert_same_readers(
+                    doc, ignore_boundary=ignore_boundary)
+
+    def test_flux_bounds_fbc_v1(self):
+        doc = self._get_doc(TestSBMLDatabaseL3V1WithFBCV1)
+        reader = sbml.SBMLReader(BytesIO(doc), streaming=True)
+        reaction = reader.get_reaction('R_G6Pase')
+        self.assertEqual(reaction.properties['lower_flux'], -10)
+        self.assertEqual(reaction.properties['upper_flux'], 1000)
+        self.assertEqual(len(list(reader.flux_bounds)), 4)
+
+    def test_notes_and_annotation_discarded(self):
+        doc = self._get_doc(TestSBMLDatabaseL3V1WithFBCV2)
+        reader = sbml.SBMLReader(BytesIO(doc), streaming=True)
+        reaction = reader.get_reaction('R_G6Pase')
+        self.assertIsNone(reaction.xml_notes)
+        self.assertIsNone(reaction.xml_annotation)
+
+    def test_notes_and_annotation_requested(self):
+        doc = self._get_doc(TestSBMLDatabaseL3V1WithFBCV2)
+        reader = sbml.SBMLReader(
+            BytesIO(doc), streaming=True, read_notes=True,
+            read_annotation=True)
+        species = reader.get_species('M_Glucose_LPAREN_c_RPAREN_')
+        self.assertIsNotNone(species.xml_notes)
+        reaction = reader.get_reaction('R_G6Pase')
+        self.assertIsNotNone(reaction.xml_notes)
+        self.assertIsNotNone(reaction.xml_annotation)
+
+    def test_create_and_convert_model(self):
+        doc = self._get_doc(TestSBMLDatabaseL3V1WithFBCV2)
+        model = sbml.SBMLReader(BytesIO(doc)).create_model()
+        sbml.convert_sbml_model(model)
+        streaming_model = sbml.SBMLReader(
+            BytesIO(doc), streaming=True, read_notes=True).create_model()
+        sbml.convert_sbml_model(streaming_model)
+
+        self._assert_same_entries(model.compounds, streaming_model.compounds)
+        self._assert_same_entries(model.reactions, streaming_model.reactions)
+        self.assertEqual(dict(model.limits), dict(streaming_model.limits))
+        self.assertEqual(set(model.model), set(streaming_model.model))
+        self.assertEqual(model.biomass_reaction,
+                         streaming_model.biomass_reaction)
+
+    def test_reactions_before_species(self):
+        doc = '''<?xml version="1.0" encoding="UTF-8"?>
+<sbml xmlns="http://www.sbml.org/sbml/level3/version1/core"
+      xmlns:fbc="http://www.sbml.org/sbml/level3/version1/fbc/version2"
+      level="3" version="1" fbc:required="false">
+ <model id="test_model" fbc:strict="true">
+  <listOfCompartments>
+   <compartment id="C_c" constant="true"/>
+  </listOfCompartments>
+  <listOfReactions>
+   <reaction id="R_A" reversible="false" fast="false"
+             fbc:lowerFluxBound="P_lower" fbc:upperFluxBound="P_upper">
+    <listOfProducts>
+     <speciesReference species="M_A" stoichiometry="1" constant="true"/>
+    </listOfProducts>
+   </reaction>
+  </listOfReactions>
+  <listOfParameters>
+   <parameter id="P_lower" value="0" constant="true"/>
+   <parameter id="P_upper" value="10" constant="true"/>
+  </listOfParameters>
+  <listOfSpecies>
+   <species id="M_A" compartment="C_c" hasOnlySubstanceUnits="false"
+            boundaryCondition="false" constant="false"/>
+  </listOfSpecies>
+ </model>
+</sbml>'''.encode('utf-8')
+
+        reader = sbml.SBMLReader(BytesIO(doc))
+        reaction = reader.get_reaction('R_A')
+        self.assertEqual(reaction.properties['upper_flux'], 10)
+        self.assertEqual(
+            reaction.equation, Reaction(
+                Direction.Forward, [], [(Compound('M_A', 'C_c'), 1)]))
+
+        # Species references must not be silently dropped either
+        doc_without_bounds = doc.replace(
+            b' fbc:lowerFluxBound="P_lower" fbc:upperFluxBound="P_upper"', b'')
+        for d in (doc, doc_without_bounds):
+            for strict in (False, True):
+                with self.assertRaises(sbml.ParseError):
+                    sbml.SBMLReader(BytesIO(d), strict=strict, streaming=True)
+
+
 class TestModelExtracellularCompartment(unittest.TestCase):
     def setUp(self):
         self.model = native.NativeModel()
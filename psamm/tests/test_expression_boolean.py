@@ -19,7 +19,8 @@
 import unittest
 
 from psamm.expression.boolean import (Expression, And, Or, Variable,
-                                      ParseError, SubstitutionError)
+                                      ParseError, SubstitutionError,
+                                      CompiledExpressions)
 
 
 class TestVariable(unittest.TestCase):
@@ -330,5 +331,48 @@ class TestParseError(unittest.TestCase):
         self.assertEqual(e.indicator, '    ^')
 
 
+class TestCompiledExpressions(unittest.TestCase):
+    def setUp(self):
+        self.expressions = {
+            'r1': Expression('a'),
+            'r2': Expression('a and (b or c)'),
+            'r3': Expression('(b or c) and d'),
+            'r4': Expression('b or (c and d) or e'),
+            'r5': Expression(True),
+            'r6': Expression(False),
+        }
+        self.compiled = CompiledExpressions(self.expressions)
+
+    def test_keys_and_variables(self):
+        self.assertEqual(
+            set(self.compiled.keys), {'r1', 'r2', 'r3', 'r4', 'r5', 'r6'})
+        self.assertEqual(self.compiled.variables, {'a', 'b', 'c', 'd', 'e'})
+
+    def test_false_expressions(self):
+        result = self.compiled.false_expressions(
+            [set(), {'a'}, {'b', 'c'}, {'b', 'd', 'e'}, {'x'}])
+        self.assertEqual(result, [
+            {'r6'}, {'r1', 'r2', 'r6'}, {'r2', 'r3', 'r6'},
+            {'r3', 'r4', 'r6'}, {'r6'}])
+
+    def test_false_expressions_empty_batch(self):
+        self.assertEqual(self.compiled.false_expressions([]), [])
+
+    def test_false_expressions_matches_substitute(self):
+        symbols = sorted(self.compiled.variables)
+        assignments = [
+            {s for j, s in enumerate(symbols) if i & (1 << j)}
+            for i in range(1 << len(symbols))]
+        result = self.compiled.false_expressions(assignments)
+        for false_symbols, false_keys in zip(assignments, result):
+            expected = set()
+            for key, e in self.expressions.items():
+                value = e.substitute(
+                    lambda v: v.symbol not in false_symbols).value
+                if not value:
+                    expected.add(key)
+            self.assertEqual(false_keys, expected)
+
+
 if __name__ == '__main__':
     unittest.main()
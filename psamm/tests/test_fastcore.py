@@ -134,6 +134,19 @@ class TestFastcoreSimpleVlassisModel(unittest.TestCase):
             set(fastcore.fastcc(self.model, 0.001, solver=self.solver)),
             {'rxn_2'})
 
+    def test_fastcc_inconsistent_not_structurally_blocked(self):
+        # rxn_7 is only blocked because E can only be consumed by a loop
+        self.database.set_reaction('rxn_7', parse_reaction('|A| => |E|'))
+        self.database.set_reaction('rxn_8', parse_reaction('|E| <=> |F|'))
+        self.database.set_reaction('rxn_9', parse_reaction('|F| => |E|'))
+        for reaction_id in ('rxn_7', 'rxn_8', 'rxn_9'):
+            self.model.add_reaction(reaction_id)
+
+        self.assertEqual(
+            set(fastcore.fastcc(self.model, 0.001, solver=self.solver)),
+            {'rxn_2', 'rxn_7'})
+        self.assertTrue(self.model.has_reaction('rxn_2'))
+
     def test_fastcc_is_consistent_on_inconsistent(self):
         self.assertFalse(fastcore.fastcc_is_consistent(
             self.model, 0.001, solver=self.solver))
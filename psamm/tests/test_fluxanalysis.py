@@ -71,6 +71,34 @@ class TestFluxBalance(unittest.TestCase):
         self.assertAlmostEqual(fluxes['rxn_2'], 0)
         self.assertAlmostEqual(fluxes['rxn_6'], 1000)
 
+    def test_flux_balance_object_knockout(self):
+        p = fluxanalysis.FluxBalanceProblem(self.model, self.solver)
+        with p.knockout(['rxn_3']):
+            p.maximize('rxn_6')
+            self.assertAlmostEqual(p.get_flux('rxn_3'), 0)
+            self.assertAlmostEqual(p.get_flux('rxn_6'), 1000)
+            self.assertAlmostEqual(p.get_flux('rxn_1'), 500)
+
+            with p.knockout(['rxn_5']):
+                p.maximize('rxn_6')
+                self.assertAlmostEqual(p.get_flux('rxn_6'), 0)
+
+        # Solution is still available after the bounds were restored
+        self.assertAlmostEqual(p.get_flux('rxn_6'), 0)
+
+        p.maximize('rxn_3')
+        self.assertAlmostEqual(p.get_flux('rxn_3'), 1000)
+        self.assertAlmostEqual(p.get_flux('rxn_6'), 1000)
+
+    def test_flux_balance_object_flux_bounds(self):
+        p = fluxanalysis.FluxBalanceProblem(self.model, self.solver)
+        group = p.flux_bounds({'rxn_6': (0, 100)})
+        p.maximize('rxn_1')
+        self.assertAlmostEqual(p.get_flux('rxn_1'), 50)
+        group.delete()
+        p.maximize('rxn_1')
+        self.assertAlmostEqual(p.get_flux('rxn_1'), 500)
+
     def test_flux_balance_object_maximize(self):
         p = fluxanalysis.FluxBalanceProblem(self.model, self.solver)
         p.maximize('rxn_6')
@@ -78,6 +106,37 @@ class TestFluxBalance(unittest.TestCase):
         self.assertAlmostEqual(p.get_flux('rxn_2'), 0)
         self.assertAlmostEqual(p.get_flux('rxn_6'), 1000)
 
+    def test_flux_balance_object_get_fluxes(self):
+        p = fluxanalysis.FluxBalanceProblem(self.model, self.solver)
+        p.maximize('rxn_6')
+        fluxes = p.get_fluxes()
+        self.assertEqual(set(fluxes), set(self.model.reactions))
+        self.assertEqual(len(fluxes), 6)
+        for reaction in self.model.reactions:
+            self.assertAlmostEqual(fluxes[reaction], p.get_flux(reaction))
+
+        array = fluxes.array
+        self.assertEqual(array.shape, (6,))
+        for reaction, index in fluxes.index.items():
+            self.assertEqual(fluxes.reactions[index], reaction)
+            self.assertAlmostEqual(array[index], fluxes[reaction])
+
+    def test_flux_balance_object_get_fluxes_subset(self):
+        p = fluxanalysis.FluxBalanceProblem(self.model, self.solver)
+        p.maximize('rxn_6')
+        fluxes = p.get_fluxes(['rxn_6', 'rxn_1'])
+        self.assertEqual(fluxes.reactions, ('rxn_6', 'rxn_1'))
+        self.assertAlmostEqual(fluxes.tolist()[0], 1000)
+        self.assertAlmostEqual(fluxes['rxn_1'], 500)
+        with self.assertRaises(KeyError):
+            fluxes['rxn_2']
+
+    def test_flux_balance_object_get_fluxes_unknown(self):
+        p = fluxanalysis.FluxBalanceProblem(self.model, self.solver)
+        p.maximize('rxn_6')
+        with self.assertRaises(ValueError):
+            p.get_fluxes(['rxn_6', 'rxn_7'])
+
     def test_flux_balance_object_minimize_l1(self):
         p = fluxanalysis.FluxBalanceProblem(self.model, self.solver)
         p.prob.add_linear_constraints(p.get_flux_var('rxn_6') == 1000)
@@ -157,6 +216,93 @@ class TestFluxBalance(unittest.TestCase):
             self.fail('FluxBalanceError was not raised!')
 
 
+class TestObjectiveBreakpoints(unittest.TestCase):
+    def setUp(self):
+        self.database = DictDatabase()
+        self.database.set_reaction('rxn_A', parse_reaction('=> |A|'))
+        self.database.set_reaction('rxn_O', parse_reaction('=> |O|'))
+        self.database.set_reaction('rxn_1', parse_reaction('|A| => (2) |X|'))
+        self.database.set_reaction(
+            'rxn_2', parse_reaction('|A| + (2) |O| => (6) |X|'))
+        self.database.set_reaction(
+            'rxn_3', parse_reaction('|A| + (7) |O| => (8) |X|'))
+        self.database.set_reaction('rxn_4', parse_reaction('|O| =>'))
+        self.database.set_reaction('bio', parse_reaction('|X| =>'))
+        self.model = MetabolicModel.load_model(
+            self.database, self.database.reactions)
+        self.model.limits['rxn_A'].upper = 10
+        self.model.limits['rxn_O'].upper = 100
+        self.model.limits['rxn_2'].upper = 6
+
+        try:
+            self.solver = generic.Solver()
+        except generic.RequirementsError:
+            self.skipTest('Unable to find an LP solver for tests')
+
+    def test_objective_breakpoints(self):
+        p = fluxanalysis.FluxBalanceProblem(self.model, self.solver)
+        breakpoints, solves = fluxanalysis.objective_breakpoints(
+            p, 'bio', 'rxn_O', 0, 100)
+
+        # Oxygen is first used by rxn_2 (2 X per O), then by rxn_3 that
+        # replaces rxn_1 (6/7 X per O) and rxn_2 (2/5 X per O), and finally
+        # in excess.
+        expected = [(0, 20), (12, 44), (40, 68), (70, 80), (100, 80)]
+        self.assertEqual(len(breakpoints), len(expected))
+        for (flux, value), (expected_flux, expected_value) in zip(
+                breakpoints, expected):
+            self.assertAlmostEqual(flux, expected_flux)
+            self.assertAlmostEqual(value, expected_value)
+        self.assertLess(solves, 20)
+
+        # Flux bounds of the problem are restored
+        p.maximize('bio')
+        self.assertAlmostEqual(p.get_flux('bio'), 80)
+
+    def test_objective_breakpoints_single_point(self):
+        p = fluxanalysis.FluxBalanceProblem(self.model, self.solver)
+        breakpoints, solves = fluxanalysis.objective_breakpoints(
+            p, 'bio', 'rxn_O', 5, 5)
+        self.assertEqual(len(breakpoints), 1)
+        self.assertAlmostEqual(breakpoints[0][1], 30)
+        self.assertEqual(solves, 1)
+
+    def test_objective_breakpoints_invalid_range(self):
+        p = fluxanalysis.FluxBalanceProblem(self.model, self.solver)
+        with self.assertRaises(ValueError):
+            fluxanalysis.objective_breakpoints(p, 'bio', 'rxn_O', 0, 200)
+
+    def test_objective_breakpoints_range_ends_near_bounds(self):
+        p = fluxanalysis.FluxBalanceProblem(self.model, self.solver)
+        breakpoints, _ = fluxanalysis.objective_breakpoints(
+            p, 'bio', 'rxn_O', -1e-10, 100 + 1e-7)
+        self.assertEqual(breakpoints[0][0], 0)
+        self.assertEqual(breakpoints[-1][0], 100)
+        self.assertAlmostEqual(breakpoints[-1][1], 80)
+
+
+class TestFluxBalanceProblemBounds(unittest.TestCase):
+    def setUp(self):
+        self.database = DictDatabase()
+        self.database.set_reaction('rxn_1', parse_reaction('=> |A|'))
+        self.database.set_reaction('rxn_2', parse_reaction('|A| =>'))
+        self.model = MetabolicModel.load_model(
+            self.database, self.database.reactions)
+        self.model.limits['rxn_1'].upper = 10
+
+        try:
+            self.solver = generic.Solver()
+        except generic.RequirementsError:
+            self.skipTest('Unable to find an LP solver for tests')
+
+    def test_get_flux_bounds(self):
+        p = fluxanalysis.FluxBalanceProblem(self.model, self.solver)
+        self.assertEqual(p.get_flux_bounds('rxn_1'), (0, 10))
+        with p.flux_bounds({'rxn_1': (2, 5)}):
+            self.assertEqual(p.get_flux_bounds('rxn_1'), (2, 5))
+        self.assertEqual(p.get_flux_bounds('rxn_1'), (0, 10))
+
+
 class TestFluxBalanceThermodynamic(unittest.TestCase):
     def setUp(self):
         self.database = DictDatabase()
@@ -254,6 +400,83 @@ class TestFluxVariability(unittest.TestCase):
         self.assertAlmostEqual(fluxes['rxn_8'][0], 0)
         self.assertEqual(fluxes['rxn_8'][1], float('inf'))
 
+    def test_flux_variability_matches_flux_bound(self):
+        fluxes = dict(fluxanalysis.flux_variability(
+            self.model, self.model.reactions, {'rxn_6': 200},
+            tfba=False, solver=self.solver))
+
+        p = fluxanalysis.FluxBalanceProblem(self.model, self.solver)
+        p.prob.add_linear_constraints(p.get_flux_var('rxn_6') >= 200)
+        for reaction_id in self.model.reactions:
+            lower, upper = fluxes[reaction_id]
+            self.assertAlmostEqual(lower, p.flux_bound(reaction_id, -1))
+            self.assertAlmostEqual(upper, p.flux_bound(reaction_id, 1))
+
+    def test_flux_variability_order(self):
+        order = fluxanalysis.flux_variability_order(
+            self.model, ['rxn_1', 'rxn_7', 'rxn_2', 'rxn_6'])
+        self.assertEqual(set(order), {'rxn_1', 'rxn_2', 'rxn_6', 'rxn_7'})
+        self.assertEqual(order[0], 'rxn_1')
+        self.assertEqual(order[1], 'rxn_2')
+        self.assertEqual(order[-1], 'rxn_7')
+
+    def test_flux_variability_coordinator(self):
+        p = fluxanalysis.FluxBalanceProblem(self.model, self.solver)
+        p.prob.add_linear_constraints(p.get_flux_var('rxn_6') >= 200)
+
+        coordinator = fluxanalysis.FluxVariabilityCoordinator(
+            self.model, self.model.reactions)
+        solved = []
+
+        def solve_tasks(tasks):
+            for reaction_id, direction in tasks:
+                solved.append((reaction_id, direction))
+                bound = p.flux_bound(reaction_id, direction)
+                fluxes = [p.get_flux(r) for r in coordinator.reactions]
+                yield (reaction_id, direction), (bound, fluxes)
+
+        results = dict(coordinator.results(solve_tasks(coordinator.tasks())))
+        self.assertEqual(len(results), 16)
+        self.assertLess(len(solved), 16)
+        for (reaction_id, direction), bound in results.items():
+            self.assertAlmostEqual(
+                bound, p.flux_bound(reaction_id, direction))
+
+
+class TestFluxBoundTracker(unittest.TestCase):
+    def setUp(self):
+        self.database = DictDatabase()
+        self.database.set_reaction('rxn_1', parse_reaction('=> |A|'))
+        self.database.set_reaction('rxn_2', parse_reaction('|A| <=> |B|'))
+        self.database.set_reaction('rxn_3', parse_reaction('|B| =>'))
+        self.model = MetabolicModel.load_model(
+            self.database, self.database.reactions)
+        self.model.limits['rxn_3'].upper = float('inf')
+
+    def test_bound_reached(self):
+        tracker = fluxanalysis.FluxBoundTracker(
+            self.model, self.model.reactions)
+        tracker.update([('rxn_1', 1000.0), ('rxn_2', 500), ('rxn_3', 0.0)])
+        self.assertEqual(tracker.get_bound('rxn_1', 1), 1000)
+        self.assertIsNone(tracker.get_bound('rxn_1', -1))
+        self.assertIsNone(tracker.get_bound('rxn_2', 1))
+        self.assertIsNone(tracker.get_bound('rxn_2', -1))
+        self.assertEqual(tracker.get_bound('rxn_3', -1), 0)
+
+    def test_bound_reached_within_tolerance(self):
+        tracker = fluxanalysis.FluxBoundTracker(
+            self.model, self.model.reactions)
+        tracker.update([('rxn_2', -999.9999999999)])
+        self.assertEqual(tracker.get_bound('rxn_2', -1), -1000)
+
+    def test_unreached_reactions(self):
+        tracker = fluxanalysis.FluxBoundTracker(
+            self.model, self.model.reactions)
+        self.assertEqual(set(tracker.unreached_reactions()),
+                         {'rxn_1', 'rxn_2', 'rxn_3'})
+        tracker.update([('rxn_1', 0), ('rxn_1', 1000), ('rxn_3', 0)])
+        self.assertEqual(set(tracker.unreached_reactions()), {'rxn_2'})
+
 
 class TestFluxVariabilityThermodynamic(unittest.TestCase):
     def setUp(self):
@@ -17,6 +17,7 @@
 # Copyright 2015  Jon Lund Steffensen <jon_steffensen@uri.edu>
 
 import unittest
+from fractions import Fraction
 
 from psamm.metabolicmodel import MetabolicModel
 from psamm.database import DictDatabase
@@ -96,6 +97,75 @@ class TestFluxCouplingBurgardModel(unittest.TestCase):
             if r != 'rxn_7':
                 self.assertLess(couplings['rxn_7', r][0], 0.0)
 
+    def test_flux_coupling_coordinator(self):
+        if self.solver.properties['name'] == 'qsoptex':
+            self.skipTest('Flux coupling with QSopt_ex is very slow')
+
+        fcp = fluxcoupling.FluxCouplingProblem(self.model, {}, self.solver)
+        index = {r: i for i, r in enumerate(fcp.reactions)}
+        coordinator = fluxcoupling.FluxCouplingCoordinator(self.model)
+        order = [index[r] for r in coordinator.reactions]
+
+        def iter_results():
+            for task in coordinator.tasks():
+                bounds = fcp.solve(*task)
+                solutions = [[fluxes[i] for i in order]
+                             for fluxes in fcp.solutions]
+                yield task, (bounds, solutions)
+
+        results = dict(coordinator.results(iter_results()))
+        reactions = coordinator.reactions
+        pairs = len(reactions) * (len(reactions) - 1) // 2
+        self.assertLess(len(results), pairs)
+
+        # Every pair that is skipped must be uncoupled or include a merged
+        # reaction, and the solved pairs must match the direct solution.
+        merged = set()
+        for members in coordinator.classes.values():
+            merged.update(r for r, _ in members[1:])
+
+        for i, r1 in enumerate(reactions):
+            for r2 in reactions[i+1:]:
+                if (r1, r2) in results:
+                    lower, upper = results[r1, r2]
+                    expected_lower, expected_upper = fcp.solve(r1, r2)
+                    self.assertEqual(lower is None, expected_lower is None)
+                    self.assertEqual(upper is None, expected_upper is None)
+                elif r1 not in merged and r2 not in merged:
+                    coupling = fluxcoupling.classify_coupling(
+                        fcp.solve(r1, r2))
+                    self.assertIn(coupling, (
+                        fluxcoupling.CouplingClass.Uncoupled,
+                        fluxcoupling.CouplingClass.Inconsistent,
+                        fluxcoupling.CouplingClass.DirectionalReverse))
+
+        self.assertTrue(coordinator.has_flux('rxn_bio'))
+        self.assertFalse(coordinator.has_flux('rxn_9'))
+
+        # rxn_7 is also fully coupled to these reactions but it is not
+        # merged since the ratio is negative.
+        coupled = set()
+        for reaction_id, members in coordinator.classes.items():
+            coupled.add(frozenset(r for r, _ in members))
+        self.assertEqual(coupled, {frozenset(
+            ['rxn_5', 'rxn_6', 'rxn_E', 'rxn_bio'])})
+
+    def test_enzyme_subsets(self):
+        subsets = fluxcoupling.enzyme_subsets(self.model)
+        self.assertIn([
+            ('rxn_5', 1), ('rxn_6', 1), ('rxn_7', Fraction(-3, 5)),
+            ('rxn_E', Fraction(3, 5)), ('rxn_bio', Fraction(2, 5))], subsets)
+
+        # Reactions with zero flux at every steady state are not included
+        reactions = set()
+        for subset in subsets:
+            self.assertEqual(subset[0][1], 1)
+            reactions.update(reaction_id for reaction_id, _ in subset)
+        self.assertEqual(
+            set(self.model.reactions) - reactions,
+            {'rxn_4', 'rxn_9', 'rxn_10'})
+        self.assertEqual(len(subsets), 6)
+
 
 class TestFluxCouplingClass(unittest.TestCase):
     def test_uncoupled(self):
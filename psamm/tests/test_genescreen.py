@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# This file is part of PSAMM.
+#
+# PSAMM is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PSAMM is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PSAMM.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Copyright 2014-2017  Jon Lund Steffensen <jon_steffensen@uri.edu>
+
+import unittest
+
+from psamm.metabolicmodel import MetabolicModel
+from psamm.database import DictDatabase
+from psamm.datasource.reaction import parse_reaction
+from psamm.expression import boolean
+from psamm.lpsolver import generic
+from psamm import genescreen
+
+
+class TestGeneKnockoutMap(unittest.TestCase):
+    def setUp(self):
+        self.knockout_map = genescreen.GeneKnockoutMap({
+            'rxn_1': boolean.Expression('g1'),
+            'rxn_2': boolean.Expression('g2 or g3'),
+            'rxn_3': boolean.Expression('g2 and g4'),
+            'rxn_4': boolean.Expression('g1 or (g3 and g4)'),
+        })
+
+    def test_genes(self):
+        self.assertEqual(
+            self.knockout_map.genes, {'g1', 'g2', 'g3', 'g4'})
+
+    def test_gene_reactions(self):
+        self.assertEqual(
+            self.knockout_map.gene_reactions('g4'), {'rxn_3', 'rxn_4'})
+        self.assertEqual(self.knockout_map.gene_reactions('g5'), set())
+
+    def test_single_deletions(self):
+        self.assertEqual(
+            self.knockout_map.deleted_reactions(['g1']), {'rxn_1'})
+        self.assertEqual(
+            self.knockout_map.deleted_reactions(['g2']), {'rxn_3'})
+        self.assertEqual(self.knockout_map.deleted_reactions(['g3']), set())
+
+    def test_pair_deletions(self):
+        self.assertEqual(
+            self.knockout_map.deleted_reactions(['g2', 'g3']),
+            {'rxn_2', 'rxn_3'})
+        self.assertEqual(
+            self.knockout_map.deleted_reactions(['g1', 'g4']),
+            {'rxn_1', 'rxn_3', 'rxn_4'})
+
+    def test_deleted_reactions_batch(self):
+        self.assertEqual(
+            self.knockout_map.deleted_reactions_batch(
+                [['g1'], ['g2', 'g3'], []]),
+            [{'rxn_1'}, {'rxn_2', 'rxn_3'}, set()])
+
+    def test_iter_gene_knockouts_with_small_batches(self):
+        self.assertEqual(
+            list(genescreen.iter_gene_knockouts(
+                self.knockout_map, pairs=True, batch_size=3)),
+            list(genescreen.iter_gene_knockouts(
+                self.knockout_map, pairs=True)))
+
+    def test_iter_gene_knockouts_with_pairs(self):
+        knockouts = list(genescreen.iter_gene_knockouts(
+            self.knockout_map, pairs=True))
+        self.assertEqual(len(knockouts), 4 + 6)
+        self.assertEqual(knockouts[0], (('g1',), {'rxn_1'}))
+        self.assertEqual(dict(knockouts)[('g3', 'g4')], {'rxn_3'})
+
+    def test_group_gene_knockouts(self):
+        groups = genescreen.group_gene_knockouts(
+            genescreen.iter_gene_knockouts(self.knockout_map, ['g3', 'g4']))
+        self.assertEqual(groups, {
+            frozenset(): [('g3',)],
+            frozenset(['rxn_3']): [('g4',)]})
+
+
+class TestGeneKnockoutProblem(unittest.TestCase):
+    def setUp(self):
+        self.database = DictDatabase()
+        self.database.set_reaction('rxn_1', parse_reaction('=> |A|'))
+        self.database.set_reaction('rxn_2', parse_reaction('|A| => |B|'))
+        self.database.set_reaction('rxn_3', parse_reaction('|A| => |C|'))
+        self.database.set_reaction('rxn_4', parse_reaction('|C| => |B|'))
+        self.database.set_reaction('rxn_5', parse_reaction('|B| =>'))
+        self.model = MetabolicModel.load_model(
+            self.database, self.database.reactions)
+        self.model.limits['rxn_1'].upper = 10
+        self.model.limits['rxn_4'].upper = 4
+
+        try:
+            self.solver = generic.Solver()
+        except generic.RequirementsError:
+            self.skipTest('Unable to find an LP solver for tests')
+
+    def test_fba_knockouts(self):
+        p = genescreen.GeneKnockoutProblem(self.model, self.solver, 'rxn_5')
+        self.assertAlmostEqual(p.solve([]), 10)
+        self.assertAlmostEqual(p.solve(['rxn_2']), 4)
+        self.assertAlmostEqual(p.solve(['rxn_1']), 0)
+        self.assertAlmostEqual(p.solve(['rxn_3']), 10)
+
+    def test_lin_moma_knockouts(self):
+        p = genescreen.GeneKnockoutProblem(
+            self.model, self.solver, 'rxn_5', method='lin_moma')
+        self.assertAlmostEqual(p.solve([]), 10)
+        self.assertAlmostEqual(p.solve(['rxn_3']), 10)
+        self.assertAlmostEqual(p.solve(['rxn_1']), 0)
+
+    def test_invalid_method(self):
+        with self.assertRaises(ValueError):
+            genescreen.GeneKnockoutProblem(
+                self.model, self.solver, 'rxn_5', method='invalid')
+
+
+if __name__ == '__main__':
+    unittest.main()
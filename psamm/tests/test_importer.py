@@ -285,6 +285,11 @@ class TestSBMLImporter(unittest.TestCase):
         importer.help()
         importer.import_model(os.path.join(self.dest, 'model.sbml'))
 
+    def test_create_strict_importer_streaming(self):
+        importer = SBMLStrictImporter(streaming=True)
+        model = importer.import_model(os.path.join(self.dest, 'model.sbml'))
+        self.assertEqual(len(list(model.reactions)), 2)
+
     def test_strict_importer_main(self):
         output_dir = os.path.join(self.dest, 'output')
         os.mkdir(output_dir)
@@ -84,6 +84,207 @@ class TestSolverProblem(unittest.TestCase):
         prob.define('x', lower=-400)
         self.assertTrue(prob.has_variable('x'))
 
+    def test_add_linear_constraints_matrix(self):
+        """Test that constraints can be added from a sparse matrix."""
+        prob = self.solver.create_problem()
+        v = prob.namespace(['x', 'y', 'z'], lower=0, upper=10)
+        matrix = lp.CSRMatrix.from_rows([
+            [(0, 1), (1, -1)],
+            [(1, 1), (2, -2)],
+        ], 3)
+        constraints = prob.add_linear_constraints_matrix(
+            v.set(['x', 'y', 'z']), matrix, lp.RelationSense.Equals)
+        self.assertEqual(len(constraints), 2)
+
+        prob.set_objective(v('x'))
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value(v('x')), 10)
+        self.assertAlmostEqual(result.get_value(v('z')), 5)
+
+    def test_array_expression(self):
+        """Test that array expressions can be used in problems."""
+        prob = self.solver.create_problem()
+        v = prob.namespace(['x', 'y', 'z'], lower=0, upper=10)
+        columns = v.columns(['x', 'y', 'z'])
+        prob.add_linear_constraints(
+            lp.ArrayExpression(columns, [0, 1], [1, -1]) == 0,
+            lp.ArrayExpression(columns, [1, 2], [1, -2], 1) <= 0)
+
+        prob.set_objective(lp.ArrayExpression(columns, [0, 2], [1, 1]))
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value(v('x')), 10)
+        self.assertAlmostEqual(result.get_value(v('z')), 10)
+        self.assertAlmostEqual(
+            result.get_value(lp.ArrayExpression(columns, [1], [2], 1)), 21)
+
+    def test_add_linear_constraints_matrix_with_rhs(self):
+        """Test that matrix constraints can have a right-hand side."""
+        prob = self.solver.create_problem()
+        prob.define('x', 'y', lower=0, upper=10)
+        matrix = lp.CSRMatrix.from_rows([[(0, 1)], [(0, 1), (1, 1)]], 2)
+        prob.add_linear_constraints_matrix(
+            ['x', 'y'], matrix, lp.RelationSense.Less, [4, 6])
+
+        prob.set_objective(prob.var('y'))
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value(prob.var('y')), 6)
+
+        prob.set_objective(prob.var('x'))
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value(prob.var('x')), 4)
+
+    def test_add_linear_constraints_matrix_delete(self):
+        """Test that constraints from a matrix can be deleted."""
+        prob = self.solver.create_problem()
+        prob.define('x', lower=0, upper=10)
+        matrix = lp.CSRMatrix.from_rows([[(0, 1)]], 1)
+        constraint, = prob.add_linear_constraints_matrix(
+            ['x'], matrix, lp.RelationSense.Less, 2)
+        prob.set_objective(prob.var('x'))
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value(prob.var('x')), 2)
+
+        constraint.delete()
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value(prob.var('x')), 10)
+
+    def test_add_linear_constraints_matrix_empty_row(self):
+        """Test that an empty row is accepted if it is always satisfied."""
+        prob = self.solver.create_problem()
+        prob.define('x', lower=0, upper=10)
+        matrix = lp.CSRMatrix.from_rows([[], [(0, 1)]], 1)
+        constraints = prob.add_linear_constraints_matrix(
+            ['x'], matrix, lp.RelationSense.Greater, [-1, 3])
+        self.assertEqual(len(constraints), 2)
+
+        prob.set_objective(prob.var('x'))
+        result = prob.solve(lp.ObjectiveSense.Minimize)
+        self.assertAlmostEqual(result.get_value(prob.var('x')), 3)
+
+    def test_add_linear_constraints_matrix_unsatisfiable_row(self):
+        """Test that an unsatisfiable empty row fails."""
+        prob = self.solver.create_problem()
+        prob.define('x', lower=0, upper=10)
+        matrix = lp.CSRMatrix.from_rows([[]], 1)
+        with self.assertRaises(ValueError):
+            prob.add_linear_constraints_matrix(
+                ['x'], matrix, lp.RelationSense.Equals, 1)
+
+    def test_add_linear_constraints_matrix_invalid_columns(self):
+        """Test that the number of variables must match the columns."""
+        prob = self.solver.create_problem()
+        prob.define('x', 'y')
+        matrix = lp.CSRMatrix.from_rows([[(0, 1)]], 1)
+        with self.assertRaises(ValueError):
+            prob.add_linear_constraints_matrix(
+                ['x', 'y'], matrix, lp.RelationSense.Equals)
+
+    def test_get_variable_bounds(self):
+        prob = self.solver.create_problem()
+        prob.define('x', lower=-4, upper=10)
+        prob.define('y', lower=0)
+        self.assertEqual(
+            prob.get_variable_bounds(['x', 'y']),
+            [(-4, 10), (0, float('inf'))])
+
+    def test_set_variable_bounds(self):
+        prob = self.solver.create_problem()
+        prob.define('x', 'y', lower=0, upper=10)
+        prob.add_linear_constraints(prob.var('x') + prob.var('y') <= 15)
+        prob.set_objective(prob.var('x') + 2 * prob.var('y'))
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value('y'), 10)
+
+        prob.set_variable_bounds(['y'], lower=0, upper=2)
+        self.assertEqual(prob.get_variable_bounds(['y']), [(0, 2)])
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value('x'), 10)
+        self.assertAlmostEqual(result.get_value('y'), 2)
+
+        prob.set_variable_bounds(['x', 'y'], lower=[0, 0], upper=[10, 10])
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value('x'), 5)
+        self.assertAlmostEqual(result.get_value('y'), 10)
+
+    def test_set_variable_bounds_fixed(self):
+        prob = self.solver.create_problem()
+        v = prob.namespace(['x', 'y'], lower=0, upper=10)
+        prob.set_objective(v['x'] + v['y'])
+        v.set_bounds(['x'], lower=3, upper=3)
+        self.assertEqual(v.get_bounds(['x', 'y']), [(3, 3), (0, 10)])
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value(v['x']), 3)
+
+    def test_set_variable_bounds_undefined(self):
+        prob = self.solver.create_problem()
+        prob.define('x')
+        with self.assertRaises(ValueError):
+            prob.set_variable_bounds(['y'], lower=0, upper=1)
+        with self.assertRaises(ValueError):
+            prob.get_variable_bounds(['y'])
+
+    def test_result_get_values(self):
+        prob = self.solver.create_problem()
+        v = prob.namespace(['x', 'y', 'z'], lower=0, upper=10)
+        prob.add_linear_constraints(v['x'] + v['y'] <= 4, v['z'] <= 3)
+        prob.set_objective(v['x'] + v['z'])
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+
+        values = result.get_values([(v, 'z'), (v, 'x'), (v, 'y')])
+        self.assertEqual(len(values), 3)
+        self.assertAlmostEqual(values[0], 3)
+        self.assertAlmostEqual(values[1], 4)
+        self.assertAlmostEqual(values[2], 0)
+        self.assertEqual(result.get_values([]), [])
+
+        self.assertAlmostEqual(v.values(['x'])[0], 4)
+
+        with self.assertRaises(ValueError):
+            result.get_values([(v, 'x'), (v, 'w')])
+
+    def test_update_objective(self):
+        prob = self.solver.create_problem()
+        v = prob.namespace(['x', 'y', 'z'], lower=0, upper=10)
+        prob.add_linear_constraints(v.sum(['x', 'y', 'z']) <= 15)
+        prob.set_objective(v['x'] + 2 * v['y'])
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value(v['y']), 10)
+
+        # Remove y from objective and add z
+        prob.update_objective({(v, 'y'): 0, (v, 'z'): 3})
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value(v['z']), 10)
+        self.assertAlmostEqual(result.get_value(v['x']), 5)
+
+        # Objective after set_objective does not depend on previous updates
+        prob.set_objective(v['y'])
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value(v['y']), 10)
+
+    def test_update_objective_undefined(self):
+        prob = self.solver.create_problem()
+        prob.define('x')
+        with self.assertRaises(ValueError):
+            prob.update_objective({'y': 1})
+
+    def test_set_objective_variable(self):
+        prob = self.solver.create_problem()
+        v = prob.namespace(['x', 'y'], lower=-4, upper=10)
+        prob.add_linear_constraints(v['x'] + v['y'] <= 12)
+        prob.set_objective(v['x'] + 3 * v['y'])
+
+        v.set_objective_variable('x')
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value(v['x']), 10)
+
+        v.set_objective_variable('y', -1)
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value(v['y']), -4)
+
+        prob.set_objective_variable((v, 'x'), -1)
+        result = prob.solve(lp.ObjectiveSense.Maximize)
+        self.assertAlmostEqual(result.get_value(v['x']), -4)
+
 
 class TestListSolversCommand(unittest.TestCase):
     def test_list_lpsolvers(self):
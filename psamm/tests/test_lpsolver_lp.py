@@ -91,6 +91,30 @@ class TestRangedProperty(unittest.TestCase):
         self.assertEqual(self.c.property_rw.value, 0)
 
 
+class TestCSRMatrix(unittest.TestCase):
+    def test_create_matrix(self):
+        m = lp.CSRMatrix((2, 3), [0, 2, 3], [0, 2, 1], [1, -1, 4])
+        self.assertEqual(m.shape, (2, 3))
+        self.assertEqual(list(m.row(0)), [(0, 1), (2, -1)])
+        self.assertEqual(list(m.row(1)), [(1, 4)])
+
+    def test_create_matrix_invalid_indptr(self):
+        with self.assertRaises(ValueError):
+            lp.CSRMatrix((3, 3), [0, 2, 3], [0, 2, 1], [1, -1, 4])
+
+    def test_create_matrix_invalid_data(self):
+        with self.assertRaises(ValueError):
+            lp.CSRMatrix((2, 3), [0, 2, 3], [0, 2, 1], [1, -1])
+
+    def test_matrix_from_rows(self):
+        m = lp.CSRMatrix.from_rows([[(1, 2)], [], [(0, 1), (2, 5)]], 3)
+        self.assertEqual(m.shape, (3, 3))
+        self.assertEqual(list(m.indptr), [0, 1, 1, 3])
+        self.assertEqual(list(m.indices), [1, 0, 2])
+        self.assertEqual(list(m.data), [2, 1, 5])
+        self.assertEqual(list(m.row(1)), [])
+
+
 class TestExpression(unittest.TestCase):
     def test_create_expression(self):
         e = lp.Expression()
@@ -308,6 +332,70 @@ class TestExpression(unittest.TestCase):
         self.assertNotIn('x1', e)
 
 
+class TestArrayExpression(unittest.TestCase):
+    def setUp(self):
+        self.columns = ('x1', 'x2', 'x3')
+
+    def test_create_expression(self):
+        e = lp.ArrayExpression(self.columns, [0, 2], [2, -1], 4)
+        self.assertEqual(e.offset, 4)
+        self.assertEqual(dict(e.values()), {'x1': 2, 'x3': -1})
+        self.assertEqual(set(e.variables()), {'x1', 'x3'})
+        self.assertEqual(e.value('x3'), -1)
+        self.assertEqual(e.value('x2'), 0)
+        self.assertIn('x1', e)
+        self.assertNotIn('x2', e)
+
+    def test_create_expression_duplicate_index(self):
+        with self.assertRaises(ValueError):
+            lp.ArrayExpression(self.columns, [0, 0], [1, 2])
+
+    def test_create_expression_invalid_length(self):
+        with self.assertRaises(ValueError):
+            lp.ArrayExpression(self.columns, [0, 1], [1])
+
+    def test_expression_value_sets(self):
+        e = lp.ArrayExpression(self.columns, [1, 2], [3, 4])
+        value_sets = [dict(value_set) for value_set in e.value_sets()]
+        self.assertEqual(value_sets, [{'x2': 3, 'x3': 4}])
+
+    def test_multiply_expression_and_number(self):
+        e = lp.ArrayExpression(self.columns, [0, 1], [1, -2], 1)
+        e1 = 3 * -e
+        self.assertIsInstance(e1, lp.ArrayExpression)
+        self.assertEqual(e1.offset, -3)
+        self.assertEqual(dict(e1.values()), {'x1': -3, 'x2': 6})
+
+        # Original expression is unchanged
+        self.assertEqual(dict(e.values()), {'x1': 1, 'x2': -2})
+
+    def test_add_expression_and_expression(self):
+        e = lp.ArrayExpression(self.columns, [0, 1], [1, -2], 1)
+        e1 = lp.Expression({'x2': 2, 'x3': 5}, 2)
+        for e2 in (e + e1, e1 + e):
+            self.assertEqual(e2.offset, 3)
+            self.assertEqual(dict(e2.values()), {'x1': 1, 'x2': 0, 'x3': 5})
+
+    def test_add_expression_in_place(self):
+        e = lp.ArrayExpression(self.columns, [0], [1])
+        e += lp.ArrayExpression(self.columns, [0, 2], [1, 1], 2)
+        e *= 2
+        self.assertEqual(e.offset, 4)
+        self.assertEqual(dict(e.values()), {'x1': 4, 'x3': 2})
+
+    def test_expression_relation(self):
+        e = lp.ArrayExpression(self.columns, [0, 2], [2, -1])
+        rel = e >= lp.Expression({'x2': 1}, 3)
+        self.assertEqual(rel.sense, lp.RelationSense.Greater)
+        self.assertEqual(rel.expression.offset, -3)
+        self.assertEqual(
+            dict(rel.expression.values()), {'x1': 2, 'x2': -1, 'x3': -1})
+
+    def test_expression_to_string(self):
+        e = lp.ArrayExpression(self.columns, [2, 0], [1, -4], 42)
+        self.assertEqual(str(e), '-4*x1 + x3 + 42')
+
+
 class TestRelation(unittest.TestCase):
     def assertExpressionEqual(self, e1, e2):
         """Assert that expressions are equal."""
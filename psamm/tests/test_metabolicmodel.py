@@ -198,6 +198,52 @@ class TestMetabolicModel(unittest.TestCase):
     def test_limits_len(self):
         self.assertEqual(len(self.model.limits), 6)
 
+    def test_sparse_matrix_is_cached(self):
+        matrix = self.model.sparse_matrix
+        self.assertIs(self.model.sparse_matrix, matrix)
+        self.assertEqual(matrix.shape, (4, 6))
+
+    def test_sparse_matrix_add_reaction(self):
+        matrix = self.model.sparse_matrix
+        index = dict(matrix.reaction_index)
+        self.database.set_reaction('rxn_7', parse_reaction('B[c] => E[c]'))
+        self.model.add_reaction('rxn_7')
+        self.assertIs(self.model.sparse_matrix, matrix)
+        self.assertEqual(matrix.shape, (5, 7))
+        for reaction_id, j in index.items():
+            self.assertEqual(matrix.reaction_index[reaction_id], j)
+
+    def test_sparse_matrix_remove_reaction(self):
+        matrix = self.model.sparse_matrix
+        self.model.remove_reaction('rxn_2')
+        self.assertIsNot(self.model.sparse_matrix, matrix)
+        self.assertEqual(self.model.sparse_matrix.shape, (3, 5))
+        self.assertNotIn('rxn_2', self.model.sparse_matrix.reaction_index)
+
+    def test_limits_arrays(self):
+        lower, upper = self.model.limits_arrays
+        j = self.model.sparse_matrix.reaction_index['rxn_2']
+        self.assertEqual((lower[j], upper[j]), (-1000, 1000))
+
+        self.model.limits['rxn_2'].lower = -10
+        lower, upper = self.model.limits_arrays
+        self.assertEqual((lower[j], upper[j]), (-10, 1000))
+
+        del self.model.limits['rxn_2'].lower
+        lower, upper = self.model.limits_arrays
+        self.assertEqual(lower[j], -1000)
+
+    def test_matrix_array(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('NumPy not available')
+        array = numpy.array(self.model.matrix)
+        self.assertEqual(array.shape, (4, 6))
+        self.assertEqual(array[0, 0], 2)
+        self.assertEqual(array[0, 1], -1)
+        self.assertEqual(array[1, 1], 1)
+
 
 class TestMetabolicModelFlipableView(unittest.TestCase):
     def setUp(self):
@@ -230,6 +276,19 @@ class TestMetabolicModelFlipableView(unittest.TestCase):
         self.assertEqual(self.model.matrix[Compound('C'), 'rxn_5'], 1)
         self.assertEqual(self.model.matrix[Compound('D'), 'rxn_5'], -1)
 
+    def test_flipable_model_view_sparse_matrix_after_flip(self):
+        self.model.flip({'rxn_4'})
+        matrix = self.model.sparse_matrix
+        j = matrix.reaction_index['rxn_4']
+        values = {matrix.compounds[i]: value for i, value in matrix.columns[j]}
+        self.assertEqual(values, {Compound('A'): 1, Compound('C'): -1})
+
+    def test_flipable_model_view_limits_arrays_after_flip(self):
+        self.model.flip({'rxn_1'})
+        lower, upper = self.model.limits_arrays
+        j = self.model.sparse_matrix.reaction_index['rxn_1']
+        self.assertEqual((lower[j], upper[j]), (-1000, 0))
+
     def test_flipable_model_view_limits_get_item_after_flip(self):
         self.model.flip({ 'rxn_1', 'rxn_2' })
         self.assertEqual(self.model.limits['rxn_1'].bounds, (-1000, 0))
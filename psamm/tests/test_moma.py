@@ -81,6 +81,46 @@ class TestLinearMOMA(unittest.TestCase):
         self.assertAlmostEqual(p.get_flux('rxn_5'), 1000)
         self.assertAlmostEqual(p.get_flux('rxn_6'), 1000)
 
+    def test_minimal_fba_fluxes(self):
+        fluxes = moma.minimal_fba_fluxes(self.model, 'rxn_6', self.solver)
+        self.assertAlmostEqual(fluxes['rxn_1'], 500)
+        self.assertAlmostEqual(fluxes['rxn_2'], 0)
+        self.assertAlmostEqual(fluxes['rxn_3'], 1000)
+        self.assertAlmostEqual(fluxes['rxn_6'], 1000)
+
+    def test_knockout_linear_moma(self):
+        wt_fluxes = moma.minimal_fba_fluxes(self.model, 'rxn_6', self.solver)
+        p = moma.KnockoutMOMAProblem(
+            self.model, self.solver, wt_fluxes, linear=True)
+        p.solve(['rxn_3'])
+        self.assertAlmostEqual(p.get_flux('rxn_6'), 0)
+        self.assertAlmostEqual(p.get_distance(), 1000)
+
+        # Bounds of the previous knockout are restored
+        p.solve([])
+        self.assertAlmostEqual(p.get_flux('rxn_3'), 1000)
+        self.assertAlmostEqual(p.get_distance(), 0)
+
+    def test_moma_knockouts_linear(self):
+        knockouts = [('rxn_3',), ('rxn_4',), ('rxn_3', 'rxn_4'), ()]
+        result = list(moma.moma_knockouts(
+            self.model, 'rxn_6', knockouts, self.solver, linear=True))
+        self.assertEqual([k for k, _, _ in result], knockouts)
+        distances = [d for _, d, _ in result]
+        fluxes = [f for _, _, f in result]
+        for value, expected in zip(distances, [1000, 0, 1000, 0]):
+            self.assertAlmostEqual(value, expected)
+        for value, expected in zip(fluxes, [0, 1000, 0, 1000]):
+            self.assertAlmostEqual(value, expected)
+
+    def test_moma_knockouts_infeasible(self):
+        self.model.limits['rxn_6'].lower = 10
+        result = list(moma.moma_knockouts(
+            self.model, 'rxn_6', [('rxn_3', 'rxn_4'), ('rxn_4',)],
+            self.solver, linear=True))
+        self.assertEqual(result[0], (('rxn_3', 'rxn_4'), None, None))
+        self.assertAlmostEqual(result[1][2], 1000)
+
 
 class TestQuadraticMOMA(unittest.TestCase):
     def setUp(self):
@@ -123,3 +163,15 @@ class TestQuadraticMOMA(unittest.TestCase):
         self.assertAlmostEqual(p.get_flux('rxn_4'), 1000)
         self.assertAlmostEqual(p.get_flux('rxn_5'), 1000)
         self.assertAlmostEqual(p.get_flux('rxn_6'), 1000)
+
+    def test_knockout_quadratic_moma(self):
+        wt_fluxes = {
+            'rxn_1': 500, 'rxn_2': 0, 'rxn_3': 1000, 'rxn_4': 0, 'rxn_5': 0,
+            'rxn_6': 1000}
+        result = list(moma.moma_knockouts(
+            self.model, 'rxn_6', [('rxn_3',), ()], self.solver,
+            wt_fluxes=wt_fluxes))
+        self.assertAlmostEqual(result[0][1], 1000)
+        self.assertAlmostEqual(result[0][2], 0)
+        self.assertAlmostEqual(result[1][1], 0)
+        self.assertAlmostEqual(result[1][2], 1000)
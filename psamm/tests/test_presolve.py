@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# This file is part of PSAMM.
+#
+# PSAMM is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PSAMM is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PSAMM.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Copyright 2014-2017  Jon Lund Steffensen <jon_steffensen@uri.edu>
+
+import unittest
+from fractions import Fraction
+
+from psamm.metabolicmodel import MetabolicModel
+from psamm.database import DictDatabase
+from psamm import fluxanalysis, presolve
+from psamm.datasource.reaction import parse_reaction
+from psamm.reaction import Compound
+from psamm.lpsolver import generic
+
+
+class TestPresolve(unittest.TestCase):
+    def setUp(self):
+        self.database = DictDatabase()
+        self.database.set_reaction('rxn_1', parse_reaction('=> (2) |A|'))
+        self.database.set_reaction('rxn_2', parse_reaction('|A| <=> |B|'))
+        self.database.set_reaction('rxn_3', parse_reaction('|A| => |D|'))
+        self.database.set_reaction('rxn_4', parse_reaction('|A| => |C|'))
+        self.database.set_reaction('rxn_5', parse_reaction('(2) |C| => |D|'))
+        self.database.set_reaction('rxn_6', parse_reaction('|D| =>'))
+        self.database.set_reaction('rxn_7', parse_reaction('|E| => |D|'))
+        self.database.set_reaction('rxn_8', parse_reaction('|A| => |F|'))
+        self.model = MetabolicModel.load_model(
+            self.database, self.database.reactions)
+        self.model.limits['rxn_8'].bounds = 0, 0
+
+    def test_presolve_removed(self):
+        presolved = presolve.presolve(self.model)
+        self.assertEqual(presolved.removed, {'rxn_2', 'rxn_7', 'rxn_8'})
+        self.assertEqual(
+            set(presolved.model.reactions),
+            {'rxn_1', 'rxn_3', 'rxn_4', 'rxn_6'})
+
+    def test_presolve_lumped(self):
+        presolved = presolve.presolve(self.model)
+        self.assertEqual(presolved.reaction_ratio('rxn_5'), ('rxn_4', 0.5))
+        self.assertEqual(presolved.reaction_ratio('rxn_2'), None)
+
+        self.assertEqual(presolved.lumped, {
+            'rxn_4': [('rxn_4', 1), ('rxn_5', 0.5)]})
+
+        reaction = presolved.model.get_reaction('rxn_4')
+        self.assertEqual(dict(reaction.compounds), {
+            Compound('A'): -1, Compound('D'): 0.5})
+
+    def test_presolve_does_not_modify_model(self):
+        presolve.presolve(self.model)
+        self.assertEqual(len(set(self.model.reactions)), 8)
+        self.assertEqual(self.model.limits['rxn_6'].bounds, (0, 1000))
+
+    def test_presolve_keep(self):
+        presolved = presolve.presolve(self.model, keep=['rxn_6', 'rxn_2'])
+        self.assertEqual(presolved.reaction_ratio('rxn_6'), ('rxn_6', 1))
+        self.assertTrue(presolved.model.has_reaction('rxn_2'))
+        self.assertEqual(presolved.model.limits['rxn_2'].bounds, (0, 0))
+
+    def test_presolve_without_lumping(self):
+        presolved = presolve.presolve(self.model, lump=False)
+        self.assertEqual(presolved.lumped, {})
+        self.assertEqual(
+            set(presolved.model.reactions),
+            {'rxn_1', 'rxn_3', 'rxn_4', 'rxn_5', 'rxn_6'})
+
+    def test_presolve_unknown_keep(self):
+        with self.assertRaises(ValueError):
+            presolve.presolve(self.model, keep=['rxn_9'])
+
+    def test_presolve_infeasible(self):
+        self.model.limits['rxn_6'].lower = 10
+        self.model.limits['rxn_3'].upper = 0
+        self.model.limits['rxn_4'].upper = 0
+        with self.assertRaises(presolve.PresolveError):
+            presolve.presolve(self.model)
+
+    def test_expand_flux_bounds(self):
+        presolved = presolve.presolve(self.model)
+        bounds = dict(presolved.expand_flux_bounds({
+            'rxn_1': (0, 4), 'rxn_3': (0, 1), 'rxn_4': (0, 2),
+            'rxn_6': (0, 3)}))
+        self.assertEqual(bounds['rxn_2'], (0, 0))
+        self.assertEqual(bounds['rxn_5'], (0, 1))
+
+    def test_reduced_weights(self):
+        presolved = presolve.presolve(self.model)
+        weights = presolved.reduced_weights({'rxn_4': 2})
+        self.assertEqual(weights['rxn_4'], 2.5)
+        self.assertEqual(weights['rxn_3'], 1)
+
+
+class TestBlockedReactions(unittest.TestCase):
+    def setUp(self):
+        self.database = DictDatabase()
+        self.database.set_reaction('rxn_1', parse_reaction('=> |A|'))
+        self.database.set_reaction('rxn_2', parse_reaction('|A| <=> |B|'))
+        self.database.set_reaction('rxn_3', parse_reaction('|B| => |C|'))
+        self.database.set_reaction('rxn_4', parse_reaction('|C| =>'))
+        self.database.set_reaction('rxn_5', parse_reaction('|A| => |D|'))
+        self.database.set_reaction('rxn_6', parse_reaction('|D| <=> |E|'))
+        self.database.set_reaction('rxn_7', parse_reaction('|E| <=> |F|'))
+        self.database.set_reaction('rxn_8', parse_reaction('|F| => |D|'))
+        self.database.set_reaction('rxn_9', parse_reaction('|G| <=> |B|'))
+        self.model = MetabolicModel.load_model(
+            self.database, self.database.reactions)
+
+    def test_blocked_reactions(self):
+        # rxn_5 can only carry flux into the loop of rxn_6, rxn_7 and rxn_8
+        # so it is blocked but not for structural reasons.
+        blocked = presolve.blocked_reactions(self.model)
+        self.assertEqual(blocked, {'rxn_9'})
+
+    def test_blocked_reactions_propagate(self):
+        self.model.limits['rxn_4'].upper = 0
+        blocked = presolve.blocked_reactions(self.model)
+        self.assertEqual(blocked, {'rxn_2', 'rxn_3', 'rxn_4', 'rxn_9'})
+
+    def test_blocked_reactions_direction(self):
+        self.model.limits['rxn_3'].bounds = -10, 0
+        blocked = presolve.blocked_reactions(self.model)
+        self.assertEqual(blocked, {'rxn_2', 'rxn_3', 'rxn_4', 'rxn_9'})
+
+    def test_remove_blocked_reactions(self):
+        blocked, model = presolve.remove_blocked_reactions(self.model)
+        self.assertEqual(blocked, {'rxn_9'})
+        self.assertEqual(set(model.reactions), {
+            'rxn_1', 'rxn_2', 'rxn_3', 'rxn_4', 'rxn_5', 'rxn_6', 'rxn_7',
+            'rxn_8'})
+        self.assertTrue(self.model.has_reaction('rxn_9'))
+
+    def test_remove_blocked_reactions_infeasible(self):
+        self.model.limits['rxn_9'].lower = 5
+        blocked, model = presolve.remove_blocked_reactions(self.model)
+        self.assertIn('rxn_9', blocked)
+        self.assertIs(model, self.model)
+
+
+class TestPresolveNullspace(unittest.TestCase):
+    def setUp(self):
+        self.database = DictDatabase()
+        self.database.set_reaction('rxn_1', parse_reaction('=> |A|'))
+        self.database.set_reaction('rxn_2', parse_reaction('|A| => |B|'))
+        self.database.set_reaction('rxn_3', parse_reaction('|A| => |B|'))
+        self.database.set_reaction('rxn_4', parse_reaction('(2) |B| =>'))
+        self.database.set_reaction('rxn_5', parse_reaction('|X| => (2) |Y|'))
+        self.database.set_reaction('rxn_6', parse_reaction('|Y| <=> |X|'))
+        self.model = MetabolicModel.load_model(
+            self.database, self.database.reactions)
+
+    def test_presolve_without_nullspace(self):
+        presolved = presolve.presolve(self.model, lump=False)
+        self.assertEqual(presolved.removed, set())
+        self.assertEqual(presolved.lumped, {})
+
+        # No compound is only present in rxn_1 and rxn_4
+        presolved = presolve.presolve(self.model)
+        self.assertEqual(presolved.reaction_ratio('rxn_4'), ('rxn_4', 1))
+
+    def test_presolve_nullspace(self):
+        presolved = presolve.presolve(self.model, nullspace=True)
+        self.assertEqual(presolved.removed, {'rxn_5', 'rxn_6'})
+        self.assertEqual(presolved.lumped, {
+            'rxn_1': [('rxn_1', 1), ('rxn_4', Fraction(1, 2))]})
+
+        reaction = presolved.model.get_reaction('rxn_1')
+        self.assertEqual(dict(reaction.compounds), {
+            Compound('A'): 1, Compound('B'): -1})
+
+    def test_presolve_nullspace_keep(self):
+        presolved = presolve.presolve(
+            self.model, keep=['rxn_4'], nullspace=True)
+        self.assertEqual(presolved.reaction_ratio('rxn_1'), ('rxn_4', 2))
+        self.assertEqual(
+            set(presolved.model.reactions), {'rxn_2', 'rxn_3', 'rxn_4'})
+
+
+class TestPresolveFluxBalance(unittest.TestCase):
+    def setUp(self):
+        self.database = DictDatabase()
+        self.database.set_reaction('rxn_1', parse_reaction('=> (2) |A|'))
+        self.database.set_reaction('rxn_2', parse_reaction('|A| <=> |B|'))
+        self.database.set_reaction('rxn_3', parse_reaction('|A| => |D|'))
+        self.database.set_reaction('rxn_4', parse_reaction('|A| => |C|'))
+        self.database.set_reaction('rxn_5', parse_reaction('(2) |C| => |D|'))
+        self.database.set_reaction('rxn_6', parse_reaction('|D| =>'))
+        self.database.set_reaction('rxn_7', parse_reaction('|E| => |D|'))
+        self.model = MetabolicModel.load_model(
+            self.database, self.database.reactions)
+        self.model.limits['rxn_3'].upper = 100
+
+        try:
+            self.solver = generic.Solver()
+        except generic.RequirementsError:
+            self.skipTest('Unable to find an LP solver for tests')
+
+    def test_flux_balance_expanded(self):
+        presolved = presolve.presolve(self.model, keep=['rxn_6'])
+        p = fluxanalysis.FluxBalanceProblem(presolved.model, self.solver)
+        p.maximize('rxn_6')
+        fluxes = dict(presolved.expand_fluxes(p.get_fluxes()))
+        self.assertEqual(set(fluxes), set(self.model.reactions))
+
+        expected = dict(fluxanalysis.flux_balance(
+            self.model, 'rxn_6', tfba=False, solver=self.solver))
+        self.assertAlmostEqual(fluxes['rxn_6'], expected['rxn_6'])
+
+        # Expanded fluxes must be at steady state
+        balance = {}
+        for reaction_id, flux in fluxes.items():
+            for compound, value in self.model.get_reaction_values(
+                    reaction_id):
+                balance[compound] = balance.get(compound, 0) + value * flux
+        for compound in (Compound('A'), Compound('C'), Compound('D')):
+            self.assertAlmostEqual(balance[compound], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# This file is part of PSAMM.
+#
+# PSAMM is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PSAMM is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PSAMM.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Copyright 2014-2017  Jon Lund Steffensen <jon_steffensen@uri.edu>
+
+import pickle
+import unittest
+
+from psamm.metabolicmodel import MetabolicModel
+from psamm.database import DictDatabase
+from psamm.snapshot import ModelSnapshot
+from psamm import fluxanalysis
+from psamm.datasource.reaction import parse_reaction
+from psamm.reaction import Compound
+from psamm.lpsolver import generic
+
+
+class TestModelSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.database = DictDatabase()
+        self.database.set_reaction('rxn_1', parse_reaction('=> (2) |A|'))
+        self.database.set_reaction('rxn_2', parse_reaction('|A| <=> |B|'))
+        self.database.set_reaction('rxn_3', parse_reaction('|A| => |D|'))
+        self.database.set_reaction('rxn_4', parse_reaction('|A| => |C|'))
+        self.database.set_reaction('rxn_5', parse_reaction('|C| => |D|'))
+        self.database.set_reaction('rxn_6', parse_reaction('|D| =>'))
+        self.model = MetabolicModel.load_model(
+            self.database, self.database.reactions)
+        self.model.limits['rxn_5'].upper = 100
+
+    def test_load_snapshot(self):
+        model = ModelSnapshot.from_model(self.model).load()
+        self.assertEqual(set(model.reactions), set(self.model.reactions))
+        self.assertEqual(set(model.compounds), set(self.model.compounds))
+        self.assertTrue(model.is_reversible('rxn_2'))
+        self.assertFalse(model.is_reversible('rxn_3'))
+        self.assertTrue(model.is_exchange('rxn_1'))
+        self.assertEqual(
+            dict(model.get_reaction_values('rxn_1')), {Compound('A'): 2})
+        self.assertEqual(
+            set(model.get_compound_reactions(Compound('D'))),
+            {'rxn_3', 'rxn_5', 'rxn_6'})
+        self.assertEqual(tuple(model.limits['rxn_2']), (-1000, 1000))
+        self.assertEqual(tuple(model.limits['rxn_5']), (0, 100))
+        self.assertEqual(dict(model.matrix), dict(self.model.matrix))
+
+    def test_snapshot_pickle(self):
+        snapshot = ModelSnapshot.from_model(self.model)
+        snapshot = pickle.loads(pickle.dumps(snapshot, -1))
+        model = snapshot.load()
+        self.assertEqual(tuple(model.limits['rxn_5']), (0, 100))
+
+    def test_snapshot_shared_pickle(self):
+        snapshot = ModelSnapshot.from_model(self.model)
+        if not snapshot.share():
+            self.skipTest('Shared memory is not available')
+        self.assertTrue(snapshot.shared)
+
+        data = pickle.dumps(snapshot, -1)
+        self.assertLess(len(data), snapshot.nbytes)
+
+        attached = pickle.loads(data)
+        model = attached.load()
+        self.assertEqual(tuple(model.limits['rxn_5']), (0, 100))
+        del model
+        attached.close()
+        snapshot.close()
+        snapshot.unlink()
+
+    def test_flux_balance_on_snapshot(self):
+        try:
+            solver = generic.Solver()
+        except generic.RequirementsError:
+            self.skipTest('Unable to find an LP solver for tests')
+
+        self.model.limits['rxn_3'].upper = 0
+        model = ModelSnapshot.from_model(self.model).load()
+        fluxes = dict(fluxanalysis.flux_balance(
+            model, 'rxn_6', tfba=False, solver=solver))
+        expected = dict(fluxanalysis.flux_balance(
+            self.model, 'rxn_6', tfba=False, solver=solver))
+        for reaction_id, value in expected.items():
+            self.assertAlmostEqual(fluxes[reaction_id], value)
+        self.assertAlmostEqual(fluxes['rxn_6'], 100)
+
+
+if __name__ == '__main__':
+    unittest.main()